@@ -1 +1,10 @@
 # This file makes the src directory a proper Python package
+
+# SnakeGame pulls in Kivy, so it is only imported when first asked for.
+# That keeps the headless engine, leaderboard and benchmark tools free of
+# Kivy, and lets main.py read its own flags before Kivy parses sys.argv.
+def __getattr__(name):
+    if name == 'SnakeGame':
+        from .game import SnakeGame
+        return SnakeGame
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
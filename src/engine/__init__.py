@@ -0,0 +1,7 @@
+# Headless game rules shared by the Kivy and pygame front ends.
+# Nothing in this package may import Kivy.
+from .snake import SnakeState, DIRECTIONS, UP, DOWN, LEFT, RIGHT
+from .food import FoodState, FOOD_TYPES
+from .obstacle import ObstacleField, OBSTACLE_TYPES, OBSTACLE_PATTERNS
+from .game import GameEngine, StepResult
+from .replay import Replay, ReplayWriter
@@ -0,0 +1,236 @@
+# Autopilots that play the headless engine. An agent's act(engine) is
+# asked for the direction to take on the next tick, or None to keep going,
+# exactly like the keyboard in the game.
+from collections import deque
+from .grid import cycle_cell
+from .snake import DIRECTIONS
+
+
+def next_cell(engine, position, direction):
+    """Return the cell one step from position, wrapping at the edges"""
+    return ((position[0] + direction[0]) % engine.grid_width,
+            (position[1] + direction[1]) % engine.grid_height)
+
+
+def is_safe(engine, cell):
+    """Check whether the head can move into cell on the next tick"""
+    snake = engine.snake
+    if engine.obstacle.check_collision(cell):
+        return False
+    # The tail moves out of the way unless the snake is growing
+    return cell not in snake.body or (cell == snake.body[-1] and
+                                      not snake.grow)
+
+
+def direction_between(engine, a, b):
+    """Return the direction of the step from cell a to the neighbouring b"""
+    dx = (b[0] - a[0]) % engine.grid_width
+    dy = (b[1] - a[1]) % engine.grid_height
+    direction = (dx if dx <= 1 else dx - engine.grid_width,
+                 dy if dy <= 1 else dy - engine.grid_height)
+    assert direction in DIRECTIONS, f"{b} is not next to {a}"
+    return direction
+
+
+def blocked_cells(engine):
+    """Return the cells a path must avoid: the body but for a moving tail"""
+    snake = engine.snake
+    blocked = set(snake.body)
+    if not snake.grow:
+        blocked.discard(snake.body[-1])
+    return blocked
+
+
+def reachable(engine, start, blocked, limit=None):
+    """Count the open cells connected to start, stopping at limit"""
+    seen = {start}
+    queue = deque([start])
+    check = engine.obstacle.check_collision
+    while queue and (limit is None or len(seen) < limit):
+        cell = queue.popleft()
+        for direction in DIRECTIONS:
+            neighbour = next_cell(engine, cell, direction)
+            if (neighbour not in seen and neighbour not in blocked and
+                    not check(neighbour)):
+                seen.add(neighbour)
+                queue.append(neighbour)
+    return len(seen)
+
+
+def wrapped_distance(engine, a, b):
+    """Steps between two cells on the wrapping board"""
+    dx = abs(a[0] - b[0])
+    dy = abs(a[1] - b[1])
+    return (min(dx, engine.grid_width - dx) +
+            min(dy, engine.grid_height - dy))
+
+
+class Agent:
+    """Base class of the autopilots; subclasses implement act()"""
+
+    name = "agent"
+
+    def reset(self, engine):
+        """Called before the first move of each game"""
+
+    def act(self, engine):
+        raise NotImplementedError
+
+
+class GreedyAgent(Agent):
+    """Take the safe step that brings the head closest to the food
+
+    Only looks one step ahead, so it is cheap enough for turbo mode but
+    walks into dead ends a longer snake could have avoided.
+    """
+
+    name = "greedy"
+
+    def act(self, engine):
+        snake = engine.snake
+        head = snake.body[0]
+        heading = snake.direction
+        best = None
+        best_distance = None
+        for direction in DIRECTIONS:
+            if direction == (-heading[0], -heading[1]):
+                continue
+            cell = next_cell(engine, head, direction)
+            if not is_safe(engine, cell):
+                continue
+            distance = wrapped_distance(engine, cell, engine.food.position)
+            # Ties keep the current heading, so the snake turns less
+            if best is None or distance < best_distance or (
+                    distance == best_distance and direction == heading):
+                best = direction
+                best_distance = distance
+        # Boxed in: keep going and let the rules end the game
+        if best is None or best == heading:
+            return None
+        return best
+
+
+class BFSAgent(Agent):
+    """Follow a shortest path to the food around the body and obstacles
+
+    The path is planned with a breadth-first search and kept until the
+    food moves or the next step stops being safe; cells ahead on the path
+    were free when it was planned and only the snake itself moves, so
+    most ticks cost nothing. With no path to the food, the agent takes
+    the safe step with the most room behind it.
+    """
+
+    name = "bfs"
+
+    def reset(self, engine):
+        self.path = deque()
+        self.target = None
+
+    def act(self, engine):
+        head = engine.snake.body[0]
+        food = engine.food.position
+        # The path is replanned if the head has left it, as it does when
+        # the engine was stepped without this agent's moves
+        if (food != self.target or not self.path or
+                wrapped_distance(engine, head, self.path[0]) != 1 or
+                not is_safe(engine, self.path[0])):
+            self.target = food
+            self.path = self.plan(engine, head, food)
+
+        if self.path:
+            cell = self.path.popleft()
+        else:
+            cell = self.roomiest_step(engine, head)
+            if cell is None:
+                return None
+        direction = direction_between(engine, head, cell)
+        return None if direction == engine.snake.direction else direction
+
+    def plan(self, engine, head, food):
+        """Return the cells of a shortest path from head to food"""
+        blocked = blocked_cells(engine)
+        check = engine.obstacle.check_collision
+        previous = {head: None}
+        queue = deque([head])
+        while queue:
+            cell = queue.popleft()
+            if cell == food:
+                path = deque()
+                while cell != head:
+                    path.appendleft(cell)
+                    cell = previous[cell]
+                return path
+            for direction in DIRECTIONS:
+                neighbour = next_cell(engine, cell, direction)
+                if (neighbour not in previous and neighbour not in blocked
+                        and not check(neighbour)):
+                    previous[neighbour] = cell
+                    queue.append(neighbour)
+        return deque()
+
+    def roomiest_step(self, engine, head):
+        """Return the safe neighbouring cell with the most space around it"""
+        blocked = blocked_cells(engine)
+        best = None
+        best_room = -1
+        for direction in DIRECTIONS:
+            cell = next_cell(engine, head, direction)
+            if not is_safe(engine, cell):
+                continue
+            room = reachable(engine, cell, blocked | {head},
+                             limit=len(engine.snake.body) + 1)
+            if room > best_room:
+                best = cell
+                best_room = room
+        return best
+
+
+class HamiltonianAgent(Agent):
+    """Follow a cycle through every cell of the board
+
+    A snake on a cycle covering the board can never run into itself, so
+    this agent survives as long as the obstacles let it, at the cost of
+    sweeping the whole board for every meal. An obstacle on the cycle is
+    stepped around through the safe neighbour that skips the fewest cells
+    of the cycle. The cycle is the one cycle_cell() describes, so boards
+    with an odd width and an odd height are not supported.
+    """
+
+    name = "hamiltonian"
+
+    def reset(self, engine):
+        size = (engine.grid_width, engine.grid_height)
+        if getattr(self, "size", None) != size:
+            self.size = size
+            self.cells = engine.grid_width * engine.grid_height
+            self.order = {cycle_cell(index, *size): index
+                          for index in range(self.cells)}
+
+    def act(self, engine):
+        head = engine.snake.body[0]
+        heading = engine.snake.direction
+        position = self.order[head]
+        best = None
+        best_ahead = None
+        for direction in DIRECTIONS:
+            if direction == (-heading[0], -heading[1]):
+                continue
+            cell = next_cell(engine, head, direction)
+            if not is_safe(engine, cell):
+                continue
+            # Steps along the cycle this move skips; 1 follows the cycle
+            ahead = (self.order[cell] - position) % self.cells
+            if best is None or ahead < best_ahead:
+                best = direction
+                best_ahead = ahead
+        if best is None or best == heading:
+            return None
+        return best
+
+
+# Agents by the name the game and tools select them with
+AGENTS = {
+    GreedyAgent.name: GreedyAgent,
+    BFSAgent.name: BFSAgent,
+    HamiltonianAgent.name: HamiltonianAgent,
+}
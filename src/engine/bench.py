@@ -0,0 +1,262 @@
+# Micro-benchmarks for the core game operations, runnable without a window.
+# Every operation is timed over a sweep of board sizes and snake lengths,
+# up to a snake filling the whole board, and the results are written as
+# JSON together with a description of the machine and the checkout.
+#
+# python -m src.engine.bench --output bench.json
+# python -m src.engine.bench --quick
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from .food import FoodState
+from .grid import FreeCells, cycle_cell
+from .obstacle import ObstacleField, OBSTACLE_PATTERNS
+from .snake import SnakeState
+
+GRIDS = [(40, 30), (200, 150), (1000, 1000), (2000, 2000)]
+QUICK_GRIDS = [(40, 30), (200, 150)]
+
+# Calls per timed run of each operation, for the full and --quick sweeps
+ITERATIONS = {
+    "snake.move": 20000,
+    "snake.check_collision": 100000,
+    "food.respawn": 20000,
+    "obstacle.generate_obstacles": 50,
+    "obstacle.check_collision": 100000,
+}
+QUICK_ITERATIONS = {name: max(1, count // 10)
+                    for name, count in ITERATIONS.items()}
+
+# Obstacle layouts are generated at this level, so the counts are capped
+OBSTACLE_LEVEL = 10
+
+
+def snake_lengths(width, height):
+    """Snake lengths swept on a board, from the starting 3 to a full board"""
+    cells = width * height
+    lengths = {3, 100, cells // 100, cells // 10, cells // 2, cells}
+    return sorted(length for length in lengths if 3 <= length <= cells)
+
+
+def build_snake(width, height, length, free_cells):
+    """Return a snake of length cells laid along the cycle, head first"""
+    return SnakeState(
+        width, height, free_cells,
+        cells=(cycle_cell(i, width, height)
+               for i in range(length - 1, -1, -1)))
+
+
+def time_calls(run, repeat):
+    """Time run() repeat times with the collector off, in seconds each"""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        return timings
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def calibrate(call, number, budget=0.2):
+    """Lower number so that number calls take roughly budget seconds"""
+    start = time.perf_counter()
+    call()
+    elapsed = time.perf_counter() - start
+    if elapsed * number <= budget:
+        return number
+    return max(1, int(budget / elapsed))
+
+
+def summarize(operation, width, height, length, number, timings, **extra):
+    per_call = sorted(t / number * 1e9 for t in timings)
+    result = {
+        "operation": operation,
+        "grid": [width, height],
+        "snake_length": length,
+        "iterations": number,
+        "repeat": len(timings),
+        "ns_per_op": {
+            "min": per_call[0],
+            "median": per_call[len(per_call) // 2],
+            "mean": sum(per_call) / len(per_call),
+        },
+    }
+    result.update(extra)
+    return result
+
+
+def bench_board(width, height, length, iterations, repeat, seed):
+    """Time every operation on one board with a snake of the given length"""
+    rng = random.Random(seed)
+    cells = width * height
+    free_cells = FreeCells(width, height)
+    snake = build_snake(width, height, length, free_cells)
+    results = []
+
+    # Moving follows the cycle, so even a full-board snake keeps going
+    number = iterations["snake.move"]
+    steps = [cycle_cell(i, width, height)
+             for i in range(length - 1, length + number * repeat)]
+    directions = [(b[0] - a[0], b[1] - a[1]) for a, b in zip(steps, steps[1:])]
+    moves = iter(directions)
+
+    def run_moves():
+        for _ in range(number):
+            snake.direction = next(moves)
+            snake.move()
+
+    results.append(summarize("snake.move", width, height, length, number,
+                             time_calls(run_moves, repeat)))
+
+    number = iterations["snake.check_collision"]
+    positions = [(rng.randrange(width), rng.randrange(height))
+                 for _ in range(number)]
+
+    def run_snake_collisions():
+        check = snake.check_collision
+        for position in positions:
+            check(position)
+
+    results.append(summarize(
+        "snake.check_collision", width, height, length, number,
+        time_calls(run_snake_collisions, repeat)))
+
+    # Food shares the free-cell index the snake keeps up to date
+    if length < cells:
+        number = iterations["food.respawn"]
+        food = FoodState(width, height, rng=rng, free_cells=free_cells)
+
+        def run_respawns():
+            respawn = food.respawn
+            for _ in range(number):
+                respawn()
+
+        results.append(summarize("food.respawn", width, height, length,
+                                 number, time_calls(run_respawns, repeat)))
+
+    obstacles = ObstacleField(width, height, rng=rng, free_cells=free_cells)
+    obstacles.level = OBSTACLE_LEVEL - 1
+    obstacles.increase_difficulty()
+
+    # Layouts test the snake's occupancy set directly, so their cost does
+    # not grow with the snake
+    for pattern in OBSTACLE_PATTERNS:
+        number = calibrate(
+            lambda: obstacles.generate_obstacles(snake.body, pattern=pattern),
+            iterations["obstacle.generate_obstacles"])
+
+        def run_layouts():
+            for _ in range(number):
+                obstacles.generate_obstacles(snake.body, pattern=pattern)
+
+        results.append(summarize(
+            "obstacle.generate_obstacles", width, height, length, number,
+            time_calls(run_layouts, repeat), pattern=pattern,
+            obstacles=len(obstacles.positions)))
+
+    number = iterations["obstacle.check_collision"]
+    obstacles.generate_obstacles(snake.body)
+
+    def run_obstacle_collisions():
+        check = obstacles.check_collision
+        for position in positions:
+            check(position)
+
+    results.append(summarize(
+        "obstacle.check_collision", width, height, length, number,
+        time_calls(run_obstacle_collisions, repeat)))
+    return results
+
+
+def git_revision():
+    """Return the checked out commit, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "timestamp": datetime.datetime.now(
+            datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "git_revision": git_revision(),
+    }
+
+
+def parse_grid(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the core snake game operations headlessly")
+    parser.add_argument("--grid", type=parse_grid, action="append",
+                        help="board size such as 40x30; may be repeated")
+    parser.add_argument("--quick", action="store_true",
+                        help="small boards and fewer iterations")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None,
+                        help="JSON file to write; printed to stdout if unset")
+    args = parser.parse_args(argv)
+
+    grids = args.grid or (QUICK_GRIDS if args.quick else GRIDS)
+    iterations = QUICK_ITERATIONS if args.quick else ITERATIONS
+
+    results = []
+    for width, height in grids:
+        for length in snake_lengths(width, height):
+            for result in bench_board(width, height, length, iterations,
+                                      args.repeat, args.seed):
+                results.append(result)
+                label = result["operation"]
+                if "pattern" in result:
+                    label += f"[{result['pattern']}]"
+                print(f"{width}x{height} len {length:>9,} {label:<42}"
+                      f"{result['ns_per_op']['median']:>14,.0f} ns",
+                      file=sys.stderr)
+
+    report = {
+        "environment": environment(),
+        "config": {
+            "grids": [list(grid) for grid in grids],
+            "iterations": iterations,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "obstacle_level": OBSTACLE_LEVEL,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
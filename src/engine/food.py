@@ -0,0 +1,74 @@
+import random
+from .grid import FreeCells
+
+# Food types with their respective point values
+FOOD_TYPES = [
+    {"name": "mouse", "points": 5, "color": (0.6, 0.5, 0.4)},
+    {"name": "egg", "points": 1, "color": (0.95, 0.95, 0.8)},
+    {"name": "frog", "points": 3, "color": (0.2, 0.8, 0.1)},
+    {"name": "bird", "points": 7, "color": (0.7, 0.1, 0.1)},
+    {"name": "fruit", "points": 2, "color": (0.9, 0.2, 0.7)},
+    {"name": "bug", "points": 1, "color": (0.1, 0.1, 0.1)}
+]
+
+
+class FoodState:
+    """Food placement and scoring rules with no rendering attached"""
+
+    FOOD_TYPES = FOOD_TYPES
+
+    def __init__(self, grid_width=40, grid_height=30, rng=None,
+                 free_cells=None):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.rng = rng or random
+
+        # Cells the food may appear on, shared with the snake and obstacles
+        if free_cells is None:
+            free_cells = FreeCells(grid_width, grid_height)
+        self.free_cells = free_cells
+
+        # Food properties
+        self.position = None
+        self.food_type = None
+
+        # Generate initial food
+        self.generate_new_food()
+
+    def generate_new_food(self):
+        """Generate a new random food type and position"""
+        self.position = self.free_cells.sample(self.rng)
+
+        # Choose random food type
+        self.set_random_food_type()
+
+    def set_random_food_type(self):
+        """Pick the type of the current food item"""
+        self.food_type = self.rng.choice(self.FOOD_TYPES)
+
+    def restore(self, position, food_type):
+        """Put the given food type on position, as in a keyframe"""
+        self.position = position
+        self.food_type = food_type
+
+    def respawn(self):
+        """Respawn food on a uniformly chosen free cell
+
+        Returns False, leaving the food where it is, when the snake and the
+        obstacles cover the whole board.
+        """
+        # Save the old position for animation purposes if needed
+        self.old_position = self.position
+
+        position = self.free_cells.sample(self.rng)
+        if position is None:
+            return False
+        self.position = position
+
+        # Choose a random food type
+        self.set_random_food_type()
+        return True
+
+    def get_points(self):
+        """Return the point value for the current food"""
+        return self.food_type["points"]
@@ -0,0 +1,278 @@
+import random
+from .snake import SnakeState, DIRECTIONS
+from .food import FoodState
+from .obstacle import ObstacleField
+from .grid import FreeCells
+
+# Seconds of game time a combo stays alive after the last meal
+COMBO_TIMEOUT = 3.0
+
+# Ticks between checkpoints, where the state is summed up by snapshot()
+KEYFRAME_INTERVAL = 500
+
+
+def combo_multiplier(combo_counter):
+    """Score multiplier for a run of combo_counter meals (caps at 3.0x)"""
+    if combo_counter >= 5:
+        return min(3.0, 1.0 + (combo_counter - 5) * 0.2 + 1.0)
+    elif combo_counter >= 3:
+        return 2.0
+    return 1.0
+
+
+class StepResult:
+    """What happened during a single engine tick"""
+
+    def __init__(self, tick):
+        self.tick = tick
+        self.alive = True
+        # "self", "obstacle" or "board_full" once the game ends
+        self.death_cause = None
+        self.food_type = None  # Type of the food eaten this tick, if any
+        self.points = 0
+        self.level_up = False
+        self.combo_expired = False
+
+    @property
+    def ate(self):
+        return self.food_type is not None
+
+
+class GameEngine:
+    """Headless game rules advanced one tick at a time with step(action)
+
+    The engine owns the snake, food and obstacles and applies scoring,
+    combos and level-ups. Front ends can swap in their own subclasses of
+    the state objects through the factory arguments and render them.
+
+    Every game draws from its own random.Random, seeded with seed or a
+    fresh seed per game, so the seed, settings() and the turns replay it
+    exactly. Every KEYFRAME_INTERVAL ticks, and at the start, the engine
+    checkpoints: the generator is reseeded from the seed and tick, so the
+    game can be resumed from snapshot() alone. A recorder, such as a
+    replay.ReplayWriter, is told about each turn, each checkpoint and
+    the end of one game.
+    """
+
+    def __init__(self, grid_width=40, grid_height=30, difficulty=None,
+                 tick_rate=10, seed=None, snake_factory=SnakeState,
+                 food_factory=FoodState, obstacle_factory=ObstacleField,
+                 recorder=None):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.difficulty = difficulty
+        self.tick_rate = tick_rate  # Ticks per second of game time
+        self.recorder = recorder
+
+        self.snake_factory = snake_factory
+        self.food_factory = food_factory
+        self.obstacle_factory = obstacle_factory
+
+        self.level_threshold = 5  # Score needed to advance level
+        self.combo_ticks = max(1, int(round(COMBO_TIMEOUT * tick_rate)))
+
+        self.reset(seed)
+
+    def settings(self):
+        """Return the arguments that recreate this board, minus the seed"""
+        return {"grid_width": self.grid_width, "grid_height": self.grid_height,
+                "difficulty": self.difficulty, "tick_rate": self.tick_rate}
+
+    def reset(self, seed=None):
+        """Start a new game on the current board"""
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # Every game object keeps this index of uncovered cells up to date
+        self.free_cells = FreeCells(self.grid_width, self.grid_height)
+
+        self.snake = self.snake_factory(
+            self.grid_width, self.grid_height, free_cells=self.free_cells)
+        self.food = self.food_factory(
+            self.grid_width, self.grid_height, rng=self.rng,
+            free_cells=self.free_cells)
+        self.obstacle = self.obstacle_factory(
+            self.grid_width, self.grid_height, rng=self.rng,
+            free_cells=self.free_cells)
+
+        # Apply difficulty setting to obstacles
+        if self.difficulty:
+            self.obstacle.set_difficulty(self.difficulty)
+
+        # Generate initial obstacles
+        self.obstacle.generate_obstacles(self.snake.body, self.food.position)
+
+        # Score tracking
+        self.score = 0
+        self.level = 1
+        self.combo_counter = 0
+        self.combo_multiplier = 1.0
+        self.combo_expires = None  # Tick at which the combo runs out
+
+        # Game state
+        self.tick = 0
+        self.game_over = False
+        self.death_cause = None
+        self.checkpoint()
+
+    def step(self, action=None):
+        """Advance the game by one tick
+
+        action is a direction such as (0, 1), or None to keep going the
+        same way. Returns a StepResult describing the tick. Anything else,
+        such as a diagonal, raises ValueError.
+        """
+        if action is not None and action not in DIRECTIONS:
+            raise ValueError(f"action must be one of {DIRECTIONS} or None, "
+                             f"not {action!r}")
+
+        result = StepResult(self.tick)
+        if self.game_over:
+            result.alive = False
+            result.death_cause = self.death_cause
+            return result
+
+        if action is not None:
+            direction = self.snake.direction
+            self.snake.change_direction(action)
+            if self.recorder is not None and self.snake.direction != direction:
+                self.recorder.record(self.tick + 1, self.snake.direction)
+
+        self.tick += 1
+        result.tick = self.tick
+
+        # Combo expires a few seconds of game time after the last meal
+        if self.combo_expires is not None and self.tick >= self.combo_expires:
+            self.reset_combo()
+            result.combo_expired = True
+
+        # Move the snake
+        self.snake.move()
+
+        # Get the head position AFTER moving
+        head_pos = self.snake.get_head_position()
+
+        # First check if food was eaten (before checking death conditions)
+        if head_pos == self.food.position:
+            self.consume_food(result)
+        elif not self.snake.is_alive:
+            # Collision with self
+            self.end_game(result, "self")
+        elif self.obstacle.check_collision(head_pos):
+            # Collision with obstacles
+            self.snake.is_alive = False
+            self.end_game(result, "obstacle")
+
+        if self.tick % KEYFRAME_INTERVAL == 0 and not self.game_over:
+            self.checkpoint()
+        return result
+
+    def checkpoint(self):
+        """Make the current state resumable from snapshot() alone
+
+        The random generator is reseeded from the seed and tick, and the
+        free-cell index, whose order food placement depends on, is put in
+        cell order. restore() does the same.
+        """
+        self.rng.seed(f"{self.seed}:{self.tick}")
+        self.free_cells.canonicalize()
+        if self.recorder is not None:
+            self.recorder.keyframe(self.snapshot())
+
+    def snapshot(self):
+        """Return everything a checkpoint needs to resume the game"""
+        return {
+            "tick": self.tick,
+            "score": self.score,
+            "level": self.level,
+            "combo_counter": self.combo_counter,
+            "combo_expires": self.combo_expires,
+            "body": list(self.snake.body),
+            "direction": self.snake.direction,
+            "grow": self.snake.grow,
+            "food": self.food.position,
+            "food_type": self.food.food_type,
+            "obstacle_level": self.obstacle.level,
+            "max_obstacles": self.obstacle.max_obstacles,
+            "obstacles": [(obstacle["position"], obstacle["type"])
+                          for obstacle in self.obstacle.obstacles],
+        }
+
+    def restore(self, state):
+        """Resume the game from a snapshot() taken at a checkpoint"""
+        self.snake.restore(state["body"], state["direction"], state["grow"])
+        self.obstacle.restore(state["obstacle_level"], state["max_obstacles"],
+                              state["obstacles"])
+        self.food.restore(state["food"], state["food_type"])
+
+        self.tick = state["tick"]
+        self.score = state["score"]
+        self.level = state["level"]
+        self.combo_counter = state["combo_counter"]
+        self.combo_multiplier = combo_multiplier(self.combo_counter)
+        self.combo_expires = state["combo_expires"]
+        self.game_over = False
+        self.death_cause = None
+
+        self.rng.seed(f"{self.seed}:{self.tick}")
+        self.free_cells.canonicalize()
+
+    def consume_food(self, result):
+        """Apply scoring, growth and respawn for the food under the head"""
+        # Get base points for this food and apply combo multiplier
+        base_points = self.food.get_points()
+        actual_points = int(base_points * self.combo_multiplier)
+
+        # Update combo system
+        self.increase_combo()
+
+        # Add points to score
+        self.score += actual_points
+        result.food_type = self.food.food_type
+        result.points = actual_points
+
+        # Grow snake BEFORE respawning food to include new head in occupied positions
+        self.snake.grow_snake()
+
+        # Respawn food on a cell free of the snake and ALL obstacles. With
+        # no such cell left the board is full and the game is won
+        if not self.food.respawn():
+            self.end_game(result, "board_full")
+            return
+
+        # Check if player advances to the next level
+        if self.score >= self.level * self.level_threshold:
+            self.level_up()
+            result.level_up = True
+
+    def increase_combo(self):
+        """Count a meal towards the combo and refresh its timer"""
+        self.combo_counter += 1
+        self.combo_multiplier = combo_multiplier(self.combo_counter)
+        self.combo_expires = self.tick + self.combo_ticks
+
+    def reset_combo(self):
+        """Drop the combo back to no multiplier"""
+        self.combo_counter = 0
+        self.combo_multiplier = 1.0
+        self.combo_expires = None
+
+    def level_up(self):
+        """Advance a level and lay out a harder set of obstacles"""
+        self.level += 1
+
+        # Increase obstacle difficulty
+        self.obstacle.increase_difficulty()
+
+        # Generate new obstacles for the level
+        self.obstacle.generate_obstacles(self.snake.body, self.food.position)
+
+    def end_game(self, result, cause):
+        self.game_over = True
+        self.death_cause = cause
+        result.alive = False
+        result.death_cause = cause
+        if self.recorder is not None:
+            self.recorder.end(self.tick)
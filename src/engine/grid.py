@@ -0,0 +1,100 @@
+from array import array
+
+
+def cycle_cell(index, width, height):
+    """Return the cell at position index along a cycle covering the board
+
+    The cycle sweeps the rows back and forth through columns 1 and up,
+    then returns down column 0. That needs an even height; boards with an
+    odd height and even width use the same cycle turned on its side.
+    """
+    if height % 2:
+        if width % 2:
+            raise ValueError("no Hamiltonian cycle on an odd by odd board")
+        y, x = cycle_cell(index, height, width)
+        return (x, y)
+
+    index %= width * height
+    inner = (width - 1) * height
+    if index < inner:
+        y, offset = divmod(index, width - 1)
+        x = 1 + offset if y % 2 == 0 else width - 1 - offset
+        return (x, y)
+    return (0, height - 1 - (index - inner))
+
+
+class FreeCells:
+    """Cells not covered by the snake or obstacles, sampled in O(1)
+
+    Free cell ids live in a dense array with a reverse index, so taking a
+    cell swaps the last entry into its slot and releasing one appends it.
+    Each cell counts how many things cover it, because the snake may crawl
+    over non-deadly obstacles such as mud.
+    """
+
+    def __init__(self, grid_width, grid_height):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+
+        cell_count = grid_width * grid_height
+        self._cells = array('i', range(cell_count))  # Dense free cell ids
+        self._slots = array('i', range(cell_count))  # Cell id -> slot or -1
+        self._covers = bytearray(cell_count)  # How many things cover a cell
+
+    def _cell(self, position):
+        return position[1] * self.grid_width + position[0]
+
+    def occupy(self, position):
+        """Cover a cell, returning False if it was already covered"""
+        cell = self._cell(position)
+        self._covers[cell] += 1
+        if self._covers[cell] > 1:
+            return False
+
+        # Move the last free cell into the vacated slot
+        slot = self._slots[cell]
+        last = self._cells.pop()
+        if last != cell:
+            self._cells[slot] = last
+            self._slots[last] = slot
+        self._slots[cell] = -1
+        return True
+
+    def release(self, position):
+        """Uncover a cell, which becomes free once nothing covers it"""
+        cell = self._cell(position)
+        if not self._covers[cell]:
+            return
+        self._covers[cell] -= 1
+        if self._covers[cell]:
+            return
+        self._slots[cell] = len(self._cells)
+        self._cells.append(cell)
+
+    def canonicalize(self):
+        """Put the free cells in ascending order
+
+        sample() depends on the order of the dense array, which depends on
+        everything taken and released so far. Resetting it to a known
+        order lets a game be resumed from the covered cells alone.
+        """
+        self._cells = array('i', (cell for cell, covers in
+                                  enumerate(self._covers) if not covers))
+        for slot, cell in enumerate(self._cells):
+            self._slots[cell] = slot
+
+    def sample(self, rng):
+        """Return a uniformly chosen free cell, or None when the board is full"""
+        if not self._cells:
+            return None
+        cell = self._cells[rng.randrange(len(self._cells))]
+        return (cell % self.grid_width, cell // self.grid_width)
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __contains__(self, position):
+        x, y = position
+        if not (0 <= x < self.grid_width and 0 <= y < self.grid_height):
+            return False
+        return self._slots[self._cell(position)] >= 0
@@ -0,0 +1,298 @@
+import random
+
+# Obstacle types: wall, rocks, spikes
+OBSTACLE_TYPES = [
+    {"name": "wall", "color": (0.5, 0.3, 0.2, 1), "deadly": True},
+    {"name": "rocks", "color": (0.6, 0.6, 0.6, 1), "deadly": True},
+    {"name": "spikes", "color": (0.7, 0.1, 0.1, 1), "deadly": True},
+    # Non-deadly but will be used for slowdown
+    {"name": "mud", "color": (0.4, 0.3, 0.1, 0.7), "deadly": False}
+]
+
+# Layouts generate_obstacles picks from for each level
+OBSTACLE_PATTERNS = ["random", "horizontal", "vertical", "diagonal", "enclosed"]
+
+# Walls most common, spikes rarest
+OBSTACLE_WEIGHTS = [0.6, 0.2, 0.1, 0.1]
+
+# Per difficulty: (base obstacle count, extra obstacles per level)
+DIFFICULTY_SETTINGS = {
+    'easy': (3, 0.5),
+    'normal': (5, 1.0),
+    'hard': (7, 1.5),
+    'expert': (10, 2.0)
+}
+
+# Never lay out more obstacles than this, whatever the level
+MAX_OBSTACLES_CAP = 30
+
+# Obstacle grid cells hold 0 when empty, otherwise 1 + the index of the
+# obstacle type in OBSTACLE_TYPES
+EMPTY = 0
+DEADLY_BY_ID = [False] + [t["deadly"] for t in OBSTACLE_TYPES]
+# Marks a cell chosen for the layout before its type is drawn
+_PENDING = 255
+
+
+class ObstacleField:
+    """Obstacle layout and collision rules with no rendering attached"""
+
+    def __init__(self, grid_width=40, grid_height=30, rng=None,
+                 free_cells=None):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.rng = rng or random
+        self.free_cells = free_cells
+
+        self.obstacle_types = OBSTACLE_TYPES
+
+        # One type id per cell answers collision and overlap queries in
+        # O(1); positions and obstacles are list views for the renderers
+        self.grid = bytearray(grid_width * grid_height)
+        self.positions = []
+        self.obstacles = []
+        self.version = 0  # Bumped every time a new layout is generated
+
+        # Level progression - obstacles increase as game progresses
+        self.level = 1
+        self.max_obstacles = 5  # Start with few obstacles
+
+    def generate_obstacles(self, snake_body, food=None, pattern=None):
+        """Generate obstacles that don't overlap with the snake or food
+
+        snake_body is tested for membership directly, so it should answer
+        `in` without a scan, as a SnakeBody does. pattern picks one of
+        OBSTACLE_PATTERNS instead of a random one.
+        """
+        self._clear_layout()
+
+        def occupied(position):
+            return position == food or position in snake_body
+
+        obstacle_count = min(self.max_obstacles,
+                             self.level * 2)  # Scale with level
+
+        # Choose a pattern type for this level
+        if pattern is None:
+            pattern = self.rng.choice(OBSTACLE_PATTERNS)
+
+        if pattern == "random":
+            # Random obstacles scattered around
+            attempts = 0
+            while len(self.positions) < obstacle_count and attempts < 100:
+                attempts += 1
+                # Keep away from edges
+                x = self.rng.randint(2, self.grid_width - 3)
+                y = self.rng.randint(2, self.grid_height - 3)
+
+                if not occupied((x, y)) and not self.is_obstacle((x, y)):
+                    self._place((x, y))
+
+                    # Sometimes create small clusters
+                    if self.rng.random() < 0.3 and len(self.positions) < obstacle_count:
+                        for dx, dy in [(1, 0), (0, 1), (-1, 0), (0, -1)]:
+                            nx, ny = x + dx, y + dy
+                            if (0 <= nx < self.grid_width and 0 <= ny < self.grid_height and
+                                not occupied((nx, ny)) and
+                                not self.is_obstacle((nx, ny)) and
+                                    len(self.positions) < obstacle_count):
+                                self._place((nx, ny))
+
+        elif pattern == "horizontal":
+            # Horizontal wall with a gap
+            y = self.rng.randint(self.grid_height // 4,
+                                 self.grid_height * 3 // 4)
+            wall_start = self.rng.randint(1, self.grid_width // 3)
+            gap_start = self.rng.randint(
+                wall_start + 3, self.grid_width * 2 // 3)
+            gap_width = self.rng.randint(2, 4)
+            gap_end = gap_start + gap_width
+
+            for x in range(wall_start, self.grid_width - 1):
+                if gap_start <= x < gap_end:  # Skip the gap
+                    continue
+
+                if not occupied((x, y)):
+                    self._place((x, y))
+                    if len(self.positions) >= obstacle_count:
+                        break
+
+        elif pattern == "vertical":
+            # Vertical wall with a gap
+            x = self.rng.randint(self.grid_width // 4,
+                                 self.grid_width * 3 // 4)
+            wall_start = self.rng.randint(1, self.grid_height // 3)
+            gap_start = self.rng.randint(
+                wall_start + 3, self.grid_height * 2 // 3)
+            gap_width = self.rng.randint(2, 4)
+            gap_end = gap_start + gap_width
+
+            for y in range(wall_start, self.grid_height - 1):
+                if gap_start <= y < gap_end:  # Skip the gap
+                    continue
+
+                if not occupied((x, y)):
+                    self._place((x, y))
+                    if len(self.positions) >= obstacle_count:
+                        break
+
+        elif pattern == "diagonal":
+            # Diagonal line of obstacles
+            start_x = self.rng.randint(2, self.grid_width // 3)
+            start_y = self.rng.randint(2, self.grid_height // 3)
+
+            for i in range(min(self.grid_width, self.grid_height) - start_x - 2):
+                x, y = start_x + i, start_y + i
+                if x >= self.grid_width - 2 or y >= self.grid_height - 2:
+                    break
+
+                if not occupied((x, y)) and not self.is_obstacle((x, y)):
+                    self._place((x, y))
+
+                if len(self.positions) >= obstacle_count:
+                    break
+
+        elif pattern == "enclosed":
+            # Create a partial enclosure that the snake must navigate
+            center_x = self.grid_width // 2
+            center_y = self.grid_height // 2
+
+            # Size of the "room"
+            room_size = self.rng.randint(5, 8)
+
+            # Build the walls (with a gap)
+            gap_side = self.rng.choice(["top", "right", "bottom", "left"])
+            gap_pos = self.rng.randint(1, room_size - 2)
+
+            for i in range(room_size):
+                # Top wall
+                if gap_side != "top" or i != gap_pos:
+                    pos = (center_x - room_size//2 +
+                           i, center_y + room_size//2)
+                    if not occupied(pos) and not self.is_obstacle(pos):
+                        self._place(pos)
+
+                # Bottom wall
+                if gap_side != "bottom" or i != gap_pos:
+                    pos = (center_x - room_size//2 +
+                           i, center_y - room_size//2)
+                    if not occupied(pos) and not self.is_obstacle(pos):
+                        self._place(pos)
+
+                # Left wall
+                if gap_side != "left" or i != gap_pos:
+                    pos = (center_x - room_size//2,
+                           center_y - room_size//2 + i)
+                    if not occupied(pos) and not self.is_obstacle(pos):
+                        self._place(pos)
+
+                # Right wall
+                if gap_side != "right" or i != gap_pos:
+                    pos = (center_x + room_size//2,
+                           center_y - room_size//2 + i)
+                    if not occupied(pos) and not self.is_obstacle(pos):
+                        self._place(pos)
+
+                if len(self.positions) >= obstacle_count:
+                    break
+
+        # Assign obstacle types
+        self.obstacles = []
+        for pos in self.positions:
+            # Generally use walls, but sometimes use other types
+            obstacle_type = self.rng.choices(
+                self.obstacle_types,
+                weights=OBSTACLE_WEIGHTS,
+                k=1
+            )[0]
+            self._add_obstacle(pos, obstacle_type)
+
+    def restore(self, level, max_obstacles, obstacles):
+        """Lay out (position, type) obstacles, as in a keyframe"""
+        self.level = level
+        self.max_obstacles = max_obstacles
+        self._clear_layout()
+        self.obstacles = []
+        for position, obstacle_type in obstacles:
+            self.positions.append(position)
+            self._add_obstacle(position, obstacle_type)
+
+    def _clear_layout(self):
+        """Drop the layout, handing its cells back to the free-cell index"""
+        for pos in self.positions:
+            self.grid[self._cell(pos)] = EMPTY
+            if self.free_cells is not None:
+                self.free_cells.release(pos)
+        self.version += 1
+        self.positions = []
+
+    def _add_obstacle(self, position, obstacle_type):
+        self.obstacles.append({
+            "position": position,
+            "type": obstacle_type
+        })
+        self.grid[self._cell(position)] = self.obstacle_types.index(
+            obstacle_type) + 1
+
+        if self.free_cells is not None:
+            self.free_cells.occupy(position)
+
+    def set_difficulty(self, difficulty):
+        """Set the obstacle difficulty"""
+        self.difficulty = difficulty
+
+        # Adjust obstacle parameters based on difficulty
+        if difficulty in DIFFICULTY_SETTINGS:
+            # Lower density means fewer obstacles per level
+            self.max_obstacles, self.obstacle_density = \
+                DIFFICULTY_SETTINGS[difficulty]
+
+    def increase_difficulty(self):
+        """Increase the difficulty (called when leveling up)"""
+        self.level += 1
+
+        # Scale with level and selected difficulty
+        base_obstacles, density = DIFFICULTY_SETTINGS['normal']
+        if getattr(self, 'difficulty', None) in DIFFICULTY_SETTINGS:
+            base_obstacles = DIFFICULTY_SETTINGS[self.difficulty][0]
+
+        # Calculate max obstacles based on level and difficulty
+        density = getattr(self, 'obstacle_density', density)
+
+        self.max_obstacles = min(
+            MAX_OBSTACLES_CAP, base_obstacles + int(self.level * density))
+
+    def _cell(self, position):
+        return position[1] * self.grid_width + position[0]
+
+    def _in_bounds(self, position):
+        return (0 <= position[0] < self.grid_width and
+                0 <= position[1] < self.grid_height)
+
+    def _place(self, position):
+        """Add a cell to the layout being generated"""
+        # Small boards can push a pattern past the edges
+        if not self._in_bounds(position) or self.is_obstacle(position):
+            return
+        self.grid[self._cell(position)] = _PENDING
+        self.positions.append(position)
+
+    def is_obstacle(self, position):
+        """Check if any obstacle, deadly or not, covers the given position"""
+        return (self._in_bounds(position) and
+                self.grid[self._cell(position)] != EMPTY)
+
+    def obstacle_at(self, position):
+        """Return the type of the obstacle at the given position, or None"""
+        if not self._in_bounds(position):
+            return None
+        type_id = self.grid[self._cell(position)]
+        if type_id == EMPTY:
+            return None
+        return self.obstacle_types[type_id - 1]
+
+    def check_collision(self, position):
+        """Check if the given position collides with any deadly obstacle"""
+        if not self._in_bounds(position):
+            return False
+        return DEADLY_BY_ID[self.grid[self._cell(position)]]
@@ -0,0 +1,339 @@
+# Replays: a game is fully determined by its seed, its settings and the
+# ticks at which the snake turned, so that is all a replay file keeps.
+#
+# The file starts with a fixed header (magic, format version, seed and the
+# length of the settings) followed by the settings as compact JSON. Each
+# turn after that is one varint holding (ticks since the previous turn << 2
+# | direction index). A turn always comes at least one tick after the
+# previous one, so a tick delta of 0 marks an escape instead, whose low
+# bits say what follows: END is followed by a varint of the final tick,
+# KEYFRAME by the length of a keyframe and the keyframe itself. A replay
+# without END was cut short, by a crash for instance, and holds the turns
+# up to then.
+#
+# The engine checkpoints every KEYFRAME_INTERVAL ticks, and a keyframe
+# holds its state at that tick, so a player can seek by restoring the
+# nearest keyframe and stepping from there. A keyframe is varints: tick,
+# score, level, combo counter, ticks until the combo runs out plus one (0
+# for no combo), obstacle level, obstacle limit, snake length, head cell,
+# direction index plus 4 if growing, then the body as 2-bit steps from
+# each segment to the next, four to a byte. Then come the food cell and
+# type index, the obstacle count and a cell and type index per obstacle.
+# Cells are y * grid_width + x.
+import bisect
+import json
+import os
+import struct
+from .food import FOOD_TYPES
+from .game import GameEngine
+from .obstacle import OBSTACLE_TYPES
+from .snake import DIRECTIONS
+
+MAGIC = b"SNKR"
+FORMAT_VERSION = 2
+EXTENSION = ".snkr"
+
+_HEADER = struct.Struct("<4sBQH")  # magic, version, seed, settings length
+
+# Escape codes, written as an event with a tick delta of 0
+END = 0
+KEYFRAME = 1
+
+# Direction index of each direction, written in the low two bits
+_DIRECTION_INDEX = {direction: index for index, direction in enumerate(DIRECTIONS)}
+
+# Buffered turns are handed to the file once they reach this many bytes
+FLUSH_BYTES = 256
+
+
+def write_varint(out, value):
+    """Append value to the bytearray out, seven bits per byte"""
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, offset):
+    """Return the varint at data[offset] and the offset just past it"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class ReplayWriter:
+    """Records a game's turns to a replay file while it is played
+
+    The engine calls record() only when the snake actually turns, so an
+    ordinary tick costs nothing. Turns collect in a small buffer that is
+    handed to the file every FLUSH_BYTES, so a crash loses at most the
+    last few turns.
+    """
+
+    def __init__(self, path, seed, settings):
+        self.path = path
+        self.grid_width = settings["grid_width"]
+        self.grid_height = settings["grid_height"]
+        self.file = open(path, "wb")
+        settings = json.dumps(settings, separators=(",", ":")).encode()
+        self.file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, seed, len(settings)))
+        self.file.write(settings)
+        self.buffer = bytearray()
+        self.last_tick = 0
+
+    def record(self, tick, direction):
+        """Note that the snake turned to direction on tick"""
+        write_varint(self.buffer, (tick - self.last_tick) << 2 |
+                     _DIRECTION_INDEX[direction])
+        self.last_tick = tick
+        if len(self.buffer) >= FLUSH_BYTES:
+            self.flush()
+
+    def keyframe(self, state):
+        """Write the engine's snapshot() at a checkpoint"""
+        keyframe = encode_keyframe(state, self.grid_width, self.grid_height)
+        write_varint(self.buffer, KEYFRAME)
+        write_varint(self.buffer, len(keyframe))
+        self.buffer += keyframe
+        # A keyframe is a good point to make the recording last a crash
+        self.flush()
+
+    def end(self, tick):
+        """Mark the game as over on tick and close the file"""
+        write_varint(self.buffer, END)
+        write_varint(self.buffer, tick)
+        self.close()
+
+    def flush(self):
+        if self.file is None:
+            return
+        self.file.write(self.buffer)
+        self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        if self.file is None:
+            return
+        self.flush()
+        self.file.close()
+        self.file = None
+
+
+class Replay:
+    """A recorded game: its seed, settings, turns and keyframes"""
+
+    def __init__(self, seed, settings, turns, end_tick=None, keyframes=()):
+        self.seed = seed
+        self.settings = settings
+        self.turns = turns  # (tick, direction) pairs in tick order
+        self.end_tick = end_tick  # None when the recording was cut short
+        self.turns_by_tick = dict(turns)
+
+        # Keyframes stay encoded until a seek needs one
+        self.keyframes = list(keyframes)  # Encoded keyframes in tick order
+        self.keyframe_ticks = [read_varint(keyframe, 0)[0]
+                               for keyframe in self.keyframes]
+
+    @property
+    def last_tick(self):
+        """The final tick, or the last one recorded if cut short"""
+        if self.end_tick is not None:
+            return self.end_tick
+        return max(self.turns[-1][0] if self.turns else 0,
+                   self.keyframe_ticks[-1] if self.keyframe_ticks else 0)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.decode(f.read())
+
+    @classmethod
+    def decode(cls, data):
+        if len(data) < _HEADER.size:
+            raise ValueError("replay is too short")
+        magic, version, seed, settings_length = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a replay file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        offset = _HEADER.size
+        settings = json.loads(data[offset:offset + settings_length])
+        offset += settings_length
+
+        turns = []
+        keyframes = []
+        tick = 0
+        end_tick = None
+        try:
+            while offset < len(data):
+                value, offset = read_varint(data, offset)
+                if value >> 2:
+                    tick += value >> 2
+                    turns.append((tick, DIRECTIONS[value & 3]))
+                elif value == KEYFRAME:
+                    length, offset = read_varint(data, offset)
+                    if offset + length > len(data):
+                        break
+                    keyframes.append(bytes(data[offset:offset + length]))
+                    offset += length
+                elif value == END:
+                    end_tick, offset = read_varint(data, offset)
+                    break
+                else:
+                    raise ValueError(f"unknown replay escape {value}")
+        except IndexError:
+            # The last turn was only partly written; keep the whole ones
+            pass
+        return cls(seed, settings, turns, end_tick, keyframes)
+
+    def create_engine(self, **factories):
+        """Return an engine set up like the recorded game at tick 0"""
+        return GameEngine(seed=self.seed, **self.settings, **factories)
+
+    def play(self, engine=None):
+        """Run the whole game headless and return the engine at its end"""
+        engine = engine or self.create_engine()
+        self.advance(engine, self.last_tick)
+        return engine
+
+    def keyframe(self, index):
+        """Return the engine snapshot() stored in keyframe index"""
+        return decode_keyframe(self.keyframes[index],
+                               self.settings["grid_width"],
+                               self.settings["grid_height"])
+
+    def seek(self, engine, tick):
+        """Bring engine to tick from the nearest keyframe before it
+
+        The engine is only restored when that keyframe is closer than
+        where the engine already is, so short seeks forward just step.
+        """
+        tick = min(tick, self.last_tick)
+        index = bisect.bisect_right(self.keyframe_ticks, tick) - 1
+        if index >= 0 and (engine.tick > tick or engine.game_over or
+                           self.keyframe_ticks[index] > engine.tick):
+            engine.restore(self.keyframe(index))
+        elif engine.tick > tick:
+            # Without a keyframe to go back to, start the game over
+            engine.reset(self.seed)
+        self.advance(engine, tick)
+        return engine
+
+    def advance(self, engine, tick):
+        """Step engine with the recorded turns until tick or game over"""
+        turns = self.turns_by_tick
+        while not engine.game_over and engine.tick < tick:
+            engine.step(turns.get(engine.tick + 1))
+
+
+def encode_keyframe(state, grid_width, grid_height):
+    """Pack an engine snapshot() into bytes, as described above"""
+    out = bytearray()
+    expires = state["combo_expires"]
+    for value in (state["tick"], state["score"], state["level"],
+                  state["combo_counter"],
+                  0 if expires is None else expires - state["tick"] + 1,
+                  state["obstacle_level"], state["max_obstacles"]):
+        write_varint(out, value)
+
+    body = state["body"]
+    write_varint(out, len(body))
+    write_varint(out, body[0][1] * grid_width + body[0][0])
+    write_varint(out, _DIRECTION_INDEX[state["direction"]] |
+                 (4 if state["grow"] else 0))
+    steps = 0
+    for index in range(1, len(body)):
+        # Neighbouring segments are one step apart, wrapping at the edges
+        step = ((body[index][0] - body[index - 1][0]) % grid_width,
+                (body[index][1] - body[index - 1][1]) % grid_height)
+        steps |= _DIRECTION_INDEX[_unwrap(step, grid_width, grid_height)] << (
+            2 * ((index - 1) % 4))
+        if index % 4 == 0 or index == len(body) - 1:
+            out.append(steps)
+            steps = 0
+
+    food = state["food"]
+    write_varint(out, food[1] * grid_width + food[0])
+    write_varint(out, FOOD_TYPES.index(state["food_type"]))
+    write_varint(out, len(state["obstacles"]))
+    for position, obstacle_type in state["obstacles"]:
+        write_varint(out, position[1] * grid_width + position[0])
+        write_varint(out, OBSTACLE_TYPES.index(obstacle_type))
+    return bytes(out)
+
+
+def decode_keyframe(data, grid_width, grid_height):
+    """Unpack a keyframe into the snapshot() it was made from"""
+    values = []
+    offset = 0
+    for _ in range(7):
+        value, offset = read_varint(data, offset)
+        values.append(value)
+    tick, score, level, combo_counter, expires, obstacle_level, \
+        max_obstacles = values
+
+    length, offset = read_varint(data, offset)
+    head, offset = read_varint(data, offset)
+    direction, offset = read_varint(data, offset)
+    x, y = head % grid_width, head // grid_width
+    body = [(x, y)]
+    for index in range(1, length):
+        if (index - 1) % 4 == 0:
+            steps = data[offset]
+            offset += 1
+        dx, dy = DIRECTIONS[steps >> (2 * ((index - 1) % 4)) & 3]
+        x = (x + dx) % grid_width
+        y = (y + dy) % grid_height
+        body.append((x, y))
+
+    food, offset = read_varint(data, offset)
+    food_type, offset = read_varint(data, offset)
+    count, offset = read_varint(data, offset)
+    obstacles = []
+    for _ in range(count):
+        cell, offset = read_varint(data, offset)
+        obstacle_type, offset = read_varint(data, offset)
+        obstacles.append(((cell % grid_width, cell // grid_width),
+                          OBSTACLE_TYPES[obstacle_type]))
+
+    return {
+        "tick": tick,
+        "score": score,
+        "level": level,
+        "combo_counter": combo_counter,
+        "combo_expires": None if not expires else tick + expires - 1,
+        "body": body,
+        "direction": DIRECTIONS[direction & 3],
+        "grow": bool(direction & 4),
+        "food": (food % grid_width, food // grid_width),
+        "food_type": FOOD_TYPES[food_type],
+        "obstacle_level": obstacle_level,
+        "max_obstacles": max_obstacles,
+        "obstacles": obstacles,
+    }
+
+
+def _unwrap(step, grid_width, grid_height):
+    """Turn a step taken modulo the board back into a unit direction"""
+    dx, dy = step
+    return (dx if dx <= 1 else dx - grid_width,
+            dy if dy <= 1 else dy - grid_height)
+
+
+def prune_replays(directory, keep):
+    """Delete all but the newest keep replays in directory"""
+    replays = sorted(
+        (entry for entry in os.scandir(directory)
+         if entry.name.endswith(EXTENSION)),
+        key=lambda entry: entry.stat().st_mtime)
+    for entry in replays[:max(0, len(replays) - keep)]:
+        try:
+            os.remove(entry.path)
+        except OSError as e:
+            print(f"Error removing old replay: {e}")
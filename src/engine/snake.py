@@ -0,0 +1,92 @@
+from ..ring_buffer import SnakeBody
+
+# Movement directions as (dx, dy) grid steps; y grows upwards like Kivy
+UP = (0, 1)
+DOWN = (0, -1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+
+
+class SnakeState:
+    """Grid-level snake rules with no rendering attached"""
+
+    def __init__(self, grid_width=40, grid_height=30, free_cells=None,
+                 cells=None):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+
+        # Start in the middle of the board unless given the cells, head
+        # first, to lay the snake along
+        if cells is None:
+            start_x = grid_width // 2
+            start_y = grid_height // 2
+            cells = [(start_x, start_y), (start_x-1, start_y),
+                     (start_x-2, start_y)]
+
+        # The body is a ring buffer sized to the whole board so moving and
+        # growing never shift the other segments
+        self.body = SnakeBody(grid_width * grid_height, cells,
+                              free_cells=free_cells)
+        self.direction = RIGHT  # Initial direction: moving right
+        self.grow = False
+        self.is_alive = True
+
+    def move(self):
+        """Move the snake one cell, returning False if it hit itself"""
+        # Get current head position
+        head = self.body[0]
+
+        # Calculate new head position based on direction
+        new_head = (
+            (head[0] + self.direction[0]) % self.grid_width,
+            (head[1] + self.direction[1]) % self.grid_height
+        )
+
+        # Check for collision with self (except when growing)
+        # The tail cell is safe to enter because it is vacated on this move,
+        # unless the snake is growing and the tail stays where it is
+        if new_head in self.body and (self.grow or new_head != self.body[-1]):
+            self.is_alive = False
+            return False
+
+        # If not growing, remove the tail segment first so its cell is free
+        # again before the new head may claim it
+        if not self.grow:
+            self.body.pop()
+
+        # Add new head to the front of the body
+        self.body.appendleft(new_head)
+
+        # Reset the grow flag after growing
+        self.grow = False
+        return True
+
+    def change_direction(self, new_direction):
+        # Prevent 180-degree turns
+        opposite_direction = (-self.direction[0], -self.direction[1])
+        if new_direction != opposite_direction:
+            self.direction = new_direction
+
+    def restore(self, cells, direction, grow=False):
+        """Lay the snake along cells, head first, as in a keyframe"""
+        self.body.clear()
+        for cell in cells:
+            self.body.append(cell)
+        self.direction = direction
+        self.grow = grow
+        self.is_alive = True
+
+    def grow_snake(self):
+        """Grow the snake by setting the grow flag"""
+        # When this flag is set, the tail won't be removed on the next move,
+        # effectively growing the snake by one segment
+        self.grow = True
+
+    def check_collision(self, position):
+        # Check if the head collides with the body. Cells are unique, so
+        # anything in the body other than the head itself is a hit
+        return position in self.body and position != self.body[0]
+
+    def get_head_position(self):
+        return self.body[0]
@@ -0,0 +1,265 @@
+# Plays autopilot agents against each other on the same seeded games,
+# spread over every core. Each seed is one game per agent, so agents are
+# compared on identical boards, food and obstacle draws until their moves
+# set them apart. Seeds are dealt out in shards to a process pool; the
+# workers run the headless engine and put one result per game on a shared
+# queue, which the parent reads as they finish to show progress.
+#
+# Agents are named from agents.AGENTS or given as module:Class, for a
+# learned agent for instance; the class is instantiated in each worker and
+# must have reset(engine) and act(engine) like agents.Agent.
+#
+# python -m src.engine.tournament --games 1000
+# python -m src.engine.tournament --agents greedy,bfs,mypackage.net:NetAgent
+import argparse
+import concurrent.futures
+import importlib
+import json
+import math
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from .agents import AGENTS
+from .bench import environment, parse_grid
+from .game import GameEngine
+
+# Shards per worker; several per worker keep them all busy to the end
+# when some games run much longer than others
+SHARDS_PER_WORKER = 4
+
+# Elo ratings start here and move by at most ELO_K per pairing
+ELO_START = 1500.0
+ELO_K = 16.0
+
+# Two-sided 95% normal quantile for the confidence intervals
+Z_95 = 1.96
+
+
+def load_agent(spec):
+    """Return the agent class named by spec, a name or module:Class"""
+    if spec in AGENTS:
+        return AGENTS[spec]
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"unknown agent {spec!r}; choose one of "
+                         f"{', '.join(sorted(AGENTS))} or give module:Class")
+    try:
+        return getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"cannot load agent {spec!r}: {e}")
+
+
+def play_game(agent, seed, settings, max_ticks):
+    """Play one game with agent and return its result"""
+    engine = GameEngine(seed=seed, **settings)
+    agent.reset(engine)
+    step = engine.step
+    act = agent.act
+    while not engine.game_over and engine.tick < max_ticks:
+        step(act(engine))
+    return {
+        "seed": seed,
+        "score": engine.score,
+        "length": len(engine.snake.body),
+        "ticks": engine.tick,
+        "level": engine.level,
+        "cause": engine.death_cause or "timeout",
+    }
+
+
+def run_shard(specs, seeds, settings, max_ticks, results):
+    """Worker: play every seed with every agent, queueing each result"""
+    agents = [(spec, load_agent(spec)()) for spec in specs]
+    for seed in seeds:
+        for spec, agent in agents:
+            result = play_game(agent, seed, settings, max_ticks)
+            result["agent"] = spec
+            results.put(result)
+    return len(seeds) * len(agents)
+
+
+def shard(seeds, count):
+    """Deal seeds round-robin into count shards"""
+    return [seeds[index::count] for index in range(min(count, len(seeds)))]
+
+
+def run_tournament(specs, seeds, settings, max_ticks, workers=None,
+                   on_result=None):
+    """Play every seed with every agent on a process pool
+
+    on_result is called in this process with each game's result as it
+    arrives. Returns all the results.
+    """
+    workers = workers or os.cpu_count() or 1
+    expected = len(seeds) * len(specs)
+    collected = []
+    with multiprocessing.Manager() as manager:
+        results = manager.Queue()
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(run_shard, specs, seeds_shard, settings,
+                                   max_ticks, results)
+                       for seeds_shard in shard(
+                           seeds, workers * SHARDS_PER_WORKER)]
+            while len(collected) < expected:
+                try:
+                    result = results.get(timeout=0.2)
+                except queue.Empty:
+                    # A worker that failed will never send its results
+                    for future in futures:
+                        if future.done() and future.exception():
+                            raise future.exception()
+                    continue
+                collected.append(result)
+                if on_result is not None:
+                    on_result(result)
+    return collected
+
+
+def mean_ci(values):
+    """Return the mean and the half-width of its 95% confidence interval"""
+    count = len(values)
+    mean = sum(values) / count
+    if count < 2:
+        return mean, 0.0
+    variance = sum((value - mean) ** 2 for value in values) / (count - 1)
+    return mean, Z_95 * math.sqrt(variance / count)
+
+
+def summarize(specs, results):
+    """Return per-agent means with 95% confidence intervals and causes"""
+    summary = {}
+    for spec in specs:
+        games = [result for result in results if result["agent"] == spec]
+        causes = {}
+        for game in games:
+            causes[game["cause"]] = causes.get(game["cause"], 0) + 1
+        summary[spec] = {
+            "games": len(games),
+            "score": mean_ci([game["score"] for game in games]),
+            "length": mean_ci([game["length"] for game in games]),
+            "ticks": mean_ci([game["ticks"] for game in games]),
+            "causes": causes,
+        }
+    return summary
+
+
+def elo_ratings(specs, results):
+    """Rate the agents by Elo over head-to-head games on the same seed
+
+    On every seed each pair of agents is one match, won by the higher
+    score. Matches are rated in seed order, so the ratings do not depend
+    on the order the workers finished in.
+    """
+    ratings = {spec: ELO_START for spec in specs}
+    by_seed = {}
+    for result in results:
+        by_seed.setdefault(result["seed"], {})[result["agent"]] = result["score"]
+    for seed in sorted(by_seed):
+        scores = by_seed[seed]
+        for index, first in enumerate(specs):
+            for second in specs[index + 1:]:
+                if first not in scores or second not in scores:
+                    continue
+                outcome = (1.0 if scores[first] > scores[second] else
+                           0.0 if scores[first] < scores[second] else 0.5)
+                expected = 1.0 / (1.0 + 10 ** (
+                    (ratings[second] - ratings[first]) / 400))
+                change = ELO_K * (outcome - expected)
+                ratings[first] += change
+                ratings[second] -= change
+    return ratings
+
+
+def format_table(summary, ratings):
+    """Return the standings as a text table, best rated first"""
+    width = max([len(spec) for spec in summary] + [len("agent")]) + 2
+    lines = [f"{'agent':<{width}}{'elo':>7}{'games':>8}{'score':>18}"
+             f"{'length':>18}{'ticks':>20}  deaths"]
+    for spec in sorted(summary, key=lambda spec: -ratings[spec]):
+        row = summary[spec]
+        causes = ", ".join(f"{cause} {count}" for cause, count
+                           in sorted(row["causes"].items()))
+        lines.append(
+            f"{spec:<{width}}{ratings[spec]:>7.0f}{row['games']:>8}"
+            f"{'%.1f ± %.1f' % row['score']:>18}"
+            f"{'%.1f ± %.1f' % row['length']:>18}"
+            f"{'%.0f ± %.0f' % row['ticks']:>20}  {causes}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare snake agents over many seeded headless games")
+    parser.add_argument("--agents", default="greedy,bfs,hamiltonian",
+                        help="comma-separated agent names or module:Class")
+    parser.add_argument("--games", type=int, default=200,
+                        help="seeds to play; each agent plays every one")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="first seed; games use seed, seed + 1, ...")
+    parser.add_argument("--grid", type=parse_grid, default=(40, 30),
+                        help="board size such as 40x30")
+    parser.add_argument("--difficulty", default=None,
+                        choices=["easy", "normal", "hard", "expert"])
+    parser.add_argument("--tick-rate", type=int, default=10)
+    parser.add_argument("--max-ticks", type=int, default=20000,
+                        help="games still running after this many ticks "
+                             "end as a timeout")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes; one per core if unset")
+    parser.add_argument("--output", default=None,
+                        help="JSON file to write the summary and every game to")
+    args = parser.parse_args(argv)
+
+    specs = [spec.strip() for spec in args.agents.split(",") if spec.strip()]
+    if not specs or args.games < 1:
+        parser.error("need at least one agent and one game")
+    try:
+        for spec in specs:
+            load_agent(spec)
+    except ValueError as e:
+        parser.error(str(e))
+
+    settings = {"grid_width": args.grid[0], "grid_height": args.grid[1],
+                "difficulty": args.difficulty, "tick_rate": args.tick_rate}
+    seeds = list(range(args.seed, args.seed + args.games))
+    expected = len(seeds) * len(specs)
+    start = time.perf_counter()
+    finished = []
+
+    def progress(result):
+        finished.append(result)
+        if len(finished) % 100 == 0 or len(finished) == expected:
+            elapsed = time.perf_counter() - start
+            print(f"{len(finished):,}/{expected:,} games, "
+                  f"{len(finished) / elapsed:,.1f} games/s", file=sys.stderr)
+
+    results = run_tournament(specs, seeds, settings, args.max_ticks,
+                             args.workers, progress)
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(specs, results)
+    ratings = elo_ratings(specs, results)
+    print(format_table(summary, ratings))
+    print(f"{expected:,} games in {elapsed:.1f}s with "
+          f"{args.workers or os.cpu_count() or 1} workers")
+
+    if args.output:
+        report = {
+            "environment": environment(),
+            "config": {"agents": specs, "first_seed": args.seed,
+                       "games": args.games, "settings": settings,
+                       "max_ticks": args.max_ticks},
+            "seconds": elapsed,
+            "elo": ratings,
+            "summary": summary,
+            "games": sorted(results, key=lambda result: (
+                result["seed"], specs.index(result["agent"]))),
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,44 +1,87 @@
 from kivy.app import App
 from kivy.clock import Clock
-from kivy.graphics import Color, Rectangle, Line
+from kivy.graphics import Color, Rectangle, Line, PushMatrix, PopMatrix, Translate
 from kivy.uix.widget import Widget
 from kivy.core.window import Window
 from kivy.uix.label import Label
-from kivy.animation import Animation
-from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.graphics.instructions import InstructionGroup
 from kivy.metrics import dp
-from kivy.storage.jsonstore import JsonStore
+# Modules only the overlays use, such as kivy.animation and FloatLayout,
+# are imported where the overlays are built, off the startup path
 import os
+import time
 import datetime
 import random
+import numpy as np
+from functools import partial
+from .engine import GameEngine, ReplayWriter
+from .engine.agents import GreedyAgent
+from .engine.replay import EXTENSION as REPLAY_EXTENSION, prune_replays
 from .snake import Snake
 from .food import Food
 from .obstacle import Obstacle
+from .renderer import GameRenderer
+from .particles import ParticleSystem
+from .timeline import Timeline
+from .profiler import FrameProfiler
+from .persistence import WriteBehindStore
+from .startup import startup
+from .hud import HudText
+
+# Most simulation steps a single frame may run to catch up after a stall
+MAX_CATCH_UP_STEPS = 5
+
+# Seconds of each frame spent stepping in turbo mode; the rest of the
+# frame is left for drawing the board once at the last tick
+TURBO_FRAME_BUDGET = 1.0 / 120
+
+# Seconds between refreshes of the turbo ticks/s and frames/s readout
+TURBO_STATS_INTERVAL = 0.5
+
+# Every game is recorded here; only the newest MAX_REPLAYS are kept
+REPLAY_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'replays')
+MAX_REPLAYS = 50
+
+# Choices offered in the settings menu
+GRID_SIZES = [('Small', 30), ('Medium', 20), ('Large', 15)]
+DIFFICULTIES = ['easy', 'normal', 'hard', 'expert']
+
+# Highlight of the chosen button of each setting
+SETTING_COLORS = {
+    'grid_size': (0.3, 0.3, 0.8, 1),
+    'game_speed': (0.3, 0.8, 0.3, 1),
+    'difficulty': (0.8, 0.3, 0.3, 1),
+}
 
 
 class SnakeGame(Widget):
     # Class variable to store the instance
     _instance = None
 
-    def __init__(self, **kwargs):
+    def __init__(self, replay=None, **kwargs):
         super(SnakeGame, self).__init__(**kwargs)
         # Store reference to instance
         SnakeGame._instance = self
 
+        # A Replay to play back instead of a game to play
+        self.replay = replay
+        self.replay_player = None
+
         # Create data directory if it doesn't exist
         data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
 
-        # Configurable game settings
-        self.config_store = JsonStore(os.path.join(
-            os.path.dirname(__file__), '..', 'data', 'config.json'))
+        # Configurable game settings. Stores write on a background thread,
+        # so saving never stalls a frame
+        with startup.phase("config"):
+            self.config_store = WriteBehindStore(os.path.join(
+                os.path.dirname(__file__), '..', 'data', 'config.json'))
 
-        # Load or set default game configuration
-        self.load_game_config()
+            # Load or set default game configuration
+            self.load_game_config()
 
         # Game settings
         self.grid_size = self.config['grid_size']
@@ -56,41 +99,81 @@ class SnakeGame(Widget):
             self.config['game_speed'] = self.game_speed
             self.save_game_config()
 
+        # A replay is shown on its own board at its own speed, with the
+        # cells made as large as the window allows
+        if replay is not None:
+            self.grid_width = replay.settings['grid_width']
+            self.grid_height = replay.settings['grid_height']
+            self.grid_size = min(Window.width // self.grid_width,
+                                 Window.height // self.grid_height)
+            self.game_speed = replay.settings['tick_rate']
+
+        # Game time runs at time_scale times game_speed; None is turbo
+        # mode, which steps as fast as frames allow
+        self.time_scale = 1
+        self.turbo_ticks = 0
+        self.turbo_frames = 0
+        self.turbo_elapsed = 0.0
+
+        # Agent steering the snake instead of the keyboard, or None. A game
+        # the autopilot played any part of is assisted until the next one
+        # starts, and is kept out of the high score and score history
+        self.autopilot = None
+        self.assisted = False
+
         # Rest of your initialization code...
 
         # Update the speed settings in your settings menu if present
         self.speed_settings = [
             ('Very Slow', 3), ('Slow', 5), ('Normal', 7), ('Fast', 10), ('Insane', 15)]
 
-        # Schedule updates at the configured speed
-        self.update_event = Clock.schedule_interval(
-            self.update, 1.0 / self.game_speed)
-
         # Score tracking enhancements
-        self.score = 0
-        self.high_score = self.load_high_score()
-        self.combo_counter = 0
-        self.combo_timer = None
-        self.combo_multiplier = 1.0
+        with startup.phase("score store"):
+            self.score_store = WriteBehindStore(os.path.join(
+                os.path.dirname(__file__), '..', 'data', 'scores.json'))
+            self.high_score = self.load_high_score()
         self.points_history = []
-        self.score_store = JsonStore(os.path.join(
-            os.path.dirname(__file__), '..', 'data', 'scores.json'))
 
-        # Rest of your initialization code...
-        self.snake = Snake(self.grid_size, self.grid_width, self.grid_height)
-        self.food = Food(self.grid_size, self.grid_width, self.grid_height)
-        self.obstacle = Obstacle(
-            self.grid_size, self.grid_width, self.grid_height)
+        # The score history and leaderboard are not needed until a game
+        # ends, so they are opened on first use rather than before the
+        # first frame
+        self._score_history = None
+        self._leaderboard = None
+        self.leaderboard_checked = False
+
+        # One timeline runs every in-game animation, ticked once per frame
+        self.timeline = Timeline()
+
+        # Frame phase timings, shown and recorded once toggled with F3
+        self.profiler = FrameProfiler()
+        self.profiler_refresh = 0.0
 
-        # Generate initial obstacles
-        self.obstacle.generate_obstacles(
-            self.snake.body + [self.food.position])
+        # Debris and sparks are drawn over the board but under the HUD
+        with startup.phase("particles"):
+            self.particles = ParticleSystem(self.canvas, profiler=self.profiler)
+
+        # The engine owns the snake, food and obstacles and applies the
+        # game rules; this widget only renders it and handles input
+        with startup.phase("engine"):
+            self.engine = self.create_engine()
+        self.queued_direction = None
+
+        # The board is drawn below the widget's own canvas so that overlays
+        # added to it stay on top
+        with startup.phase("renderer"):
+            self.renderer = GameRenderer(self.canvas.before, self.profiler)
 
         # Game state
-        self.level = 1
-        self.level_threshold = 5  # Score needed to advance level
         self.game_over = False
         self.paused = False
+        self.resetting = False  # The game over screen is fading out
+
+        # Overlays are built the first time they are shown and then kept,
+        # so opening one again only updates the text that changed
+        self.pause_overlay = None
+        self.settings_overlay = None
+        self.game_over_overlay = None
+        self.stats_overlay = None
 
         # Add last eaten food display
         self.last_food_name = None
@@ -99,8 +182,26 @@ class SnakeGame(Widget):
         self._keyboard = Window.request_keyboard(self._keyboard_closed, self)
         self._keyboard.bind(on_key_down=self._on_keyboard_down)
 
+        with startup.phase("hud"):
+            self.create_hud()
+
+        if replay is not None:
+            from .replay_player import ReplayPlayer
+            self.replay_player = ReplayPlayer(self, replay)
+
+        # The game loop runs once per frame; the simulation itself steps at
+        # game_speed ticks per second of real time
+        self.accumulator = 0.0
+        self.update_event = Clock.schedule_interval(self.update, 0)
+
+        # A configured leaderboard starts sending any scores queued while it
+        # was offline once the game is up and running
+        Clock.schedule_once(self.start_leaderboard, 2)
+
+    def create_hud(self):
+        """Create the score, level and profiler labels and settings button"""
         # Enhanced score label with high score
-        self.score_label = Label(
+        self.score_label = HudText(
             text=f"Score: {self.score} | High Score: {self.high_score}",
             font_size='18sp',
             pos=(10, Window.height - 30),
@@ -109,7 +210,7 @@ class SnakeGame(Widget):
         self.add_widget(self.score_label)
 
         # Combo multiplier label
-        self.combo_label = Label(
+        self.combo_label = HudText(
             text="",
             font_size='16sp',
             pos=(10, Window.height - 55),
@@ -118,7 +219,7 @@ class SnakeGame(Widget):
         self.add_widget(self.combo_label)
 
         # Food info label
-        self.food_label = Label(
+        self.food_label = HudText(
             text="",
             font_size='16sp',
             pos=(10, Window.height - 80),
@@ -127,7 +228,7 @@ class SnakeGame(Widget):
         self.add_widget(self.food_label)
 
         # Level label
-        self.level_label = Label(
+        self.level_label = HudText(
             text=f"Level: {self.level}",
             font_size='18sp',
             pos=(Window.width - 100, Window.height - 30),
@@ -140,17 +241,43 @@ class SnakeGame(Widget):
             orientation='horizontal',
             spacing=dp(5),
             size_hint=(None, None),
-            size=(dp(150), dp(30)),
-            pos=(Window.width - 160, Window.height - 60)
+            size=(dp(175), dp(30)),
+            pos=(Window.width - dp(180), Window.height - 60)
         )
         self.add_widget(self.score_history_widget)
 
-        # Schedule the update at the configured speed
-        self.update_event = Clock.schedule_interval(
-            self.update, 1.0 / self.game_speed)
+        # A fixed set of chips, refilled as points come in
+        self.score_chips = []
+        for _ in range(5):
+            chip = HudText(
+                font_size='14sp',
+                halign='center',
+                size_hint=(None, None),
+                size=(dp(30), dp(30))
+            )
+            self.score_chips.append(chip)
+            self.score_history_widget.add_widget(chip)
+
+        # Banners are made once and faded in and out
+        self.high_score_banner = HudText(
+            text="NEW HIGH SCORE!",
+            font_size='24sp',
+            halign='center',
+            color=(1, 0.8, 0, 1),
+            opacity=0
+        )
+        self.add_widget(self.high_score_banner)
+
+        self.level_up_banner = HudText(
+            font_size='40sp',
+            halign='center',
+            color=(1, 1, 0, 1),  # Yellow
+            opacity=0
+        )
+        self.add_widget(self.level_up_banner)
 
         # Add a settings button in the corner
-        settings_button = Button(
+        self.settings_button = settings_button = Button(
             text="⚙️",
             font_size='22sp',
             size_hint=(None, None),
@@ -161,11 +288,113 @@ class SnakeGame(Widget):
         settings_button.bind(on_press=lambda x: self.open_settings())
         self.add_widget(settings_button)
 
+        # Turbo mode readout, shown while the simulation runs uncapped
+        self.turbo_label = HudText(
+            font_size='16sp',
+            halign='center',
+            size_hint=(None, None),
+            color=(0.5, 1, 1, 1),
+            opacity=0
+        )
+        self.add_widget(self.turbo_label)
+
+        # Profiler overlay, hidden until F3 turns the profiler on
+        self.profiler_label = Label(
+            text="",
+            font_size='12sp',
+            halign='left',
+            valign='bottom',
+            size_hint=(None, None),
+            size=(dp(360), dp(220)),
+            pos=(10, 10),
+            color=(0.6, 1, 0.6, 1),
+            opacity=0
+        )
+        self.profiler_label.bind(size=self.profiler_label.setter('text_size'))
+        self.add_widget(self.profiler_label)
+
+        # Widgets that stay on screen from one game to the next
+        self.hud_widgets = [
+            self.score_label, self.combo_label, self.food_label,
+            self.level_label, self.score_history_widget,
+            self.high_score_banner, self.level_up_banner,
+            self.settings_button, self.turbo_label, self.profiler_label]
+        self.reposition_ui_elements()
+
     @classmethod
     def get_running_instance(cls):
         """Get the currently running game instance"""
         return cls._instance
 
+    def create_engine(self):
+        """Create the rules engine with Kivy-drawn game objects"""
+        if self.replay is not None:
+            return self.replay.create_engine(**self.engine_factories())
+
+        # The recorder is handed to the engine up front so that it sees
+        # the keyframe taken when the game starts. Games the autopilot
+        # starts are not recorded; in turbo mode they are over in moments
+        seed = random.getrandbits(64)
+        settings = {"grid_width": self.grid_width,
+                    "grid_height": self.grid_height,
+                    "difficulty": self.config.get('difficulty'),
+                    "tick_rate": self.game_speed}
+        recorder = None
+        if self.autopilot is None:
+            recorder = self.create_replay_writer(seed, settings)
+        return GameEngine(seed=seed, recorder=recorder, **settings,
+                          **self.engine_factories())
+
+    def engine_factories(self):
+        """Factories making the Kivy-drawn snake, food and obstacles"""
+        return {
+            "snake_factory": partial(Snake, self.grid_size,
+                                     timeline=self.timeline),
+            "food_factory": partial(Food, self.grid_size,
+                                    timeline=self.timeline,
+                                    particles=self.particles),
+            "obstacle_factory": partial(Obstacle, self.grid_size),
+        }
+
+    def create_replay_writer(self, seed, settings):
+        """Start recording a game, unless replays are turned off"""
+        if not self.config.get('record_replays', True):
+            return None
+        try:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            prune_replays(REPLAY_DIR, MAX_REPLAYS - 1)
+            name = (datetime.datetime.now().strftime("%Y%m%d-%H%M%S") +
+                    f"-{seed:016x}" + REPLAY_EXTENSION)
+            return ReplayWriter(os.path.join(REPLAY_DIR, name),
+                                seed, settings)
+        except OSError as e:
+            print(f"Error starting replay: {e}")
+            return None
+
+    @property
+    def snake(self):
+        return self.engine.snake
+
+    @property
+    def food(self):
+        return self.engine.food
+
+    @property
+    def obstacle(self):
+        return self.engine.obstacle
+
+    @property
+    def score(self):
+        return self.engine.score
+
+    @property
+    def level(self):
+        return self.engine.level
+
+    @property
+    def combo_multiplier(self):
+        return self.engine.combo_multiplier
+
     def load_high_score(self):
         """Load high score from storage"""
         try:
@@ -182,102 +411,121 @@ class SnakeGame(Widget):
         except:
             pass
 
-    def save_score_history(self):
-        """Save current score to history"""
+    @property
+    def score_history(self):
+        """Every finished game, opened the first time it is needed"""
+        if self._score_history is None:
+            from .score_history import ScoreHistory
+            self._score_history = ScoreHistory(os.path.join(
+                os.path.dirname(__file__), '..', 'data', 'scores.db'))
+            self.import_json_history()
+        return self._score_history
+
+    @property
+    def leaderboard(self):
+        """Client for the configured leaderboard, or None without one"""
+        if not self.leaderboard_checked:
+            self.leaderboard_checked = True
+            self._leaderboard = self.create_leaderboard_client()
+        return self._leaderboard
+
+    def start_leaderboard(self, *args):
+        """Open the leaderboard connection now rather than at game over"""
+        return self.leaderboard
+
+    def import_json_history(self):
+        """Move the last scores kept in scores.json into the history once"""
         try:
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            # Get existing history or create new
             if self.score_store.exists('history'):
-                history = self.score_store.get('history')['scores']
-            else:
-                history = []
+                self._score_history.import_json_history(
+                    self.score_store.get('history')['scores'])
+        except Exception as e:
+            print(f"Error importing score history: {e}")
 
-            # Add new score entry
-            history.append({
-                'score': self.score,
-                'level': self.level,
-                'timestamp': timestamp
-            })
+    def create_leaderboard_client(self):
+        """Connect to the leaderboard named in the config, if there is one"""
+        address = self.config.get('leaderboard')
+        if not address:
+            return None
+        try:
+            from .leaderboard import LeaderboardClient
+            return LeaderboardClient(
+                address,
+                os.path.join(os.path.dirname(__file__), '..', 'data',
+                             'leaderboard_queue.json'),
+                kiosk=self.config.get('kiosk'))
+        except Exception as e:
+            print(f"Error starting leaderboard client: {e}")
+            return None
+
+    def flush_stores(self, wait=False):
+        """Write pending score and config changes to disk now"""
+        self.score_store.flush(wait)
+        self.config_store.flush(wait)
+        if self.engine.recorder:
+            self.engine.recorder.flush()
+
+    def close_stores(self):
+        """Write everything pending and stop the store writers"""
+        self.score_store.close()
+        self.config_store.close()
+        if self.engine.recorder:
+            self.engine.recorder.close()
+        if self._score_history:
+            self._score_history.close()
+        if self._leaderboard:
+            self._leaderboard.close()
 
-            # Keep only last 10 scores
-            if len(history) > 10:
-                history = history[-10:]
+    def save_score_history(self):
+        """Append the finished game to the score history"""
+        if self.assisted:
+            return
+        try:
+            self.score_history.add(
+                self.score, self.level, len(self.snake.body),
+                self.engine.death_cause)
+        except Exception as e:
+            print(f"Error saving score history: {e}")
 
-            # Save updated history
-            self.score_store.put('history', scores=history)
-        except:
-            pass
+        if self.leaderboard:
+            self.leaderboard.submit(
+                self.score, self.level, len(self.snake.body),
+                self.engine.death_cause)
 
-    def update_combo_multiplier(self, reset=False):
-        """Update the combo multiplier and UI"""
+    def update_combo_display(self, reset=False):
+        """Show the engine's combo multiplier"""
         if reset:
-            self.combo_counter = 0
-            self.combo_multiplier = 1.0
             self.combo_label.text = ""
-            if self.combo_timer:
-                self.combo_timer.cancel()
-                self.combo_timer = None
             return
 
-        # Increase combo counter
-        self.combo_counter += 1
-
-        # Calculate multiplier (caps at 3.0x)
-        if self.combo_counter >= 5:
-            self.combo_multiplier = min(
-                3.0, 1.0 + (self.combo_counter - 5) * 0.2 + 1.0)
-        elif self.combo_counter >= 3:
-            self.combo_multiplier = 2.0
-        else:
-            self.combo_multiplier = 1.0
-
         # Update combo label with animation
         self.combo_label.text = f"Combo: x{self.combo_multiplier:.1f}"
 
         if self.combo_multiplier > 1.0:
             # Flash the combo text for visual feedback
             self.combo_label.color = (1, 0.6, 0, 1)  # Bright gold
-            anim = Animation(color=(1, 0.8, 0, 1), duration=0.3)
-            anim.start(self.combo_label)
 
             # Make label slightly larger then back to normal
-            self.combo_label.font_size = '18sp'
-            size_anim = Animation(font_size='16sp', duration=0.3)
-            size_anim.start(self.combo_label)
-
-        # Reset combo timer
-        if self.combo_timer:
-            self.combo_timer.cancel()
-
-        # Combo expires after 3 seconds
-        self.combo_timer = Clock.schedule_once(
-            lambda dt: self.expire_combo(), 3.0)
-
-    def expire_combo(self):
-        """Reset combo when timer expires"""
-        self.update_combo_multiplier(reset=True)
+            self.combo_label.scale = 18 / 16
+            self.timeline.tween(self.combo_label, 0.3,
+                                color=(1, 0.8, 0, 1), scale=1.0)
 
-    def update_score_history_visual(self, points):
+    def update_score_history_visual(self, points=None):
         """Update the visual display of recent points scored"""
         # Add the points to history
-        self.points_history.append(points)
-        if len(self.points_history) > 5:
-            self.points_history.pop(0)
-
-        # Recreate the visual display
-        self.score_history_widget.clear_widgets()
-
-        for point in self.points_history:
-            # Create a label for each recent score
-            point_label = Label(
-                text=f"+{point}",
-                font_size='14sp',
-                color=self.get_points_color(point),
-                size_hint=(None, None),
-                size=(dp(30), dp(30))
-            )
-            self.score_history_widget.add_widget(point_label)
+        if points is not None:
+            self.points_history.append(points)
+            if len(self.points_history) > 5:
+                self.points_history.pop(0)
+
+        # Refill the chips, blanking those without points yet
+        for index, chip in enumerate(self.score_chips):
+            if index < len(self.points_history):
+                point = self.points_history[index]
+                chip.text = f"+{point}"
+                chip.color = self.get_points_color(point)
+            else:
+                chip.text = ""
 
     def get_points_color(self, points):
         """Return a color based on points value"""
@@ -290,139 +538,253 @@ class SnakeGame(Widget):
         else:  # Basic score
             return (0, 0.8, 0, 1)  # Green
 
-    # Fix for the game ending when eating food
-
     def update(self, dt):
+        """Run one frame, timing its phases while the profiler is on"""
+        profiler = self.profiler
+        profiler.begin_frame(dt)
+        self.run_frame(dt)
+        profiler.end_frame()
+
+        if self.time_scale is None:
+            self.update_turbo_stats(dt)
+        if self.replay_player is not None:
+            self.replay_player.update_label()
+
+        if profiler.enabled:
+            self.update_profiler_overlay(dt)
+
+    def run_frame(self, dt):
+        """Run one frame: animations, fixed simulation steps, then drawing"""
+        profiler = self.profiler
+        with profiler.phase("timeline"):
+            self.timeline.tick(dt)
+        if not self.paused:
+            self.particles.update(dt)
         if self.paused or self.game_over:
             return
 
-        # Update snake's visual positions for smooth movement
-        # Use a fixed interpolation factor (0.2 = smooth, 1.0 = instant)
-        self.snake.update_visual_positions(0.2)
-
-        # Only move the snake on certain frames for smoother animation
-        self.current_frame = getattr(self, 'current_frame', 0) + 1
-        movement_interval = 3  # Move every 3rd frame
-
-        if self.current_frame % movement_interval == 0:
-            # Move the snake
-            self.snake.move()
-
-            # Get the head position AFTER moving
-            head_pos = self.snake.get_head_position()
-
-            # First check if food was eaten (before checking death conditions)
-            food_eaten = False
-            if head_pos == self.food.position:
-                food_eaten = True
-                # Handle food consumption
-                self.handle_food_consumed()
-
-            # Check for death conditions ONLY if we didn't eat food
-            # This prevents false collision detection when the snake grows
-            if not food_eaten:
-                # Check for collision with self
-                if not self.snake.is_alive:
-                    self.game_over = True
-                    self.display_game_over()
+        if self.time_scale is None:
+            # Turbo: step until the frame's budget is spent and draw only
+            # the last tick; the HUD catches up once per frame
+            deadline = time.perf_counter() + TURBO_FRAME_BUDGET
+            steps = 0
+            with profiler.phase("simulation"):
+                while time.perf_counter() < deadline:
+                    steps += 1
+                    if not self.step_game():
+                        break
+            profiler.count("steps", steps)
+            self.turbo_ticks += steps
+            if self.game_over:
+                return
+            self.update_hud()
+            self.accumulator = 0.0
+            # The snake is drawn where the last tick left it
+            alpha = 1.0
+        else:
+            # Time is spent in whole simulation steps; a stall beyond a few
+            # steps is dropped instead of fast-forwarding the snake into a
+            # wall
+            step_time = 1.0 / (self.game_speed * self.time_scale)
+            self.accumulator += dt
+            steps = 0
+            while self.accumulator >= step_time:
+                if steps == MAX_CATCH_UP_STEPS * self.time_scale:
+                    self.accumulator %= step_time
+                    break
+                self.accumulator -= step_time
+                steps += 1
+                profiler.count("steps")
+                with profiler.phase("simulation"):
+                    alive = self.step_game()
+                if not alive:
                     return
+            # Draw the snake part way through its move by the leftover time
+            alpha = self.accumulator / step_time
 
-                # Check for collision with obstacles
-                if self.obstacle.check_collision(head_pos):
-                    self.snake.is_alive = False
-                    self.game_over = True
-                    self.display_game_over()
-                    return
+        with profiler.phase("interpolate"):
+            self.snake.interpolate(alpha)
 
-        # Redraw everything every frame for smooth animation
-        self.canvas.clear()
-        self.draw_grid()
-        self.obstacle.draw(self.canvas)
-        self.food.draw(self.canvas)
-        self.snake.draw(self.canvas)
+        # Only the parts of the board that changed are redrawn
+        self.renderer.render(self)
 
-    # Add this new method to handle food consumption logic
-    def handle_food_consumed(self):
-        """Handle all logic when food is consumed"""
-        # Get base points for this food
-        base_points = self.food.get_points()
+    def update_profiler_overlay(self, dt):
+        """Show rolling frame percentiles, refreshed a few times a second"""
+        self.profiler_refresh -= dt
+        if self.profiler_refresh > 0:
+            return
+        self.profiler_refresh = 0.25
+
+        lines = ["phase ms            p50     p95     p99"]
+        for name, values in sorted(self.profiler.percentiles().items()):
+            p50, p95, p99 = values
+            lines.append(f"{name:<18}{p50:>7.2f} {p95:>7.2f} {p99:>7.2f}")
+        lines.append("F3 hide | F4 export")
+        self.profiler_label.text = "\n".join(lines)
+
+    def toggle_profiler(self):
+        """Turn frame profiling and its overlay on or off"""
+        enabled = self.profiler.toggle()
+        self.profiler_label.opacity = 1 if enabled else 0
+        self.profiler_refresh = 0.0
+        if not enabled:
+            self.profiler_label.text = ""
+
+    def export_profile(self):
+        """Dump the recorded frames to JSON and CSV files in data/"""
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = os.path.join(os.path.dirname(__file__), '..', 'data',
+                            f'profile_{stamp}')
+        try:
+            frames = self.profiler.export(base + '.json')
+            self.profiler.export(base + '.csv')
+            print(f"Wrote {frames} frame records to {base}.json/.csv")
+        except Exception as e:
+            print(f"Error exporting profile: {e}")
+
+    def step_game(self):
+        """Advance the rules by one tick, returning False on game over"""
+        # Advance the rules by one tick with the latest input, or the
+        # recorded turn when playing a replay
+        if self.replay_player is not None:
+            action = self.replay_player.action_for(self.engine.tick + 1)
+        elif self.autopilot is not None:
+            action = self.autopilot.act(self.engine)
+        else:
+            action = self.queued_direction
+        result = self.engine.step(action)
+        self.queued_direction = None
+
+        if self.time_scale is None:
+            # In turbo mode the HUD is refreshed once per frame instead
+            if result.ate:
+                self.snake.add_food_color(result.food_type["color"])
+        else:
+            if result.combo_expired:
+                self.update_combo_display(reset=True)
+
+            if result.ate:
+                self.handle_food_consumed(result)
+
+        if self.replay_player is not None:
+            # A replay stops where the recording does, even if cut short
+            if not result.alive or self.engine.tick >= self.replay.last_tick:
+                self.game_over = True
+                self.replay_player.finish()
+                return False
+            return True
 
-        # Apply combo multiplier
-        actual_points = int(base_points * self.combo_multiplier)
+        if not result.alive:
+            if self.autopilot is not None:
+                # The autopilot plays on, like an attract mode
+                self.next_autopilot_game()
+                return True
+            self.game_over = True
+            self.display_game_over()
+            return False
+        return True
+
+    def next_autopilot_game(self):
+        """Start the autopilot's next game at once, with no game over screen"""
+        self.particles.clear()
+        self.points_history = []
+        self.update_score_history_visual()
+        self._complete_game_reset()
+        self.autopilot.reset(self.engine)
+        self.update_hud()
+
+    def set_time_scale(self, time_scale):
+        """Run game time time_scale times faster; None turns on turbo mode"""
+        self.time_scale = time_scale
+        self.accumulator = 0.0
+        self.turbo_ticks = 0
+        self.turbo_frames = 0
+        self.turbo_elapsed = 0.0
+        self.turbo_label.text = "TURBO"
+        self.turbo_label.opacity = 1 if time_scale is None else 0
+
+    def toggle_turbo(self):
+        """Switch turbo mode, letting the autopilot drive while it is on"""
+        if self.time_scale is None:
+            self.set_time_scale(1)
+            return
+        if self.autopilot is None:
+            self.toggle_autopilot()
+        self.set_time_scale(None)
+
+    def toggle_autopilot(self):
+        """Hand the snake to the greedy agent, or take it back"""
+        if self.autopilot is None:
+            self.autopilot = GreedyAgent()
+            self.autopilot.reset(self.engine)
+            self.assisted = True
+        else:
+            self.autopilot = None
+            # Nobody could steer at turbo speed
+            if self.time_scale is None:
+                self.set_time_scale(1)
+
+    def update_turbo_stats(self, dt):
+        """Show the turbo ticks/s and frames/s a couple of times a second"""
+        self.turbo_frames += 1
+        self.turbo_elapsed += dt
+        if self.turbo_elapsed < TURBO_STATS_INTERVAL:
+            return
+        self.turbo_label.text = (
+            f"TURBO {self.turbo_ticks / self.turbo_elapsed:,.0f} ticks/s | "
+            f"{self.turbo_frames / self.turbo_elapsed:.0f} fps")
+        self.turbo_ticks = 0
+        self.turbo_frames = 0
+        self.turbo_elapsed = 0.0
 
-        # Update combo system
-        self.update_combo_multiplier()
+    def handle_food_consumed(self, result):
+        """Update the HUD and snake colors after the engine scored a meal"""
+        actual_points = result.points
 
-        # Add points to score
-        self.score += actual_points
+        # Update combo display
+        self.update_combo_display()
 
         # Update score history visual
         self.update_score_history_visual(actual_points)
 
-        # Check for high score
-        if self.score > self.high_score:
+        # Check for high score; a replay's score was counted when played,
+        # and the autopilot's scores are not the player's
+        if (self.score > self.high_score and self.replay is None and
+                not self.assisted):
             self.high_score = self.score
             self.save_high_score()
             # Visual cue for new high score
-            high_score_notif = Label(
-                text="NEW HIGH SCORE!",
-                font_size='24sp',
-                color=(1, 0.8, 0, 1),
-                center_x=Window.width/2,
-                center_y=Window.height/2 + 50
-            )
-            self.add_widget(high_score_notif)
-            anim = Animation(opacity=0, duration=1.5)
-            anim.bind(
-                on_complete=lambda *args: self.remove_widget(high_score_notif))
-            anim.start(high_score_notif)
+            self.high_score_banner.opacity = 1
+            self.timeline.tween(self.high_score_banner, 1.5, opacity=0)
 
         # Update score label
         self.score_label.text = f"Score: {self.score} | High Score: {self.high_score}"
 
         # Update food info label with multiplier info
-        self.last_food_name = self.food.food_type["name"]
+        self.last_food_name = result.food_type["name"]
         multiplier_text = f" x{self.combo_multiplier:.1f}" if self.combo_multiplier > 1 else ""
         self.food_label.text = f"Yum! {self.last_food_name.capitalize()} +{actual_points} points{multiplier_text}"
 
         # Show animation for the food label
         self.food_label.opacity = 1
-        food_anim = Animation(opacity=0, duration=2.0)
-        food_anim.start(self.food_label)
+        self.timeline.tween(self.food_label, 2.0, opacity=0)
 
         # Update snake color based on food eaten
-        self.snake.add_food_color(self.food.food_type["color"])
+        self.snake.add_food_color(result.food_type["color"])
 
-        # Grow snake BEFORE respawning food to include new head in occupied positions
-        self.snake.grow_snake()
+        # Show the level up if the meal advanced the level
+        if result.level_up:
+            self.show_level_up()
 
-        # Collect ALL occupied positions to avoid spawning food inside snake or obstacles
-        occupied_positions = self.snake.body.copy() + self.obstacle.positions.copy()
-
-        # Debug info to help diagnose issues
-        print(f"Snake body length: {len(self.snake.body)}")
-        print(f"Obstacle count: {len(self.obstacle.positions)}")
-        print(f"Total occupied positions: {len(occupied_positions)}")
-
-        # Respawn food and avoid ALL obstacles
-        self.food.respawn(occupied_positions)
-
-        # Verify food position isn't inside snake or obstacles
-        if self.food.position in self.snake.body or self.food.position in self.obstacle.positions:
-            print(
-                f"WARNING: Food respawned at occupied position: {self.food.position}")
-            # Try again with extra care
-            available = [(x, y)
-                         for x in range(self.grid_width)
-                         for y in range(self.grid_height)
-                         if (x, y) not in occupied_positions]
-
-            if available:
-                self.food.position = random.choice(available)
-
-        # Check if player advances to the next level
-        if self.score >= self.level * self.level_threshold:
-            self.level_up()
+    def update_hud(self):
+        """Show the engine's score, level and combo without any effects"""
+        self.score_label.text = f"Score: {self.score} | High Score: {self.high_score}"
+        self.level_label.text = f"Level: {self.level}"
+        if self.engine.combo_counter:
+            self.combo_label.text = f"Combo: x{self.combo_multiplier:.1f}"
+        else:
+            self.combo_label.text = ""
+        self.food_label.text = ""
 
     # Enhanced game over and restart functionality
 
@@ -430,27 +792,18 @@ class SnakeGame(Widget):
         """Display a visually appealing game over screen with animations and extra details"""
         # Save score to history
         self.save_score_history()
+        self.flush_stores()
 
-        # Create semi-transparent dark overlay
-        self.game_over_bg = InstructionGroup()
-        self.game_over_bg.add(Color(0, 0, 0, 0.8))  # Dark overlay
-        self.game_over_bg.add(
-            Rectangle(pos=(0, 0), size=(Window.width, Window.height)))
-        self.canvas.add(self.game_over_bg)
-
-        # Create container for all game over elements
-        self.game_over_container = FloatLayout()
-
-        # Create main layout
-        game_over_layout = BoxLayout(
-            orientation='vertical',
-            spacing=dp(15),
-            size_hint=(0.5, 0.7),
-            pos_hint={'center_x': 0.5, 'center_y': 0.5}
-        )
+        # The screen is built on the first game over and reused after that;
+        # only the fields below change from one game to the next
+        if self.game_over_overlay is None:
+            self.game_over_overlay = self.build_game_over_overlay()
 
         # Show different messages based on score
-        if self.score > self.high_score * 0.8 and self.score > 10:
+        if self.engine.death_cause == "board_full":
+            message = "BOARD CLEARED!"
+            color = (0.2, 1, 0.2, 1)  # Green
+        elif self.score > self.high_score * 0.8 and self.score > 10:
             message = "IMPRESSIVE!"
             color = (0.2, 1, 0.2, 1)  # Green
         elif self.level > 3:
@@ -459,63 +812,130 @@ class SnakeGame(Widget):
         else:
             message = "GAME OVER"
             color = (1, 0, 0, 1)  # Red
+        labels = self.game_over_labels
+        labels['title'].text = message
+        labels['title'].color = color
+
+        # Death cause
+        death_messages = {
+            "self": "You crashed into yourself!",
+            "obstacle": "You hit an obstacle!",
+            "board_full": "Your snake filled the whole board!"
+        }
+        labels['death'].text = death_messages.get(
+            self.engine.death_cause, "You hit an obstacle!")
+
+        labels['score'].text = f"Final Score: {self.score}"
+
+        # High score with indication if beaten
+        is_new_high = self.score >= self.high_score and not self.assisted
+        labels['high_score'].text = "NEW HIGH SCORE!" if is_new_high else f"High Score: {self.high_score}"
+        labels['high_score'].color = (1, 1, 0, 1) if is_new_high else (0.8, 0.8, 1, 1)
+
+        labels['length'].text = f"Snake Length: {len(self.snake.body)} segments"
+        labels['level'].text = f"Level Reached: {self.level}"
+
+        # Where this game places among every game played
+        if self.assisted:
+            labels['rank'].text = "Autopilot game, not ranked | S - Statistics"
+        else:
+            try:
+                labels['rank'].text = (
+                    f"Rank #{self.score_history.rank(self.score)} of "
+                    f"{self.score_history.count()} games | S - Statistics")
+            except Exception as e:
+                print(f"Error reading score history: {e}")
+                labels['rank'].text = ""
+
+        # Add to game
+        self.game_over_overlay.opacity = 1
+        self.show_overlay(self.game_over_overlay)
+
+        # Add death animation elements - falling segments
+        self.create_death_animation()
+
+        # Animate in the game over screen
+        game_over_layout = self.game_over_layout
+        game_over_layout.opacity = 0
+        game_over_layout.pos_hint = {'center_x': 0.5, 'center_y': 0.6}
+        labels['title'].opacity = 1
+
+        # Sequence of animations
+        self.timeline.tween(game_over_layout, 0.5, opacity=1, pos_hint={
+                            'center_x': 0.5, 'center_y': 0.5})
+
+        # Add cool pulsing animation to title
+        self.timeline.tween(labels['title'], 0.7, delay=0.5, repeat=True,
+                            opacity=0.7)
+
+        # Play game over sound effect if available
+        # self.play_sound('game_over')
+
+    def build_game_over_overlay(self):
+        """Build the game over screen once; display_game_over fills it in"""
+        overlay = self.create_overlay(0.8)
+
+        # Create main layout
+        self.game_over_layout = game_over_layout = BoxLayout(
+            orientation='vertical',
+            spacing=dp(15),
+            size_hint=(0.5, 0.7),
+            pos_hint={'center_x': 0.5, 'center_y': 0.5}
+        )
+
+        # Labels whose text changes every game, by name
+        self.game_over_labels = labels = {}
 
         # Title with dynamic message
-        game_over_title = Label(
-            text=message,
+        labels['title'] = Label(
             font_size='46sp',
-            color=color,
             size_hint=(1, 0.2)
         )
-        game_over_layout.add_widget(game_over_title)
 
         # Death cause
-        death_message = "You crashed into yourself!" if not self.snake.is_alive else "You hit an obstacle!"
-        death_label = Label(
-            text=death_message,
+        labels['death'] = Label(
             font_size='22sp',
             color=(1, 0.5, 0.5, 1),
             size_hint=(1, 0.15)
         )
-        game_over_layout.add_widget(death_label)
 
         # Final score with styling
-        final_score = Label(
-            text=f"Final Score: {self.score}",
+        labels['score'] = Label(
             font_size='32sp',
             color=(1, 0.8, 0, 1),
             size_hint=(1, 0.15)
         )
-        game_over_layout.add_widget(final_score)
 
         # High score with indication if beaten
-        is_new_high = self.score >= self.high_score
-        high_score_text = f"NEW HIGH SCORE!" if is_new_high else f"High Score: {self.high_score}"
-        high_score = Label(
-            text=high_score_text,
+        labels['high_score'] = Label(
             font_size='24sp',
-            color=(1, 1, 0, 1) if is_new_high else (0.8, 0.8, 1, 1),
             size_hint=(1, 0.12)
         )
-        game_over_layout.add_widget(high_score)
 
         # Snake length
-        snake_length = Label(
-            text=f"Snake Length: {len(self.snake.body)} segments",
+        labels['length'] = Label(
             font_size='20sp',
             color=(0.6, 1, 0.6, 1),
             size_hint=(1, 0.12)
         )
-        game_over_layout.add_widget(snake_length)
 
         # Level reached
-        level_reached = Label(
-            text=f"Level Reached: {self.level}",
+        labels['level'] = Label(
             font_size='20sp',
             color=(0.7, 0.7, 1, 1),
             size_hint=(1, 0.12)
         )
-        game_over_layout.add_widget(level_reached)
+
+        # Where this game places among every game played
+        labels['rank'] = Label(
+            font_size='18sp',
+            color=(0.9, 0.9, 0.5, 1),
+            size_hint=(1, 0.1)
+        )
+
+        for name in ('title', 'death', 'score', 'high_score', 'length',
+                     'level', 'rank'):
+            game_over_layout.add_widget(labels[name])
 
         # Button container
         button_layout = BoxLayout(
@@ -557,177 +977,119 @@ class SnakeGame(Widget):
         game_over_layout.add_widget(keyboard_hint)
 
         # Add the main layout to the container
-        self.game_over_container.add_widget(game_over_layout)
-
-        # Add death animation elements - falling segments
-        self.create_death_animation()
-
-        # Add to game
-        self.add_widget(self.game_over_container)
-
-        # Animate in the game over screen
-        game_over_layout.opacity = 0
-        game_over_layout.pos_hint = {'center_x': 0.5, 'center_y': 0.6}
-
-        # Sequence of animations
-        anim1 = Animation(opacity=1, pos_hint={
-                          'center_x': 0.5, 'center_y': 0.5}, duration=0.5)
-
-        # Add cool pulsing animation to title
-        anim2 = Animation(opacity=0.7, duration=0.7) + \
-            Animation(opacity=1, duration=0.7)
-        anim2.repeat = True
-
-        # Start animations
-        anim1.start(game_over_layout)
-        Clock.schedule_once(lambda dt: anim2.start(game_over_title), 0.5)
-
-        # Play game over sound effect if available
-        # self.play_sound('game_over')
+        overlay.add_widget(game_over_layout)
+        return overlay
 
     def create_death_animation(self):
         """Create falling pieces animation when the snake dies"""
-        snake_body = self.snake.body.copy()
-
-        # Create container for debris
-        self.death_debris_container = FloatLayout()
-        self.game_over_container.add_widget(self.death_debris_container)
-
-        # Schedule piece animations
-        for i, segment in enumerate(snake_body):
-            # Create a simple widget for each segment
-            debris = Widget(
-                size_hint=(None, None),
-                size=(self.grid_size, self.grid_size),
-                pos=(segment[0] * self.grid_size, segment[1] * self.grid_size)
-            )
-
-            # Add colored background to the widget
-            with debris.canvas:
-                # Get color from snake's color palette if available
-                if hasattr(self.snake, 'segment_colors') and i < len(self.snake.segment_colors):
-                    Color(*self.snake.segment_colors[i])
-                else:
-                    # Default snake color
-                    Color(0, 0.7, 0, 1)
-                Rectangle(pos=(0, 0), size=debris.size)
-
-            self.death_debris_container.add_widget(debris)
-
-            # Randomized falling animation - without rotation
-            fall_speed = random.uniform(0.5, 1.5)
-            dest_x = debris.x + random.uniform(-100, 100)
-            # Add scale instead of rotation
-            scale_to = random.uniform(0.2, 0.8)
-
-            # Create falling animation - scale down as falling
-            anim = Animation(
-                pos=(dest_x, -50),
-                size=(self.grid_size * scale_to, self.grid_size * scale_to),
-                opacity=0,
-                duration=fall_speed
-            )
-
-            # Start animation with slight delay based on segment position
-            Clock.schedule_once(lambda dt, d=debris,
-                                a=anim: a.start(d), i * 0.02)
+        body = self.snake.body
+        count = len(body)
+        grid_size = self.grid_size
+        rng = np.random.default_rng()
+
+        # Each segment breaks off as one piece of debris in its own color
+        colors = list(self.snake.segment_colors)[:count]
+        colors += [(0, 0.7, 0, 1)] * (count - len(colors))  # Default snake color
+
+        # Pieces pop up, then fall and shrink as they fade, the head first
+        # and the rest of the body within a second
+        life = rng.uniform(0.5, 1.5, count)
+        velocity = np.column_stack((rng.uniform(-100, 100, count) / life,
+                                    rng.uniform(50, 200, count)))
+
+        # Draw the debris over the game over background, under its text
+        self.particles.clear()
+        self.particles.move_to(self.game_over_overlay.canvas)
+        self.particles.emit(
+            (np.array(body, dtype=np.float32) + 0.5) * grid_size,
+            velocity,
+            color=colors,
+            size=grid_size,
+            end_size=grid_size * rng.uniform(0.2, 0.8, count),
+            life=life,
+            delay=np.arange(count) * min(0.02, 1.0 / count),
+            gravity=-900
+        )
 
     def reset_game(self):
         """Reset the game with smooth transitions"""
         # Play reset sound if available
         # self.play_sound('reset')
 
-        # Add a flash effect
-        flash = Rectangle(pos=(0, 0), size=(Window.width, Window.height))
-        with self.canvas:
-            Color(1, 1, 1, 0.3)
-            flash_instruction = Rectangle(
-                pos=(0, 0), size=(Window.width, Window.height))
+        # A second press while the game over screen fades out would start
+        # another reset on top of the first
+        if self.resetting:
+            return
 
-        # Animate flash out
-        def remove_flash(dt):
-            self.canvas.remove(flash_instruction)
+        # Stop every animation of the finished game
+        self.timeline.clear()
+        self.hide_stats_overlay()
 
-        Clock.schedule_once(remove_flash, 0.2)
+        # Add a flash effect, grouped so its color goes away with it
+        flash = InstructionGroup()
+        flash.add(Color(1, 1, 1, 0.3))
+        flash.add(Rectangle(pos=(0, 0), size=(Window.width, Window.height)))
+        self.canvas.add(flash)
+
+        # Animate flash out
+        self.timeline.call_later(0.2, partial(self.canvas.remove, flash))
 
         # Remove game over elements with animation
-        if hasattr(self, 'game_over_container'):
-            anim = Animation(opacity=0, duration=0.3)
-            anim.bind(
-                on_complete=lambda *args: self._complete_game_over_removal())
-            anim.start(self.game_over_container)
+        if self.overlay_shown(self.game_over_overlay):
+            self.resetting = True
+            self.timeline.tween(
+                self.game_over_overlay, 0.3, opacity=0,
+                on_complete=self._complete_game_over_removal)
         else:
             self._complete_game_reset()
 
         # Reset score tracking
-        self.score = 0
-        self.combo_counter = 0
-        self.combo_multiplier = 1.0
         self.points_history = []
-
-        if self.combo_timer:
-            self.combo_timer.cancel()
-            self.combo_timer = None
+        self.update_score_history_visual()
 
         # Update score label
-        self.score_label.text = f"Score: {self.score} | High Score: {self.high_score}"
+        self.score_label.text = f"Score: 0 | High Score: {self.high_score}"
         self.combo_label.text = ""
         self.food_label.text = ""
 
     def _complete_game_over_removal(self):
         """Complete the removal of game over elements"""
-        if hasattr(self, 'game_over_container'):
-            self.remove_widget(self.game_over_container)
-            delattr(self, 'game_over_container')
-
-        if hasattr(self, 'game_over_bg'):
-            self.canvas.remove(self.game_over_bg)
-            delattr(self, 'game_over_bg')
-
+        self.hide_overlay(self.game_over_overlay)
         self._complete_game_reset()
 
     def _complete_game_reset(self):
         """Reset all game elements"""
         # Remove all widgets except permanent UI elements
         for child in self.children[:]:
-            if child not in [self.score_label, self.food_label, self.level_label,
-                             self.combo_label, self.score_history_widget]:
+            if child not in self.hud_widgets:
                 self.remove_widget(child)
 
         # Reset pause state if needed
         if self.paused:
             self.paused = False
-            if hasattr(self, 'pause_layout'):
-                self.remove_widget(self.pause_layout)
-                delattr(self, 'pause_layout')
-            if hasattr(self, 'pause_bg'):
-                self.canvas.remove(self.pause_bg)
-                delattr(self, 'pause_bg')
+            self._complete_pause_removal()
 
         # Reset game state
-        if hasattr(self.snake, 'tongue_animation') and self.snake.tongue_animation:
-            self.snake.tongue_animation.cancel()
-
         if hasattr(self.food, 'cleanup'):
             self.food.cleanup()
+        self.timeline.remove_phase(self.snake.tongue_animation)
+        self.particles.clear()
+        self.particles.move_to(self.canvas)
 
-        # Create new game objects with current grid settings
-        self.snake = Snake(self.grid_size, self.grid_width, self.grid_height)
-        self.food = Food(self.grid_size, self.grid_width, self.grid_height)
-        self.obstacle = Obstacle(
-            self.grid_size, self.grid_width, self.grid_height)
-
-        # Apply difficulty setting to obstacles
-        if hasattr(self, 'config') and 'difficulty' in self.config:
-            self.obstacle.set_difficulty(self.config['difficulty'])
+        # A game abandoned before it ended keeps the turns made so far
+        if self.engine.recorder:
+            self.engine.recorder.close()
 
-        # Generate initial obstacles
-        self.obstacle.generate_obstacles(
-            self.snake.body + [self.food.position])
+        # Create a new engine and game objects with current grid settings
+        self.engine = self.create_engine()
+        self.queued_direction = None
+        self.accumulator = 0.0
 
-        self.level = 1
         self.level_label.text = f"Level: {self.level}"
         self.game_over = False
+        self.resetting = False
+        # Only a game the autopilot starts is assisted from the start
+        self.assisted = self.autopilot is not None
 
         # Update positions of UI elements based on new grid size
         self.reposition_ui_elements()
@@ -748,7 +1110,17 @@ class SnakeGame(Widget):
 
         # Score history visual
         self.score_history_widget.pos = (
-            Window.width - 160, Window.height - 60)
+            Window.width - dp(180), Window.height - 60)
+
+        # Banners span the window, centered a little above the middle
+        self.high_score_banner.size = (Window.width, dp(40))
+        self.high_score_banner.center = (Window.width / 2, Window.height / 2 + 50)
+        self.level_up_banner.size = (Window.width, dp(60))
+        self.level_up_banner.center = (Window.width / 2, Window.height / 2)
+
+        # Turbo readout, centered at the top
+        self.turbo_label.size = (dp(300), dp(24))
+        self.turbo_label.center = (Window.width / 2, Window.height - 20)
 
     def _keyboard_closed(self):
         self._keyboard.unbind(on_key_down=self._on_keyboard_down)
@@ -758,6 +1130,18 @@ class SnakeGame(Widget):
     def _on_keyboard_down(self, keyboard, keycode, text, modifiers):
         key = keycode[1]
 
+        # Profiler controls work in every state
+        if key == 'f3':
+            self.toggle_profiler()
+            return True
+        if key == 'f4':
+            self.export_profile()
+            return True
+
+        # Playback keys come first while a replay plays
+        if self.replay_player is not None and self.replay_player.on_key(key):
+            return True
+
         # Game controls
         if self.game_over:
             if key == 'r':
@@ -767,6 +1151,10 @@ class SnakeGame(Widget):
                 App.get_running_app().stop()
                 return True
 
+        if key == 's' and (self.paused or self.game_over):
+            self.toggle_stats()
+            return True
+
         if key == 'p':
             self.toggle_pause()
             return True
@@ -778,61 +1166,61 @@ class SnakeGame(Widget):
         if self.paused or self.game_over:
             return True
 
-        # Movement controls
+        # A replay has its own speed keys and plays itself
+        if key == 't' and self.replay_player is None:
+            self.toggle_turbo()
+            return True
+        if key == 'a' and self.replay_player is None:
+            self.toggle_autopilot()
+            return True
+
+        # Movement controls are queued and handed to the engine on its next
+        # tick, which rejects 180-degree turns
         if key == 'up':
-            self.snake.change_direction((0, 1))
+            self.queued_direction = (0, 1)
         elif key == 'down':
-            self.snake.change_direction((0, -1))
+            self.queued_direction = (0, -1)
         elif key == 'left':
-            self.snake.change_direction((-1, 0))
+            self.queued_direction = (-1, 0)
         elif key == 'right':
-            self.snake.change_direction((1, 0))
+            self.queued_direction = (1, 0)
 
         return True
 
-    def draw_grid(self):
-        with self.canvas:
-            # Draw background
-            Color(0, 0, 0, 1)  # Black
-            Rectangle(pos=(0, 0), size=(Window.width, Window.height))
-
-            # Draw grid lines (optional)
-            Color(0.2, 0.2, 0.2, 1)  # Dark gray
-            for i in range(self.grid_width + 1):
-                Line(points=[i * self.grid_size, 0,
-                     i * self.grid_size, Window.height])
-            for i in range(self.grid_height + 1):
-                Line(points=[0, i * self.grid_size,
-                     Window.width, i * self.grid_size])
-
-    def level_up(self):
-        self.level += 1
+    def show_level_up(self):
+        """Announce the level the engine just advanced to"""
         self.level_label.text = f"Level: {self.level}"
 
-        # Create a level up notification
-        level_up_label = Label(
-            text=f"LEVEL {self.level}!",
-            font_size='40sp',
-            color=(1, 1, 0, 1),  # Yellow
-            center_x=Window.width/2,
-            center_y=Window.height/2
-        )
-        self.add_widget(level_up_label)
+        # Show the level up notification
+        self.level_up_banner.text = f"LEVEL {self.level}!"
+        self.level_up_banner.opacity = 1
 
         # Animate the notification
-        anim = Animation(opacity=0, duration=1.5)
-        anim.bind(on_complete=lambda *args: self.remove_widget(level_up_label))
-        anim.start(level_up_label)
-
-        # Increase obstacle difficulty
-        self.obstacle.increase_difficulty()
-
-        # Generate new obstacles for the level
-        occupied = self.snake.body + [self.food.position]
-        self.obstacle.generate_obstacles(occupied)
-
-        # Maybe speed up the game slightly?
-        # You could implement this by adjusting the Clock.schedule_interval
+        self.timeline.tween(self.level_up_banner, 1.5, opacity=0)
+
+    def create_overlay(self, shade):
+        """Return a full-window layout drawn over a dark background"""
+        from kivy.uix.floatlayout import FloatLayout
+        overlay = FloatLayout(size=(Window.width, Window.height))
+        with overlay.canvas.before:
+            Color(0, 0, 0, shade)
+            background = Rectangle(pos=(0, 0), size=overlay.size)
+        overlay.bind(size=lambda widget, size: setattr(background, 'size', size))
+        return overlay
+
+    def overlay_shown(self, overlay):
+        return overlay is not None and overlay.parent is not None
+
+    def show_overlay(self, overlay):
+        """Put a cached overlay on top of the game"""
+        overlay.size = (Window.width, Window.height)
+        if overlay.parent is None:
+            self.add_widget(overlay)
+
+    def hide_overlay(self, overlay):
+        """Take a cached overlay off the screen, keeping it for next time"""
+        if self.overlay_shown(overlay):
+            self.remove_widget(overlay)
 
     def toggle_pause(self):
         """Toggle the game's pause state with visual effects"""
@@ -840,22 +1228,36 @@ class SnakeGame(Widget):
 
         if self.paused:
             # Create pause overlay
-            self.create_pause_overlay()
+            self.show_pause_overlay()
+            self.flush_stores()
         else:
             # Remove pause overlay
-            self.remove_pause_overlay()
+            self.hide_stats_overlay()
+            self.hide_pause_overlay()
+
+    def show_pause_overlay(self):
+        """Show the pause overlay, building it the first time"""
+        from kivy.animation import Animation
+        if self.pause_overlay is None:
+            self.pause_overlay = self.build_pause_overlay()
+
+        self.pause_score_label.text = f"Score: {self.score}"
+        self.pause_level_label.text = f"Level: {self.level}"
+        self.show_overlay(self.pause_overlay)
+
+        # Animate the pause menu appearance, taking over from a fade out
+        # that may still be running
+        Animation.cancel_all(self.pause_overlay)
+        self.pause_overlay.opacity = 0
+        anim = Animation(opacity=1, duration=0.3)
+        anim.start(self.pause_overlay)
 
-    def create_pause_overlay(self):
-        """Create a semi-transparent overlay with pause information"""
-        # Create a semi-transparent background
-        self.pause_bg = InstructionGroup()
-        self.pause_bg.add(Color(0, 0, 0, 0.7))  # Semi-transparent black
-        self.pause_bg.add(
-            Rectangle(pos=(0, 0), size=(Window.width, Window.height)))
-        self.canvas.add(self.pause_bg)
+    def build_pause_overlay(self):
+        """Build the pause overlay once; only the score and level change"""
+        overlay = self.create_overlay(0.7)
 
         # Create a vertical layout for pause menu
-        self.pause_layout = BoxLayout(
+        pause_layout = BoxLayout(
             orientation='vertical',
             spacing=dp(20),
             padding=[dp(40)],
@@ -871,38 +1273,36 @@ class SnakeGame(Widget):
             size_hint=(1, 0.3),
             halign='center'
         )
-        self.pause_layout.add_widget(pause_title)
+        pause_layout.add_widget(pause_title)
 
         # Current score
-        score_display = Label(
-            text=f"Score: {self.score}",
+        self.pause_score_label = Label(
             font_size='24sp',
             color=(0.9, 0.9, 0.5, 1),
             size_hint=(1, 0.2),
             halign='center'
         )
-        self.pause_layout.add_widget(score_display)
+        pause_layout.add_widget(self.pause_score_label)
 
         # Current level
-        level_display = Label(
-            text=f"Level: {self.level}",
+        self.pause_level_label = Label(
             font_size='24sp',
             color=(0.7, 0.7, 1, 1),
             size_hint=(1, 0.2),
             halign='center'
         )
-        self.pause_layout.add_widget(level_display)
+        pause_layout.add_widget(self.pause_level_label)
 
         # Game controls info
         controls_info = Label(
-            text="Controls:\nArrow keys - Move snake\nP - Resume game\nR - Restart (when game over)",
+            text="Controls:\nArrow keys - Move snake\nP - Resume game\nS - Statistics\nR - Restart (when game over)",
             font_size='18sp',
             color=(0.8, 0.8, 0.8, 1),
             size_hint=(1, 0.4),
             halign='center',
             valign='middle'
         )
-        self.pause_layout.add_widget(controls_info)
+        pause_layout.add_widget(controls_info)
 
         # Resume button
         resume_button = Button(
@@ -913,33 +1313,94 @@ class SnakeGame(Widget):
             background_color=(0.2, 0.7, 0.2, 1)
         )
         resume_button.bind(on_press=lambda x: self.toggle_pause())
-        self.pause_layout.add_widget(resume_button)
-
-        # Add the layout to the game
-        self.add_widget(self.pause_layout)
+        pause_layout.add_widget(resume_button)
 
-        # Animate the pause menu appearance
-        self.pause_layout.opacity = 0
-        anim = Animation(opacity=1, duration=0.3)
-        anim.start(self.pause_layout)
+        overlay.add_widget(pause_layout)
+        return overlay
 
-    def remove_pause_overlay(self):
+    def hide_pause_overlay(self):
         """Remove the pause overlay with animation"""
-        if hasattr(self, 'pause_layout'):
+        from kivy.animation import Animation
+        if self.overlay_shown(self.pause_overlay):
             # Animate the pause menu disappearance
             anim = Animation(opacity=0, duration=0.2)
             anim.bind(on_complete=lambda *args: self._complete_pause_removal())
-            anim.start(self.pause_layout)
+            anim.start(self.pause_overlay)
 
     def _complete_pause_removal(self):
         """Complete the removal of pause elements after animation"""
-        if hasattr(self, 'pause_layout'):
-            self.remove_widget(self.pause_layout)
-            delattr(self, 'pause_layout')
+        self.hide_overlay(self.pause_overlay)
+
+    def toggle_stats(self):
+        """Show or hide the score statistics over the current screen"""
+        if self.overlay_shown(self.stats_overlay):
+            self.hide_stats_overlay()
+        else:
+            self.show_stats_overlay()
+
+    def stats_text(self):
+        """Summarize the score history with a few indexed queries"""
+        lines = [f"Games played: {self.score_history.count()}", "", "Top scores:"]
+        for position, (score, level, played_at) in enumerate(
+                self.score_history.top(5), 1):
+            lines.append(f"{position}. {score}  (level {level}, {played_at[:16]})")
+
+        best = self.score_history.best_per_level()
+        if best:
+            lines += ["", "Best per level:", "  ".join(
+                f"L{level}: {score}" for level, score in best)]
+
+        daily = self.score_history.daily(7)
+        if daily:
+            lines += ["", "Last days:"]
+            for day, games, best_score, average in daily:
+                lines.append(f"{day}: {games} games, best {best_score}, "
+                             f"avg {average:.1f}")
+        return "\n".join(lines)
+
+    def show_stats_overlay(self):
+        """Show top scores and per-level and daily stats over the screen"""
+        try:
+            text = self.stats_text()
+        except Exception as e:
+            print(f"Error reading score history: {e}")
+            return
+
+        if self.stats_overlay is None:
+            self.stats_overlay = self.build_stats_overlay()
+        self.stats_label.text = text
+        self.show_overlay(self.stats_overlay)
+
+    def build_stats_overlay(self):
+        """Build the statistics overlay once; only its text changes"""
+        overlay = self.create_overlay(0.9)
+        stats_layout = BoxLayout(orientation='vertical', spacing=dp(10))
+        stats_layout.add_widget(Label(
+            text="STATISTICS",
+            font_size='32sp',
+            color=(1, 0.8, 0, 1),
+            size_hint=(1, 0.15)
+        ))
+        self.stats_label = Label(
+            font_size='16sp',
+            color=(0.9, 0.9, 0.9, 1),
+            size_hint=(1, 0.75),
+            halign='center',
+            valign='middle'
+        )
+        stats_layout.add_widget(self.stats_label)
+        stats_layout.add_widget(Label(
+            text="Press 'S' to close",
+            font_size='16sp',
+            color=(0.7, 0.7, 0.7, 1),
+            size_hint=(1, 0.1)
+        ))
+        overlay.add_widget(stats_layout)
+        return overlay
 
-        if hasattr(self, 'pause_bg'):
-            self.canvas.remove(self.pause_bg)
-            delattr(self, 'pause_bg')
+    def hide_stats_overlay(self):
+        """Remove the statistics overlay if it is showing"""
+        self.hide_overlay(self.stats_overlay)
 
     def load_game_config(self):
         """Load or create default game configuration"""
@@ -978,19 +1439,13 @@ class SnakeGame(Widget):
 
     def apply_game_settings(self):
         """Apply the current settings to the game"""
-        # Unschedule current update
-        if hasattr(self, 'update_event'):
-            self.update_event.cancel()
-
         # Apply new grid size and recalculate grid dimensions
         self.grid_size = self.config['grid_size']
         self.grid_width = Window.width // self.grid_size
         self.grid_height = Window.height // self.grid_size
 
-        # Apply new game speed
+        # Apply new game speed; the game loop reads it every frame
         self.game_speed = self.config['game_speed']
-        self.update_event = Clock.schedule_interval(
-            self.update, 1.0 / self.game_speed)
 
         # Rest of your apply settings code...
 
@@ -998,24 +1453,39 @@ class SnakeGame(Widget):
         """Open the settings overlay"""
         if self.paused or self.game_over:
             # Only allow settings when paused or game over
-            self.create_settings_overlay()
+            self.show_settings_overlay()
         else:
             # Pause the game first
             self.toggle_pause()
             # Then open settings
-            self.create_settings_overlay()
+            self.show_settings_overlay()
+
+    def show_settings_overlay(self):
+        """Show the settings menu, building it the first time"""
+        from kivy.animation import Animation
+        if self.settings_overlay is None:
+            self.settings_overlay = self.build_settings_overlay()
+
+        # Highlight the saved choices, since the last visit may have been
+        # cancelled with other buttons picked
+        for key in self.settings_buttons:
+            self.highlight_setting(key)
+        self.show_overlay(self.settings_overlay)
+        self.update_grid_preview()
 
-    def create_settings_overlay(self):
-        """Create the settings menu overlay"""
-        # Create a semi-transparent background
-        self.settings_bg = InstructionGroup()
-        self.settings_bg.add(Color(0, 0, 0, 0.8))  # Semi-transparent black
-        self.settings_bg.add(
-            Rectangle(pos=(0, 0), size=(Window.width, Window.height)))
-        self.canvas.add(self.settings_bg)
+        # Animate the settings panel appearance
+        Animation.cancel_all(self.settings_overlay)
+        self.settings_overlay.opacity = 0
+        anim = Animation(opacity=1, duration=0.3)
+        anim.start(self.settings_overlay)
 
-        # Create main settings container
-        self.settings_container = FloatLayout()
+    def build_settings_overlay(self):
+        """Build the settings menu once, registering its option buttons"""
+        overlay = self.create_overlay(0.8)
+
+        # Option buttons by setting and value, for highlight_setting
+        self.settings_buttons = {'grid_size': {}, 'game_speed': {},
+                                 'difficulty': {}}
 
         # Create settings panel
         settings_panel = BoxLayout(
@@ -1023,14 +1493,17 @@ class SnakeGame(Widget):
             spacing=dp(15),
             padding=dp(20),
             size_hint=(0.6, 0.7),
-            pos_hint={'center_x': 0.5, 'center_y': 0.5},
-            background_color=(0.15, 0.15, 0.15, 1)
+            pos_hint={'center_x': 0.5, 'center_y': 0.5}
         )
 
         # Add background color to panel
         with settings_panel.canvas.before:
             Color(0.15, 0.15, 0.15, 1)
-            Rectangle(pos=settings_panel.pos, size=settings_panel.size)
+            panel_background = Rectangle(pos=settings_panel.pos,
+                                         size=settings_panel.size)
+        settings_panel.bind(
+            pos=lambda widget, pos: setattr(panel_background, 'pos', pos),
+            size=lambda widget, size: setattr(panel_background, 'size', size))
 
         # Settings title
         settings_title = Label(
@@ -1056,16 +1529,11 @@ class SnakeGame(Widget):
         # Grid size options
         grid_options = BoxLayout(orientation='horizontal', size_hint=(0.6, 1))
 
-        grid_sizes = [('Small', 30), ('Medium', 20), ('Large', 15)]
-        for name, size in grid_sizes:
-            btn = Button(
-                text=name,
-                font_size='18sp',
-                background_color=(0.3, 0.3, 0.8, 1) if self.config['grid_size'] == size else (
-                    0.3, 0.3, 0.3, 1)
-            )
+        for name, size in GRID_SIZES:
+            btn = Button(text=name, font_size='18sp')
             btn.bind(on_press=lambda x, s=size: self.set_grid_size(s))
             grid_options.add_widget(btn)
+            self.settings_buttons['grid_size'][size] = btn
 
         grid_layout.add_widget(grid_options)
         settings_panel.add_widget(grid_layout)
@@ -1084,18 +1552,11 @@ class SnakeGame(Widget):
         # Speed options
         speed_options = BoxLayout(orientation='horizontal', size_hint=(0.6, 1))
 
-        # Updated speed settings
-        speed_settings = [('Very Slow', 3), ('Slow', 5),
-                          ('Normal', 7), ('Fast', 10), ('Insane', 15)]
-        for name, speed in speed_settings:
-            btn = Button(
-                text=name,
-                font_size='18sp',
-                background_color=(0.3, 0.8, 0.3, 1) if self.config['game_speed'] == speed else (
-                    0.3, 0.3, 0.3, 1)
-            )
+        for name, speed in self.speed_settings:
+            btn = Button(text=name, font_size='18sp')
             btn.bind(on_press=lambda x, s=speed: self.set_game_speed(s))
             speed_options.add_widget(btn)
+            self.settings_buttons['game_speed'][speed] = btn
 
         speed_layout.add_widget(speed_options)
         settings_panel.add_widget(speed_layout)
@@ -1114,16 +1575,11 @@ class SnakeGame(Widget):
         # Difficulty options
         diff_options = BoxLayout(orientation='horizontal', size_hint=(0.6, 1))
 
-        difficulties = ['easy', 'normal', 'hard', 'expert']
-        for diff in difficulties:
-            btn = Button(
-                text=diff.capitalize(),
-                font_size='18sp',
-                background_color=(0.8, 0.3, 0.3, 1) if self.config['difficulty'] == diff else (
-                    0.3, 0.3, 0.3, 1)
-            )
+        for diff in DIFFICULTIES:
+            btn = Button(text=diff.capitalize(), font_size='18sp')
             btn.bind(on_press=lambda x, d=diff: self.set_difficulty(d))
             diff_options.add_widget(btn)
+            self.settings_buttons['difficulty'][diff] = btn
 
         diff_layout.add_widget(diff_options)
         settings_panel.add_widget(diff_layout)
@@ -1137,13 +1593,12 @@ class SnakeGame(Widget):
         )
         settings_panel.add_widget(preview_label)
 
-        # Grid preview
+        # Grid preview, redrawn whenever the layout moves it
         self.preview_widget = Widget(size_hint=(1, 0.15))
+        self.preview_widget.bind(pos=lambda *args: self.update_grid_preview(),
+                                 size=lambda *args: self.update_grid_preview())
         settings_panel.add_widget(self.preview_widget)
 
-        # Update the preview
-        self.update_grid_preview()
-
         # Action buttons
         button_layout = BoxLayout(
             orientation='horizontal',
@@ -1175,15 +1630,25 @@ class SnakeGame(Widget):
         settings_panel.add_widget(button_layout)
 
         # Add settings panel to container
-        self.settings_container.add_widget(settings_panel)
+        overlay.add_widget(settings_panel)
 
-        # Add to game
-        self.add_widget(self.settings_container)
+        # Speed preview shown briefly when a speed is picked
+        self.speed_preview_label = Label(
+            font_size='16sp',
+            color=(0.9, 0.9, 0.5, 1),
+            size_hint=(None, None),
+            pos_hint={'center_x': 0.5, 'center_y': 0.5},
+            opacity=0
+        )
+        overlay.add_widget(self.speed_preview_label)
+        return overlay
 
-        # Animate the settings panel appearance
-        settings_panel.opacity = 0
-        anim = Animation(opacity=1, duration=0.3)
-        anim.start(settings_panel)
+    def highlight_setting(self, key):
+        """Color the button of the chosen value of one setting"""
+        selected = self.config.get(key)
+        for value, btn in self.settings_buttons[key].items():
+            btn.background_color = SETTING_COLORS[key] if value == selected else (
+                0.3, 0.3, 0.3, 1)
 
     def update_grid_preview(self):
         """Update the grid size preview in settings"""
@@ -1193,6 +1658,10 @@ class SnakeGame(Widget):
         preview_width = self.preview_widget.width
         preview_height = self.preview_widget.height
 
+        # Nothing to draw until the layout has given the widget a size
+        if preview_width <= 0 or preview_height <= 0:
+            return
+
         # Calculate cell size based on current grid size setting
         cell_size = min(preview_width, preview_height) / 10
 
@@ -1200,8 +1669,11 @@ class SnakeGame(Widget):
         preview_grid_width = int(preview_width / cell_size)
         preview_grid_height = int(preview_height / cell_size)
 
-        # Draw preview grid
+        # Draw preview grid, relative to where the layout put the widget
         with self.preview_widget.canvas:
+            PushMatrix()
+            Translate(*self.preview_widget.pos)
+
             # Background
             Color(0, 0, 0, 1)
             Rectangle(pos=(0, 0), size=(preview_width, preview_height))
@@ -1238,6 +1710,7 @@ class SnakeGame(Widget):
                 pos=((snake_x + 3) * cell_size, snake_y * cell_size),
                 size=(cell_size, cell_size)
             )
+            PopMatrix()
 
     def set_grid_size(self, size):
         """Update the grid size setting"""
@@ -1245,70 +1718,35 @@ class SnakeGame(Widget):
         # Update preview
         self.update_grid_preview()
         # Update button states
-        for child in self.settings_container.children:
-            if isinstance(child, BoxLayout):
-                for layout in child.children:
-                    if isinstance(layout, BoxLayout) and "Grid Size" in str(layout.children):
-                        for options in layout.children:
-                            if isinstance(options, BoxLayout):
-                                for btn in options.children:
-                                    if isinstance(btn, Button) and any(s[1] == size for s in [('Small', 30), ('Medium', 20), ('Large', 15)]):
-                                        btn.background_color = (0.3, 0.3, 0.8, 1) if btn.text in [s[0] for s in [(
-                                            'Small', 30), ('Medium', 20), ('Large', 15)] if s[1] == size] else (0.3, 0.3, 0.3, 1)
+        self.highlight_setting('grid_size')
 
     def set_game_speed(self, speed):
         """Update the game speed setting"""
+        from kivy.animation import Animation
         self.config['game_speed'] = speed
 
-        # Update button states in settings UI
-        # ...existing code...
-
-        # Preview the speed for the player
-        preview_text = Label(
-            text=f"Preview: {speed} FPS",
-            font_size='16sp',
-            color=(0.9, 0.9, 0.5, 1),
-            center_x=Window.width/2,
-            center_y=Window.height/2 - 100
-        )
-        self.settings_container.add_widget(preview_text)
-
-        # Remove preview text after 1.5 seconds
-        Clock.schedule_once(
-            lambda dt: self.settings_container.remove_widget(preview_text), 1.5)
-
         # Update button states
-        for child in self.settings_container.children:
-            if isinstance(child, BoxLayout):
-                for layout in child.children:
-                    if isinstance(layout, BoxLayout) and "Game Speed" in str(layout.children):
-                        for options in layout.children:
-                            if isinstance(options, BoxLayout):
-                                for btn in options.children:
-                                    if isinstance(btn, Button) and any(s[1] == speed for s in [('Slow', 5), ('Normal', 10), ('Fast', 15), ('Insane', 20)]):
-                                        btn.background_color = (0.3, 0.8, 0.3, 1) if btn.text in [s[0] for s in [(
-                                            'Slow', 5), ('Normal', 10), ('Fast', 15), ('Insane', 20)] if s[1] == speed] else (0.3, 0.3, 0.3, 1)
+        self.highlight_setting('game_speed')
+
+        # Preview the speed for the player, fading out after 1.5 seconds
+        preview_text = self.speed_preview_label
+        preview_text.text = f"Preview: {speed} FPS"
+        preview_text.texture_update()
+        preview_text.size = preview_text.texture_size
+        Animation.cancel_all(preview_text)
+        preview_text.opacity = 1
+        anim = Animation(opacity=1, duration=1.5) + Animation(opacity=0, duration=0.2)
+        anim.start(preview_text)
 
     def set_difficulty(self, difficulty):
         """Update the difficulty setting"""
         self.config['difficulty'] = difficulty
         # Update button states
-        for child in self.settings_container.children:
-            if isinstance(child, BoxLayout):
-                for layout in child.children:
-                    if isinstance(layout, BoxLayout) and "Difficulty" in str(layout.children):
-                        for options in layout.children:
-                            if isinstance(options, BoxLayout):
-                                for btn in options.children:
-                                    if isinstance(btn, Button) and btn.text.lower() == difficulty:
-                                        btn.background_color = (
-                                            0.8, 0.3, 0.3, 1)
-                                    elif isinstance(btn, Button):
-                                        btn.background_color = (
-                                            0.3, 0.3, 0.3, 1)
+        self.highlight_setting('difficulty')
 
     def apply_settings(self):
         """Apply the settings and restart game"""
+        from kivy.animation import Animation
         # Save settings to config file
         self.save_game_config()
 
@@ -1335,30 +1773,32 @@ class SnakeGame(Widget):
 
     def close_settings(self):
         """Close the settings overlay without saving"""
+        from kivy.animation import Animation
         # Reset config to saved values
         self.load_game_config()
 
         # Animate out and remove
-        if hasattr(self, 'settings_container'):
+        if self.overlay_shown(self.settings_overlay):
             anim = Animation(opacity=0, duration=0.2)
             anim.bind(on_complete=lambda *args: self._complete_settings_removal())
-            anim.start(self.settings_container)
+            anim.start(self.settings_overlay)
 
     def _complete_settings_removal(self):
         """Complete removal of settings overlay"""
-        if hasattr(self, 'settings_container'):
-            self.remove_widget(self.settings_container)
-            delattr(self, 'settings_container')
-
-        if hasattr(self, 'settings_bg'):
-            self.canvas.remove(self.settings_bg)
-            delattr(self, 'settings_bg')
+        self.hide_overlay(self.settings_overlay)
 
 
 class SnakeGameApp(App):
     def build(self):
         return SnakeGame()
 
+    def on_pause(self):
+        self.root.flush_stores()
+        return True
+
+    def on_stop(self):
+        self.root.close_stores()
+
 
 if __name__ == '__main__':
     SnakeGameApp().run()
@@ -0,0 +1,127 @@
+from collections import OrderedDict
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, Rectangle
+from kivy.metrics import sp
+from kivy.properties import (StringProperty, NumericProperty, ColorProperty,
+                             OptionProperty)
+from kivy.uix.widget import Widget
+
+
+class TextureCache:
+    """Rasterized text kept by (text, font size), evicting the least used
+
+    Textures are rendered in white so one texture serves every color;
+    HudText tints them with a Color instruction.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.textures = OrderedDict()
+        self.misses = 0
+
+    def get(self, text, font_size):
+        key = (text, font_size)
+        texture = self.textures.get(key)
+        if texture is not None:
+            self.textures.move_to_end(key)
+            return texture
+
+        label = CoreLabel(text=text, font_size=font_size)
+        label.refresh()
+        texture = label.texture
+        self.textures[key] = texture
+        self.misses += 1
+        if len(self.textures) > self.max_entries:
+            self.textures.popitem(last=False)
+        return texture
+
+
+# One cache for the whole HUD, so equal strings are only rendered once
+texture_cache = TextureCache()
+
+
+def split_runs(text):
+    """Split text into alternating runs of digits and other characters"""
+    runs = []
+    start = 0
+    for index in range(1, len(text) + 1):
+        if index == len(text) or (
+                text[index].isdigit() != text[start].isdigit()):
+            runs.append(text[start:index])
+            start = index
+    return runs
+
+
+class HudText(Widget):
+    """Single line of HUD text drawn from cached textures
+
+    The text is cut into runs of digits and of everything else. Other
+    runs, such as "Score: ", are rendered whole once and reused; numbers
+    are put together from one texture per digit, so a changing score never
+    renders new text. The pieces are drawn by a fixed set of Rectangle
+    instructions made up front, so changing the text creates no widgets,
+    instructions or textures once its pieces have been seen.
+    """
+
+    text = StringProperty('')
+    font_size = NumericProperty(sp(16))
+    color = ColorProperty([1, 1, 1, 1])
+    # Scales the drawn text without rendering it again at another size
+    scale = NumericProperty(1.0)
+    # 'left' draws from pos; 'center' centers the text on the widget
+    halign = OptionProperty('left', options=['left', 'center'])
+
+    MAX_PIECES = 48
+
+    def __init__(self, cache=None, **kwargs):
+        super(HudText, self).__init__(**kwargs)
+        self.cache = cache or texture_cache
+        self.text_width = 0
+        self.text_height = 0
+        with self.canvas:
+            self.tint = Color(*self.color)
+            self.pieces = [Rectangle(size=(0, 0))
+                           for _ in range(self.MAX_PIECES)]
+        self.used = 0
+        self.bind(text=self.update_text, font_size=self.update_text,
+                  scale=self.update_text, pos=self.update_text,
+                  size=self.update_text, halign=self.update_text,
+                  color=self.update_color)
+        self.update_text()
+
+    def update_color(self, *args):
+        self.tint.rgba = self.color
+
+    def update_text(self, *args):
+        """Lay the cached pieces of the text out along one line"""
+        cache = self.cache
+        font_size = int(self.font_size)
+        textures = []
+        for run in split_runs(self.text):
+            if run[0].isdigit():
+                textures.extend(cache.get(digit, font_size) for digit in run)
+            else:
+                textures.append(cache.get(run, font_size))
+        textures = textures[:self.MAX_PIECES]
+
+        scale = self.scale
+        width = sum(texture.width for texture in textures) * scale
+        height = max([texture.height for texture in textures] or [0]) * scale
+        self.text_width = width
+        self.text_height = height
+        if self.halign == 'center':
+            x = self.center_x - width / 2
+            y = self.center_y - height / 2
+        else:
+            x, y = self.pos
+
+        for piece, texture in zip(self.pieces, textures):
+            piece.texture = texture
+            piece.pos = (x, y)
+            piece.size = (texture.width * scale, texture.height * scale)
+            x += texture.width * scale
+
+        # Hide the pieces the previous text used beyond this one
+        for piece in self.pieces[len(textures):self.used]:
+            piece.size = (0, 0)
+        self.used = len(textures)
@@ -0,0 +1,4 @@
+# Central score ranking shared by many game kiosks.
+# The server is plain asyncio and SQLite; nothing here may import Kivy.
+from .protocol import DEFAULT_HOST, DEFAULT_PORT, parse_address
+from .client import LeaderboardClient
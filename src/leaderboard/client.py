@@ -0,0 +1,173 @@
+import datetime
+import json
+import socket
+import threading
+import uuid
+from ..persistence import WriteBehindStore
+from .protocol import parse_address
+
+# Most queued scores pipelined in one exchange, so the answers always fit in
+# the socket buffers while the rest are still being sent
+MAX_BATCH = 500
+
+
+class LeaderboardClient:
+    """Sends finished games to a leaderboard server from a background thread
+
+    submit() only queues the score, so the game never waits on the
+    network. The queue is kept in queue_path, so scores made while the
+    server is unreachable survive a restart and are sent once it is back.
+    The sender keeps one connection open and pipelines everything queued
+    over it; after a failure it reconnects with a growing delay. Each
+    submission carries an id, so one resent after a lost acknowledgement
+    is only stored once.
+    """
+
+    def __init__(self, address, queue_path, kiosk=None, timeout=5.0,
+                 retry_delay=1.0, max_retry_delay=60.0):
+        self.host, self.port = parse_address(address)
+        self.kiosk = kiosk or socket.gethostname()
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self.queue_store = WriteBehindStore(queue_path)
+        self._pending = []
+        if self.queue_store.exists('pending'):
+            self._pending = self.queue_store.get('pending')['submissions']
+
+        self._socket = None
+        self._reader = None
+        self._io_lock = threading.Lock()  # Held while talking to the server
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self._thread = threading.Thread(
+            target=self._run, name="leaderboard-client", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending_count(self):
+        with self._condition:
+            return len(self._pending)
+
+    def submit(self, score, level, length=None, death_cause=None):
+        """Queue a finished game to be sent to the leaderboard"""
+        submission = {
+            "op": "submit",
+            "id": uuid.uuid4().hex,
+            "kiosk": self.kiosk,
+            "score": score,
+            "level": level,
+            "length": length,
+            "death_cause": death_cause,
+            "played_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with self._condition:
+            self._pending.append(submission)
+            self.queue_store.put('pending', submissions=self._pending)
+            self._condition.notify_all()
+        return submission["id"]
+
+    def top(self, limit=10):
+        """Ask the server for its best scores, best first"""
+        return self.request({"op": "top", "limit": limit})["top"]
+
+    def rank(self, score):
+        """Ask the server for (rank, total games) of a score"""
+        response = self.request({"op": "rank", "score": score})
+        return response["rank"], response["total"]
+
+    def request(self, message):
+        """Send one request and wait for its answer; raises OSError offline"""
+        response = self._exchange([message])[0]
+        if not response.get("ok"):
+            raise ValueError(response.get("error", "request failed"))
+        return response
+
+    def close(self):
+        """Stop sending; anything unsent stays queued on disk"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout=self.timeout)
+        self._disconnect()
+        self.queue_store.close()
+
+    def _connect(self):
+        if self._socket is None:
+            self._socket = socket.create_connection(
+                (self.host, self.port), self.timeout)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._reader = self._socket.makefile("rb")
+
+    def _disconnect(self):
+        with self._io_lock:
+            self._close_socket()
+
+    def _close_socket(self):
+        if self._socket is not None:
+            try:
+                self._reader.close()
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+            self._reader = None
+
+    def _exchange(self, messages):
+        """Pipeline messages over the shared connection, returning answers"""
+        with self._io_lock:
+            try:
+                self._connect()
+                self._socket.sendall(b"".join(
+                    json.dumps(message).encode() + b"\n"
+                    for message in messages))
+                responses = []
+                for _ in messages:
+                    line = self._reader.readline()
+                    if not line:
+                        raise ConnectionError("leaderboard closed the connection")
+                    responses.append(json.loads(line))
+                return responses
+            except (OSError, ValueError):
+                # The connection is in an unknown state; start over next time
+                self._close_socket()
+                raise
+
+    def _run(self):
+        delay = self.retry_delay
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if self._closed:
+                    return
+                batch = self._pending[:MAX_BATCH]
+
+            try:
+                responses = self._exchange(batch)
+            except (OSError, ValueError) as e:
+                if delay == self.retry_delay:
+                    print(f"Leaderboard unreachable, {self.pending_count} "
+                          f"scores queued: {e}")
+                with self._condition:
+                    self._condition.wait_for(lambda: self._closed, delay)
+                delay = min(delay * 2, self.max_retry_delay)
+                continue
+            delay = self.retry_delay
+
+            done = set()
+            for submission, response in zip(batch, responses):
+                if response.get("ok") or not response.get("retry"):
+                    if not response.get("ok"):
+                        print(f"Leaderboard rejected a score: {response.get('error')}")
+                    done.add(submission["id"])
+            with self._condition:
+                self._pending = [submission for submission in self._pending
+                                 if submission["id"] not in done]
+                self.queue_store.put('pending', submissions=self._pending)
+                if len(done) < len(batch):
+                    # The server could not store some; give it a moment
+                    self._condition.wait_for(lambda: self._closed, delay)
@@ -0,0 +1,101 @@
+# Load test for the leaderboard server: many simulated kiosks pipeline
+# score submissions while also asking for the top scores and ranks, and the
+# sustained submission rate and acknowledgement latency are reported.
+#
+# python -m src.leaderboard.loadtest --kiosks 50 --submissions 200000
+# python -m src.leaderboard.loadtest --address 127.0.0.1:8765
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+from .protocol import parse_address
+from .server import LeaderboardServer
+
+# Submissions each simulated kiosk keeps in flight at once
+WINDOW = 200
+
+
+async def kiosk(host, port, count, latencies, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    name = f"kiosk-{seed}"
+    sent_at = collections.deque()
+    window = asyncio.Semaphore(WINDOW)
+
+    async def read_answers():
+        for _ in range(count):
+            response = json.loads(await reader.readline())
+            if not response.get("ok"):
+                raise RuntimeError(response.get("error"))
+            latencies.append(time.perf_counter() - sent_at.popleft())
+            window.release()
+
+    answers = asyncio.create_task(read_answers())
+    for index in range(count):
+        # Keep at most WINDOW requests waiting on answers
+        if window.locked():
+            await writer.drain()
+        await window.acquire()
+        if index % 50 == 49:
+            message = {"op": "rank", "score": rng.randrange(300)}
+        elif index % 50 == 24:
+            message = {"op": "top", "limit": 10}
+        else:
+            message = {"op": "submit", "id": uuid.uuid4().hex, "kiosk": name,
+                       "score": rng.randrange(300), "level": rng.randrange(1, 12)}
+        sent_at.append(time.perf_counter())
+        writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+    await answers
+    writer.close()
+
+
+async def run(args):
+    server = None
+    if args.address:
+        host, port = parse_address(args.address)
+    else:
+        # No server given: start one on a free port over a scratch database
+        path = os.path.join(tempfile.mkdtemp(), "leaderboard.db")
+        server = LeaderboardServer(path, port=0)
+        await server.start()
+        host, port = server.host, server.port
+
+    latencies = []
+    per_kiosk = args.submissions // args.kiosks
+    start = time.perf_counter()
+    await asyncio.gather(*(kiosk(host, port, per_kiosk, latencies, seed)
+                           for seed in range(args.kiosks)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = per_kiosk * args.kiosks
+    print(f"{total:,} requests from {args.kiosks} kiosks in {elapsed:.2f} s: "
+          f"{total / elapsed:,.0f} requests/s")
+    print(f"latency ms p50 {latencies[len(latencies) // 2] * 1000:.1f} "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f}")
+    if server is not None:
+        await server.stop()
+        print(f"{server.total:,} scores stored in {server.batches:,} batches")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Flood a leaderboard server with simulated kiosks")
+    parser.add_argument("--address", default=None,
+                        help="host:port of a running server; one is started "
+                             "on a scratch database if unset")
+    parser.add_argument("--kiosks", type=int, default=50)
+    parser.add_argument("--submissions", type=int, default=100000,
+                        help="requests in total, about 96%% of them scores")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+# Leaderboard wire format: newline-delimited JSON over TCP. Every request
+# is one JSON object on its own line and is answered by exactly one JSON
+# line, in the order the requests were sent.
+#
+#   {"op": "submit", "id": "<hex>", "kiosk": "...", "score": 42, "level": 3,
+#    "length": 17, "death_cause": "self", "played_at": "2025-03-13 20:03:00"}
+#     -> {"ok": true, "id": "<hex>"}
+#   {"op": "top", "limit": 10}
+#     -> {"ok": true, "top": [{"score": .., "level": .., "kiosk": ..,
+#                              "played_at": ..}, ...]}
+#   {"op": "rank", "score": 42}
+#     -> {"ok": true, "rank": 7, "total": 1234}
+#
+# Failures answer {"ok": false, "error": "..."}, with "retry": true when the
+# request was fine and may simply be sent again.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def parse_address(address):
+    """Split "host:port" (or just "host") into a (host, port) pair"""
+    host, _, port = address.rpartition(":")
+    if not host:
+        return port, DEFAULT_PORT
+    return host, int(port)
@@ -0,0 +1,408 @@
+# Central leaderboard that many game kiosks submit their scores to, over
+# the newline-delimited JSON protocol described in protocol.py. Clients may
+# pipeline as many requests as they like on one connection.
+#
+# python -m src.leaderboard.server --port 8765 --db data/leaderboard.db
+import argparse
+import asyncio
+import concurrent.futures
+import datetime
+import json
+import sqlite3
+from .protocol import DEFAULT_HOST, DEFAULT_PORT
+
+# Submissions are written together once this many are waiting, or once the
+# oldest has waited BATCH_DELAY seconds
+BATCH_SIZE = 500
+BATCH_DELAY = 0.05
+
+# Largest top-N a client may ask for; the cache holds this many entries
+MAX_TOP = 100
+
+# Requests read from one connection but not yet answered; reading pauses
+# beyond this so a fast client cannot queue unbounded work
+MAX_IN_FLIGHT = 1000
+
+# Longest request line read; a client sending more without a newline is
+# disconnected rather than buffered without end
+MAX_LINE = 65536
+
+# Range of the 64-bit integers SQLite stores
+SQLITE_INT_MIN = -2 ** 63
+SQLITE_INT_MAX = 2 ** 63 - 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    submission_id TEXT UNIQUE,
+    kiosk TEXT,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    length INTEGER,
+    death_cause TEXT,
+    played_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC);
+"""
+
+
+def _is_integer(value):
+    """Check that value is an int SQLite can store; bools do not count"""
+    return (isinstance(value, int) and not isinstance(value, bool) and
+            SQLITE_INT_MIN <= value <= SQLITE_INT_MAX)
+
+
+def _is_text(value):
+    return value is None or isinstance(value, str)
+
+
+class LeaderboardDatabase:
+    """SQLite table of every submitted score, used from a single thread"""
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def insert(self, rows):
+        """Insert a batch of rows, returning how many were new
+
+        Rows whose submission id is already stored are skipped, so a client
+        resending after a lost acknowledgement never counts a game twice.
+        """
+        with self.connection:
+            return self.connection.executemany(
+                "INSERT OR IGNORE INTO scores (submission_id, kiosk, score, "
+                "level, length, death_cause, played_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows).rowcount
+
+    def insert_each(self, rows):
+        """Insert rows one transaction each, after a batch of them failed
+
+        Returns how many rows were new and, for every row, None once it is
+        stored or the exception that kept it out.
+        """
+        added = 0
+        errors = []
+        for row in rows:
+            try:
+                added += self.insert([row])
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        return added, errors
+
+    def top(self, limit):
+        return self.connection.execute(
+            "SELECT score, level, kiosk, played_at FROM scores "
+            "ORDER BY score DESC, id LIMIT ?", (limit,)).fetchall()
+
+    def rank(self, score):
+        (better,) = self.connection.execute(
+            "SELECT COUNT(*) FROM scores WHERE score > ?", (score,)).fetchone()
+        return better + 1
+
+    def count(self):
+        (total,) = self.connection.execute(
+            "SELECT COUNT(*) FROM scores").fetchone()
+        return total
+
+    def close(self):
+        self.connection.close()
+
+
+class LeaderboardServer:
+    """asyncio server batching score inserts and caching the hot queries
+
+    Submissions are queued and a single writer task stores them in batches,
+    so thousands of scores a second cost a few transactions rather than
+    one each. A submission is acknowledged once its batch is committed.
+    Every database call runs on one worker thread, keeping the event loop
+    free. The top scores and rank answers are cached and thrown away
+    whenever a batch lands, so repeated queries between batches never
+    reach the database.
+    """
+
+    def __init__(self, path, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                 batch_size=BATCH_SIZE, batch_delay=BATCH_DELAY):
+        self.path = path
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+
+        self.database = None
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="leaderboard-db")
+        self.pending = []  # (row, future) pairs waiting for the writer
+        self.has_pending = None
+        self.batch_full = None
+        self.stopping = False
+        self.server = None
+        self.writer_task = None
+
+        self.top_cache = None
+        self.rank_cache = {}
+        # Bumped whenever a batch lands; a query read before then must not
+        # fill the caches with what it found
+        self.generation = 0
+        self.total = 0
+        self.submitted = 0
+        self.batches = 0
+
+    async def run_db(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    async def start(self):
+        self.database = await self.run_db(LeaderboardDatabase, self.path)
+        self.total = await self.run_db(self.database.count)
+        self.has_pending = asyncio.Event()
+        self.batch_full = asyncio.Event()
+        self.writer_task = asyncio.create_task(self.write_batches())
+        self.server = await asyncio.start_server(
+            self.handle_client, self.host, self.port)
+        # Port 0 picks a free port; report the one actually bound
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Stop accepting clients and write every queued submission"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if self.writer_task is not None:
+            self.stopping = True
+            self.has_pending.set()
+            await self.writer_task
+            self.writer_task = None
+        if self.database is not None:
+            await self.run_db(self.database.close)
+            self.database = None
+        self.executor.shutdown(wait=True)
+
+    async def handle_client(self, reader, writer):
+        # Each request is started as soon as its line is read, while the
+        # answers go back in the order they were asked, so submissions
+        # pipelined on one connection all land in the same batch
+        in_flight = asyncio.Queue(MAX_IN_FLIGHT)
+        sender = asyncio.create_task(self.send_responses(in_flight, writer))
+        partial = b""
+        try:
+            while not sender.done():
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                lines = (partial + chunk).split(b"\n")
+                partial = lines.pop()
+                if len(partial) > MAX_LINE:
+                    break
+                for line in lines:
+                    if line.strip():
+                        await in_flight.put(self.handle_request(line))
+        except ConnectionError:
+            pass
+        finally:
+            if not sender.done():
+                await in_flight.put(None)
+            await sender
+
+    async def send_responses(self, in_flight, writer):
+        # Answers that are ready are gathered into one write, so a batch of
+        # acknowledgements costs one send rather than one each
+        lines = []
+        try:
+            while True:
+                response = await in_flight.get()
+                if response is None:
+                    break
+                if isinstance(response, asyncio.Future) and response.done():
+                    response = response.result()
+                elif not isinstance(response, dict):
+                    if lines:
+                        writer.write(b"".join(lines))
+                        lines = []
+                    response = await response
+                lines.append(json.dumps(response).encode() + b"\n")
+                if in_flight.empty() or len(lines) >= 256:
+                    writer.write(b"".join(lines))
+                    lines = []
+                    await writer.drain()
+            writer.write(b"".join(lines))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            # Answers nobody will read; their scores are still stored
+            while not in_flight.empty():
+                response = in_flight.get_nowait()
+                if asyncio.iscoroutine(response):
+                    response.close()
+
+    def handle_request(self, line):
+        """Start one request, returning its answer or something to await"""
+        try:
+            request = json.loads(line)
+            op = request.get("op")
+            if op == "submit":
+                return self.submit(request)
+            if op == "top":
+                return self.top(int(request.get("limit", 10)))
+            if op == "rank":
+                return self.rank(int(request["score"]))
+            return {"ok": False, "error": f"unknown op {op!r}"}
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            return {"ok": False, "error": f"bad request: {e}"}
+
+    def submit(self, request):
+        # A row the database cannot store would fail its whole batch, so
+        # it is turned away before it is queued
+        score = request.get("score")
+        level = request.get("level", 1)
+        length = request.get("length")
+        texts = [request.get(key) for key in
+                 ("id", "kiosk", "death_cause", "played_at")]
+        if not (_is_integer(score) and _is_integer(level) and
+                (length is None or _is_integer(length)) and
+                all(_is_text(text) for text in texts)):
+            return {"ok": False, "error": "bad request"}
+
+        played_at = request.get("played_at") or datetime.datetime.now().strftime(
+            "%Y-%m-%d %H:%M:%S")
+        row = (request.get("id"), request.get("kiosk"), score, level, length,
+               request.get("death_cause"), played_at)
+        done = asyncio.get_running_loop().create_future()
+        self.pending.append((row, done))
+        self.has_pending.set()
+        if len(self.pending) >= self.batch_size:
+            self.batch_full.set()
+        # Resolved with the answer once the batch holding it is committed
+        return done
+
+    def top(self, limit):
+        limit = max(1, min(limit, MAX_TOP))
+        if self.top_cache is None:
+            return self.load_top(limit)
+        return {"ok": True, "top": self.top_cache[:limit]}
+
+    async def load_top(self, limit):
+        generation = self.generation
+        rows = await self.run_db(self.database.top, MAX_TOP)
+        top = [
+            {"score": score, "level": level, "kiosk": kiosk,
+             "played_at": played_at}
+            for score, level, kiosk, played_at in rows]
+        if generation == self.generation:
+            self.top_cache = top
+        return {"ok": True, "top": top[:limit]}
+
+    def rank(self, score):
+        rank = self.rank_cache.get(score)
+        if rank is None:
+            return self.load_rank(score)
+        return {"ok": True, "rank": rank, "total": self.total}
+
+    async def load_rank(self, score):
+        generation = self.generation
+        rank = await self.run_db(self.database.rank, score)
+        if generation == self.generation:
+            self.rank_cache[score] = rank
+        return {"ok": True, "rank": rank, "total": self.total}
+
+    async def write_batches(self):
+        """Store queued submissions a batch at a time until stopped"""
+        while self.pending or not self.stopping:
+            await self.has_pending.wait()
+            if len(self.pending) < self.batch_size and not self.stopping:
+                # Give more submissions a moment to join this batch
+                try:
+                    await asyncio.wait_for(self.batch_full.wait(),
+                                           self.batch_delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self.pending[:self.batch_size]
+            del self.pending[:self.batch_size]
+            if len(self.pending) < self.batch_size:
+                self.batch_full.clear()
+            if not self.pending and not self.stopping:
+                self.has_pending.clear()
+            if not batch:
+                continue
+
+            rows = [row for row, _ in batch]
+            try:
+                self.total += await self.run_db(self.database.insert, rows)
+                errors = [None] * len(rows)
+            except Exception as e:
+                # The writer must outlive any batch, or every later submit
+                # would wait forever. The rows are tried one at a time, so
+                # a bad one does not fail the rest
+                print(f"Error saving leaderboard scores: {e}")
+                try:
+                    added, errors = await self.run_db(
+                        self.database.insert_each, rows)
+                    self.total += added
+                except Exception as e:
+                    errors = [e] * len(rows)
+
+            self.generation += 1
+            self.top_cache = None
+            self.rank_cache = {}
+            self.submitted += len(batch)
+            self.batches += 1
+            for (row, done), error in zip(batch, errors):
+                if not done.done():
+                    done.set_result(self.submit_result(row, error))
+
+    def submit_result(self, row, error):
+        """Answer a submission given the error storing it, if any"""
+        if error is None:
+            return {"ok": True, "id": row[0]}
+        # Only a failing database is worth sending the score again for; a
+        # row it cannot store would fail every time
+        if isinstance(error, sqlite3.OperationalError):
+            return {"ok": False, "retry": True, "error": f"not stored: {error}"}
+        return {"ok": False, "error": f"not stored: {error}"}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the leaderboard that game kiosks submit scores to")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", default="leaderboard.db",
+                        help="SQLite database file holding every score")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--batch-delay", type=float, default=BATCH_DELAY,
+                        help="seconds a submission may wait for its batch")
+    args = parser.parse_args(argv)
+
+    server = LeaderboardServer(args.db, args.host, args.port,
+                               args.batch_size, args.batch_delay)
+
+    async def run():
+        await server.start()
+        # With --port 0 only the bound socket knows the port
+        host, port = server.server.sockets[0].getsockname()[:2]
+        print(f"Leaderboard listening on {host}:{port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
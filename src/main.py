@@ -1,8 +1,37 @@
-from .game import SnakeGame
-from kivy.app import App
-from kivy.clock import Clock
-from kivy.core.window import Window
-from kivy.config import Config
+import sys
+from .startup import startup
+
+# --profile-startup[=file.json] prints where the time goes between launch
+# and the first frame. It is taken out of sys.argv before Kivy is
+# imported, since Kivy parses the command line on import.
+PROFILE_FLAG = '--profile-startup'
+startup_export = None
+for argument in sys.argv[1:]:
+    if argument == PROFILE_FLAG or argument.startswith(PROFILE_FLAG + '='):
+        sys.argv.remove(argument)
+        startup.enable()
+        startup_export = argument.partition('=')[2] or None
+        break
+
+# --replay FILE (or --replay=FILE) plays a recorded game instead
+REPLAY_FLAG = '--replay'
+replay_path = None
+for index, argument in enumerate(sys.argv[1:], 1):
+    if argument == REPLAY_FLAG and index + 1 < len(sys.argv):
+        replay_path = sys.argv[index + 1]
+        del sys.argv[index:index + 2]
+        break
+    if argument.startswith(REPLAY_FLAG + '='):
+        replay_path = argument.partition('=')[2]
+        del sys.argv[index]
+        break
+
+with startup.phase("import kivy"):
+    from kivy.app import App
+    from kivy.core.window import Window
+    from kivy.config import Config
+with startup.phase("import game"):
+    from .game import SnakeGame
 
 # Set window size and prevent resizing
 Config.set('graphics', 'resizable', False)
@@ -11,21 +40,51 @@ Config.set('graphics', 'height', '600')
 
 
 class SnakeApp(App):
+    def __init__(self, replay=None, **kwargs):
+        super(SnakeApp, self).__init__(**kwargs)
+        self.replay = replay
+
     def build(self):
         # Set window properties
         Window.title = "Snake Adventure"
+        if startup.enabled:
+            Window.bind(on_flip=self.on_first_flip)
+
+        # Create and return the game widget; it schedules its own game loop
+        with startup.phase("SnakeGame()"):
+            return SnakeGame(replay=self.replay)
+
+    def on_start(self):
+        startup.mark("App.on_start")
 
-        # Create and return the game widget
-        game = SnakeGame()
+    def on_first_flip(self, window):
+        """Report the startup once the first frame is on screen"""
+        window.unbind(on_flip=self.on_first_flip)
+        startup.finish()
+        startup.report()
+        if startup_export:
+            startup.export(startup_export)
 
-        # Start game clock at 10 FPS
-        Clock.schedule_interval(game.update, 1.0/10.0)
+    def on_pause(self):
+        # Save scores and settings before the OS may stop the app
+        self.root.flush_stores()
+        return True
 
-        return game
+    def on_stop(self):
+        self.root.close_stores()
 
 
 def main():
-    SnakeApp().run()
+    replay = None
+    if replay_path:
+        from .engine import Replay
+        try:
+            replay = Replay.load(replay_path)
+        except (OSError, ValueError) as e:
+            print(f"Error loading replay: {e}")
+            return
+    startup.mark("App.run")
+    SnakeApp(replay=replay).run()
 
 
 if __name__ == '__main__':
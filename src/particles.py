@@ -0,0 +1,157 @@
+import numpy as np
+from kivy.graphics import Mesh
+from .profiler import FrameProfiler
+from .vertex_color import VERTEX_FORMAT, create_context, quad_indices
+
+# Corner offsets of a quad around its center, in drawing order
+QUAD_CORNERS = np.array([(-0.5, -0.5), (0.5, -0.5), (0.5, 0.5), (-0.5, 0.5)],
+                        dtype=np.float32)
+
+
+class ParticleSystem:
+    """Moves and draws short-lived square particles as a single Mesh
+
+    Particles live in parallel NumPy arrays, packed so the live ones are
+    always the first count entries. update() advances all of them at
+    once: each waits out its delay, then moves under its velocity and
+    gravity while its size eases to its end size and it fades out over
+    its lifetime. They are drawn as one Mesh with a per-vertex color, so
+    a thousand pieces of debris cost one draw call. At most max_particles
+    live at once; an effect emitted past the cap loses its extra
+    particles.
+    """
+
+    def __init__(self, canvas, max_particles=4096, profiler=None):
+        self.max_particles = max_particles
+        self.profiler = profiler or FrameProfiler()
+        self.count = 0
+        self.dropped = 0  # Particles refused because the cap was reached
+
+        self.position = np.zeros((max_particles, 2), dtype=np.float32)
+        self.velocity = np.zeros((max_particles, 2), dtype=np.float32)
+        self.gravity = np.zeros(max_particles, dtype=np.float32)
+        self.color = np.zeros((max_particles, 4), dtype=np.float32)
+        self.start_size = np.zeros(max_particles, dtype=np.float32)
+        self.end_size = np.zeros(max_particles, dtype=np.float32)
+        self.age = np.zeros(max_particles, dtype=np.float32)
+        self.delay = np.zeros(max_particles, dtype=np.float32)
+        self.life = np.ones(max_particles, dtype=np.float32)
+        self.arrays = [self.position, self.velocity, self.gravity, self.color,
+                       self.start_size, self.end_size, self.age, self.delay,
+                       self.life]
+
+        # Vertex and index buffers are sized for the cap once; each
+        # particle is a quad of four vertices, each x, y, r, g, b, a
+        self.vertices = np.zeros((max_particles, 4, 6), dtype=np.float32)
+        self.indices = quad_indices(max_particles)
+
+        self.context = create_context()
+        self.mesh = Mesh(fmt=VERTEX_FORMAT, mode='triangles')
+        self.context.add(self.mesh)
+        self.canvas = None
+        self.move_to(canvas)
+        self.drawn = 0  # Particles in the mesh as last uploaded
+
+    def move_to(self, canvas):
+        """Draw the particles in another canvas from now on"""
+        if canvas is self.canvas:
+            return
+        if self.canvas is not None:
+            self.canvas.remove(self.context)
+        canvas.add(self.context)
+        self.canvas = canvas
+
+    def emit(self, position, velocity, color, size, life, end_size=None,
+             delay=0.0, gravity=0.0):
+        """Add particles; each argument is one value or one per particle
+
+        position and velocity are (n, 2) in pixels and pixels per second,
+        color is (n, 4) or one RGBA shared by all of them.
+        """
+        position = np.asarray(position, dtype=np.float32).reshape(-1, 2)
+        amount = min(len(position), self.max_particles - self.count)
+        self.dropped += len(position) - amount
+        if amount <= 0:
+            return 0
+
+        new = slice(self.count, self.count + amount)
+        self.position[new] = position[:amount]
+        self.velocity[new] = _per_particle(velocity, amount, 2)
+        self.color[new] = _per_particle(color, amount, 4)
+        self.start_size[new] = _per_particle(size, amount)
+        self.end_size[new] = _per_particle(
+            size if end_size is None else end_size, amount)
+        self.life[new] = _per_particle(life, amount)
+        self.delay[new] = _per_particle(delay, amount)
+        self.gravity[new] = _per_particle(gravity, amount)
+        self.age[new] = 0.0
+        self.count += amount
+        return amount
+
+    def clear(self):
+        self.count = 0
+        self.upload()
+
+    def update(self, dt):
+        """Advance every particle by dt seconds and refresh the mesh"""
+        if not self.count and not self.drawn:
+            return
+        profiler = self.profiler
+        with profiler.phase("particles"):
+            self.step(dt)
+            self.upload()
+        profiler.count("particle_count", self.count)
+
+    def step(self, dt):
+        live = slice(0, self.count)
+        age = self.age[live]
+        age += dt
+
+        # Drop finished particles, keeping the live ones packed in front
+        finished = age >= self.delay[live] + self.life[live]
+        if finished.any():
+            keep = np.flatnonzero(~finished)
+            for values in self.arrays:
+                values[:len(keep)] = values[keep]
+            self.count = len(keep)
+            live = slice(0, self.count)
+            age = self.age[live]
+
+        # Only particles past their delay move; the rest wait in place
+        moving = (age > self.delay[live]).astype(np.float32)
+        self.velocity[live, 1] += self.gravity[live] * (dt * moving)
+        self.position[live] += self.velocity[live] * (dt * moving)[:, None]
+
+    def upload(self):
+        """Write the live particles into the mesh as colored quads"""
+        count = self.count
+        self.drawn = count
+        if not count:
+            # Kivy cannot take an empty buffer, only an empty list
+            self.mesh.vertices = []
+            self.mesh.indices = []
+            return
+
+        live = slice(0, count)
+        progress = np.clip(
+            (self.age[live] - self.delay[live]) / self.life[live], 0.0, 1.0)
+        size = self.start_size[live] + (
+            self.end_size[live] - self.start_size[live]) * progress
+
+        vertices = self.vertices[live]
+        vertices[:, :, 0:2] = (self.position[live, None, :] +
+                               QUAD_CORNERS[None, :, :] * size[:, None, None])
+        vertices[:, :, 2:6] = self.color[live, None, :]
+        vertices[:, :, 5] *= (1.0 - progress)[:, None]
+
+        self.mesh.vertices = memoryview(self.vertices[live].reshape(-1))
+        self.mesh.indices = memoryview(self.indices[:count * 6])
+
+
+def _per_particle(value, amount, width=None):
+    """Broadcast one value, or cut a per-particle sequence, to amount rows"""
+    value = np.asarray(value, dtype=np.float32)
+    shape = (amount,) if width is None else (amount, width)
+    if value.ndim == len(shape):
+        value = value[:amount]
+    return np.broadcast_to(value, shape)
@@ -0,0 +1,133 @@
+import atexit
+import copy
+import json
+import os
+import threading
+
+
+class WriteBehindStore:
+    """JSON key/value store that writes to disk on a background thread
+
+    It reads and writes the same file layout as kivy's JsonStore and offers
+    the exists/get/put calls the game uses. Reads come from memory and
+    put() only updates memory, so callers never wait for the disk. The
+    writer thread coalesces every put made within delay seconds of the
+    first one into a single write to a temporary file, which is then
+    renamed over the real file so a crash never leaves it half written.
+    A write that fails is tried again every delay seconds until one
+    succeeds or the store is closed.
+    """
+
+    def __init__(self, filename, delay=1.0):
+        self.filename = filename
+        self.delay = delay
+
+        self._data = {}
+        self._version = 0  # Bumped by every change
+        self._written = 0  # Version that is safely on disk
+        self._flush_requested = False
+        self._closed = False
+        self._condition = threading.Condition()
+
+        self._load()
+
+        self._thread = threading.Thread(
+            target=self._run, name=f"store-writer:{os.path.basename(filename)}",
+            daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _load(self):
+        if not os.path.exists(self.filename):
+            return
+        try:
+            with open(self.filename) as f:
+                self._data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading {self.filename}: {e}")
+
+    def exists(self, key):
+        with self._condition:
+            return key in self._data
+
+    def get(self, key):
+        """Return a copy of the values stored under key"""
+        with self._condition:
+            if key not in self._data:
+                raise KeyError(key)
+            return copy.deepcopy(self._data[key])
+
+    def put(self, key, **values):
+        """Store values under key; the file is written shortly after"""
+        values = copy.deepcopy(values)
+        with self._condition:
+            self._data[key] = values
+            self._version += 1
+            self._condition.notify_all()
+
+    def flush(self, wait=False, timeout=5.0):
+        """Write pending changes now, optionally waiting until they are"""
+        with self._condition:
+            if self._written == self._version:
+                return True
+            self._flush_requested = True
+            self._condition.notify_all()
+            if wait:
+                target = self._version
+                self._condition.wait_for(
+                    lambda: self._written >= target or self._closed, timeout)
+            return self._written == self._version
+
+    def close(self):
+        """Flush pending changes and stop the writer thread"""
+        if self._closed:
+            return
+        self.flush(wait=True)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout=5.0)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._version != self._written or self._closed)
+                if self._closed:
+                    return
+
+                # Give further puts a moment to land in the same write
+                if not self._flush_requested:
+                    self._condition.wait_for(
+                        lambda: self._flush_requested or self._closed,
+                        self.delay)
+                self._flush_requested = False
+
+                version = self._version
+                text = json.dumps(self._data)
+
+            written = self._write(text)
+            with self._condition:
+                if written:
+                    self._written = version
+                    self._condition.notify_all()
+                else:
+                    # The changes are still only in memory; try again soon
+                    self._condition.wait_for(lambda: self._closed, self.delay)
+
+    def _write(self, text):
+        """Write text to the file, returning whether it succeeded"""
+        temporary = self.filename + ".tmp"
+        try:
+            directory = os.path.dirname(self.filename)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            with open(temporary, "w") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, self.filename)
+            return True
+        except OSError as e:
+            print(f"Error saving {self.filename}: {e}")
+            return False
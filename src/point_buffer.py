@@ -0,0 +1,62 @@
+import numpy as np
+
+
+class PointBuffer:
+    """Contiguous float array of x, y points with O(1) push at the front
+
+    Points live in a window of a larger backing array, first point first.
+    Pushing to the front grows the window to the left and popping from the
+    back shrinks it from the right. When the left edge is reached the
+    points are moved back to the right edge in one copy, so pushes stay
+    amortized O(1) and view() is always a single contiguous slice.
+    """
+
+    def __init__(self, points=(), capacity=16):
+        points = np.asarray(points, dtype='f').reshape(-1, 2)
+        rows = max(capacity, 2 * len(points), 1)
+        self._points = np.zeros((rows, 2), dtype='f')
+        self._end = rows
+        self._start = rows - len(points)
+        self._points[self._start:] = points
+
+    def _make_room(self):
+        """Move the points to the right edge, growing the backing array"""
+        count = self._end - self._start
+        rows = len(self._points)
+        points = self._points
+        if count * 2 > rows:
+            rows *= 2
+            points = np.zeros((rows, 2), dtype='f')
+        # NumPy copes with the source and destination overlapping
+        points[rows - count:] = self._points[self._start:self._end]
+        self._points = points
+        self._start = rows - count
+        self._end = rows
+
+    def appendleft(self, point):
+        """Insert a point in front of the first one"""
+        if self._start == 0:
+            self._make_room()
+        self._start -= 1
+        self._points[self._start] = point
+
+    def pop(self):
+        """Remove and return the last point"""
+        if self._end == self._start:
+            raise IndexError("pop from an empty point buffer")
+        self._end -= 1
+        return tuple(self._points[self._end].tolist())
+
+    def clear(self):
+        """Remove every point"""
+        self._start = self._end = len(self._points)
+
+    def view(self):
+        """Return the points as an (n, 2) array sharing this buffer's memory"""
+        return self._points[self._start:self._end]
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __getitem__(self, index):
+        return self.view()[index]
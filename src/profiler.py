@@ -0,0 +1,135 @@
+import csv
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+
+class _PhaseTimer:
+    """Context manager adding the time spent inside it to one phase"""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class FrameProfiler:
+    """Times the phases of every frame and keeps rolling percentiles
+
+    Each frame becomes one record of phase times in milliseconds plus any
+    counters, such as canvas instructions created. The last window
+    records feed the percentiles shown on screen; up to max_records are
+    kept for export. While disabled, phase() hands out a shared no-op
+    timer so instrumented code costs next to nothing.
+    """
+
+    def __init__(self, window=300, max_records=100000):
+        self.enabled = False
+        self.window = deque(maxlen=window)
+        self.records = deque(maxlen=max_records)
+        self.current = None
+        self.frame_count = 0
+        self.frame_start = None
+        self.timers = {}
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.current = None
+        self.frame_start = None
+        return self.enabled
+
+    def begin_frame(self, dt):
+        """Start a frame record; dt is the time since the previous frame"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        record = {"frame": self.frame_count, "dt": dt * 1000.0}
+
+        # Whatever the last frame did not spend in update went to Kivy's
+        # own layout, drawing and waiting for the next frame
+        if self.frame_start is not None and self.records:
+            previous = self.records[-1]
+            previous["kivy"] = max(
+                0.0, (now - self.frame_start) * 1000.0 - previous["update"])
+
+        self.frame_count += 1
+        self.frame_start = now
+        self.current = record
+
+    def end_frame(self):
+        if self.current is None:
+            return
+        record = self.current
+        record["update"] = (time.perf_counter() - self.frame_start) * 1000.0
+        self.current = None
+        self.window.append(record)
+        self.records.append(record)
+
+    def phase(self, name):
+        """Return a context manager timing a phase of the current frame"""
+        if self.current is None:
+            return _NULL_TIMER
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = _PhaseTimer(self, name)
+        return timer
+
+    def add(self, name, seconds):
+        if self.current is not None:
+            self.current[name] = self.current.get(name, 0.0) + seconds * 1000.0
+
+    def count(self, name, amount=1):
+        """Add to a per-frame counter such as instructions created"""
+        if self.current is not None and amount:
+            self.current[name] = self.current.get(name, 0) + amount
+
+    def percentiles(self, percents=(50, 95, 99)):
+        """Return {column: [values]} over the rolling window"""
+        columns = {}
+        for record in self.window:
+            for name, value in record.items():
+                if name != "frame":
+                    columns.setdefault(name, [])
+        summary = {}
+        for name in columns:
+            # Frames that never entered a phase spent no time in it
+            values = np.array([record.get(name, 0.0) for record in self.window])
+            summary[name] = np.percentile(values, percents).tolist()
+        return summary
+
+    def export(self, path):
+        """Write every kept frame record to a .json or .csv file"""
+        records = list(self.records)
+        if path.endswith(".csv"):
+            columns = []
+            for record in records:
+                for name in record:
+                    if name not in columns:
+                        columns.append(name)
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=columns, restval=0)
+                writer.writeheader()
+                writer.writerows(records)
+        else:
+            with open(path, "w") as f:
+                json.dump({"units": "ms", "frames": records}, f)
+        return len(records)
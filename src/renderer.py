@@ -0,0 +1,89 @@
+from kivy.graphics import Color, Rectangle, Mesh
+from kivy.graphics.instructions import InstructionGroup
+from kivy.core.window import Window
+from .profiler import FrameProfiler
+
+
+class GameRenderer:
+    """Keeps the game drawn with persistent canvas instructions
+
+    Each layer is an InstructionGroup added once to canvas.before, so
+    overlays added to the widget's canvas always draw on top. A layer is
+    only touched when the object it shows reports a new version; nothing
+    is cleared and re-created on ordinary frames.
+    """
+
+    def __init__(self, canvas, profiler=None):
+        self.profiler = profiler or FrameProfiler()
+        self.background = InstructionGroup()
+        self.layers = {}
+        self.phase_names = {}
+        self.background_key = None
+
+        canvas.add(self.background)
+        for name in ("obstacle", "food", "snake"):
+            layer = InstructionGroup()
+            canvas.add(layer)
+            # Layer group, object shown and the version last drawn
+            self.layers[name] = [layer, None, None]
+            self.phase_names[name] = "render_" + name
+
+    def render(self, game):
+        """Bring every layer up to date with the game's current state"""
+        profiler = self.profiler
+        with profiler.phase("render_background"):
+            self.update_background(game)
+        for name, entry in self.layers.items():
+            with profiler.phase(self.phase_names[name]):
+                self.update_layer(entry, getattr(game, name))
+
+    def update_background(self, game):
+        """Redraw the background only when the board or window changes"""
+        key = (game.grid_size, game.grid_width, game.grid_height,
+               Window.width, Window.height)
+        if key == self.background_key:
+            return
+        self.background_key = key
+
+        self.background.clear()
+        # Draw background
+        self.background.add(Color(0, 0, 0, 1))  # Black
+        self.background.add(
+            Rectangle(pos=(0, 0), size=(Window.width, Window.height)))
+
+        # Every grid line goes into one Mesh, so the grid is a single draw
+        self.background.add(Color(0.2, 0.2, 0.2, 1))  # Dark gray
+        self.background.add(self.build_grid_mesh(game))
+        self.profiler.count("instructions", len(self.background.children))
+
+    def build_grid_mesh(self, game):
+        """Return a line-mode Mesh holding all the grid lines"""
+        segments = []
+        for i in range(game.grid_width + 1):
+            x = i * game.grid_size
+            segments.append((x, 0, x, Window.height))
+        for i in range(game.grid_height + 1):
+            y = i * game.grid_size
+            segments.append((0, y, Window.width, y))
+
+        # Each vertex is x, y, u, v; consecutive pairs form a line
+        vertices = []
+        for x1, y1, x2, y2 in segments:
+            vertices.extend((x1, y1, 0, 0, x2, y2, 0, 0))
+        return Mesh(vertices=vertices, indices=list(range(len(segments) * 2)),
+                    mode='lines')
+
+    def update_layer(self, entry, source):
+        layer, shown, version = entry
+        if source is not shown:
+            # A reset replaced the object, so show its instructions instead
+            layer.clear()
+            layer.add(source.graphics)
+            entry[1] = source
+            version = None
+
+        if source.version != version:
+            # update_graphics may return how many instructions it created
+            created = source.update_graphics()
+            self.profiler.count("instructions", created or 0)
+            entry[2] = source.version
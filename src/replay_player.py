@@ -0,0 +1,113 @@
+from kivy.core.window import Window
+from kivy.metrics import dp
+from .hud import HudText
+
+# Playback speeds picked with the 1-4 keys; None runs as fast as frames allow
+SPEEDS = (1, 4, 16, None)
+
+# Seconds of game time the left and right keys jump by
+SEEK_SECONDS = 10
+
+
+class ReplayPlayer:
+    """Plays a recorded game back through SnakeGame's renderer
+
+    The game asks action_for() for each tick's turn instead of reading the
+    keyboard. Seeking hands the engine to Replay.seek(), which restores
+    the nearest keyframe and steps the rules headless from there, so even
+    a long game is scrubbed in a few milliseconds; the board is then
+    redrawn once at the new tick.
+    """
+
+    def __init__(self, game, replay):
+        self.game = game
+        self.replay = replay
+        self.speed = 0  # Index into SPEEDS
+        game.set_time_scale(SPEEDS[self.speed])
+
+        # Replays are not played with settings of their own
+        game.settings_button.opacity = 0
+        game.settings_button.disabled = True
+
+        self.label = HudText(
+            font_size='14sp',
+            halign='center',
+            size=(Window.width, dp(24)),
+            pos=(0, dp(8)),
+            color=(0.8, 0.8, 0.8, 1)
+        )
+        game.add_widget(self.label)
+        game.hud_widgets.append(self.label)
+        self.update_label()
+
+    def action_for(self, tick):
+        """Return the recorded turn on tick, if there was one"""
+        return self.replay.turns_by_tick.get(tick)
+
+    def seconds(self, tick):
+        return tick / self.replay.settings["tick_rate"]
+
+    def update_label(self):
+        """Show the playback position and speed"""
+        speed = SPEEDS[self.speed]
+        text = (f"REPLAY {self.seconds(self.game.engine.tick):.1f}s / "
+                f"{self.seconds(self.replay.last_tick):.1f}s  "
+                f"{'max' if speed is None else f'{speed}x'}  "
+                "Left/Right seek  1-4 speed")
+        if self.label.text != text:
+            self.label.text = text
+
+    def set_speed(self, index):
+        self.speed = index
+        self.game.set_time_scale(SPEEDS[index])
+        self.update_label()
+
+    def seek(self, tick):
+        """Jump to tick and redraw the board there"""
+        game = self.game
+        engine = game.engine
+        self.replay.seek(engine, max(0, tick))
+        game.game_over = (engine.game_over or
+                          engine.tick >= self.replay.last_tick)
+        game.accumulator = 0.0
+        game.queued_direction = None
+
+        # Effects of the ticks skipped over are not played, and those
+        # still running from before the seek are cut short
+        for widget in (game.high_score_banner, game.level_up_banner,
+                       game.food_label):
+            game.timeline.cancel(widget)
+            widget.opacity = 0
+        game.particles.clear()
+        game.points_history = []
+        game.update_score_history_visual()
+        game.update_hud()
+
+        game.snake.interpolate(1.0)
+        game.renderer.render(game)
+        self.update_label()
+
+    def finish(self):
+        """Stop at the end of the recording, showing its last tick"""
+        game = self.game
+        game.snake.interpolate(1.0)
+        game.renderer.render(game)
+        self.update_label()
+
+    def on_key(self, key):
+        """Handle a playback key, returning False for any other key"""
+        step = int(SEEK_SECONDS * self.replay.settings["tick_rate"])
+        tick = self.game.engine.tick
+        if key == 'left':
+            self.seek(tick - step)
+        elif key == 'right':
+            self.seek(tick + step)
+        elif key == 'home':
+            self.seek(0)
+        elif key == 'end':
+            self.seek(self.replay.last_tick)
+        elif key in ('1', '2', '3', '4'):
+            self.set_speed(int(key) - 1)
+        else:
+            return False
+        return True
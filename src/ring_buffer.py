@@ -0,0 +1,165 @@
+class RingBuffer:
+    """Fixed-capacity sequence with O(1) push and pop at both ends"""
+
+    def __init__(self, capacity, items=()):
+        self._capacity = max(1, capacity)
+        self._items = [None] * self._capacity
+        self._head = 0  # Slot of the first item
+        self._length = 0
+
+        for item in items:
+            self.append(item)
+
+    def _slot(self, index):
+        """Translate a logical index into a slot of the backing list"""
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ring buffer index out of range")
+        return (self._head + index) % self._capacity
+
+    def appendleft(self, item):
+        """Insert an item in front of the first one"""
+        if self._length == self._capacity:
+            raise IndexError("ring buffer is full")
+        self._head = (self._head - 1) % self._capacity
+        self._items[self._head] = item
+        self._length += 1
+
+    def append(self, item):
+        """Add an item after the last one"""
+        if self._length == self._capacity:
+            raise IndexError("ring buffer is full")
+        self._items[(self._head + self._length) % self._capacity] = item
+        self._length += 1
+
+    def pop(self):
+        """Remove and return the last item"""
+        if not self._length:
+            raise IndexError("pop from an empty ring buffer")
+        slot = (self._head + self._length - 1) % self._capacity
+        item = self._items[slot]
+        self._items[slot] = None
+        self._length -= 1
+        return item
+
+    def popleft(self):
+        """Remove and return the first item"""
+        if not self._length:
+            raise IndexError("pop from an empty ring buffer")
+        item = self._items[self._head]
+        self._items[self._head] = None
+        self._head = (self._head + 1) % self._capacity
+        self._length -= 1
+        return item
+
+    def clear(self):
+        """Remove every item"""
+        self._items = [None] * self._capacity
+        self._head = 0
+        self._length = 0
+
+    def copy(self):
+        """Return the items as a plain list, first to last"""
+        return list(self)
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        items = self._items
+        capacity = self._capacity
+        head = self._head
+        for i in range(self._length):
+            yield items[(head + i) % capacity]
+
+    def __reversed__(self):
+        items = self._items
+        capacity = self._capacity
+        head = self._head
+        for i in range(self._length - 1, -1, -1):
+            yield items[(head + i) % capacity]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._items[(self._head + i) % self._capacity]
+                    for i in range(*index.indices(self._length))]
+        return self._items[self._slot(index)]
+
+    def __setitem__(self, index, item):
+        self._items[self._slot(index)] = item
+
+    def __add__(self, other):
+        return self.copy() + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self.copy()
+
+    def __eq__(self, other):
+        if isinstance(other, (RingBuffer, list, tuple)):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.copy()!r})"
+
+
+class SnakeBody(RingBuffer):
+    """Ring buffer of grid cells with an occupancy set for O(1) lookups
+
+    The first item is the head and the last item is the tail. A snake never
+    covers the same cell twice, so a plain set is enough to answer
+    membership queries without scanning the body. When free_cells is given
+    it is kept up to date as cells are taken and vacated.
+    """
+
+    def __init__(self, capacity, cells=(), free_cells=None):
+        self._occupied = set()
+        self.free_cells = free_cells
+        super(SnakeBody, self).__init__(capacity, cells)
+
+    def _take(self, cell):
+        self._occupied.add(cell)
+        if self.free_cells is not None:
+            self.free_cells.occupy(cell)
+
+    def _vacate(self, cell):
+        self._occupied.discard(cell)
+        if self.free_cells is not None:
+            self.free_cells.release(cell)
+
+    def appendleft(self, cell):
+        super(SnakeBody, self).appendleft(cell)
+        self._take(cell)
+
+    def append(self, cell):
+        super(SnakeBody, self).append(cell)
+        self._take(cell)
+
+    def pop(self):
+        cell = super(SnakeBody, self).pop()
+        self._vacate(cell)
+        return cell
+
+    def popleft(self):
+        cell = super(SnakeBody, self).popleft()
+        self._vacate(cell)
+        return cell
+
+    def clear(self):
+        if self.free_cells is not None:
+            for cell in self._occupied:
+                self.free_cells.release(cell)
+        super(SnakeBody, self).clear()
+        self._occupied.clear()
+
+    def __setitem__(self, index, cell):
+        raise TypeError("snake body cells can only be pushed or popped")
+
+    def __contains__(self, cell):
+        return cell in self._occupied
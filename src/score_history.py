@@ -0,0 +1,141 @@
+import datetime
+import sqlite3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    length INTEGER,
+    death_cause TEXT,
+    played_at TEXT NOT NULL,
+    day TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_score ON games (score DESC);
+CREATE INDEX IF NOT EXISTS games_by_level ON games (level, score DESC);
+CREATE INDEX IF NOT EXISTS games_by_day ON games (day);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TRIGGER IF NOT EXISTS games_count_insert AFTER INSERT ON games
+BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'game_count';
+END;
+CREATE TRIGGER IF NOT EXISTS games_count_delete AFTER DELETE ON games
+BEGIN
+    UPDATE meta SET value = value - 1 WHERE key = 'game_count';
+END;
+"""
+
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class ScoreHistory:
+    """Every finished game, kept in an indexed SQLite table
+
+    Each game is one appended row, so saving never rewrites older games.
+    The database runs in WAL mode and the score, level and day indexes
+    answer top-N, rank and per-level queries with B-tree lookups instead
+    of loading the whole history. Triggers keep the number of games in
+    the meta table as rows are added or removed, so counting them is one
+    lookup rather than a scan.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent on power loss with NORMAL; only the last
+        # few games could be lost, and nothing waits on an fsync per game
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+        # Histories from before the count was kept are counted once
+        if self._get_meta("game_count") is None:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO meta (key, value) "
+                    "SELECT 'game_count', COUNT(*) FROM games")
+
+    def add(self, score, level, length=None, death_cause=None,
+            played_at=None):
+        """Append one finished game"""
+        played_at = played_at or datetime.datetime.now().strftime(
+            _TIMESTAMP_FORMAT)
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO games (score, level, length, death_cause, "
+                "played_at, day) VALUES (?, ?, ?, ?, ?, ?)",
+                (score, level, length, death_cause, played_at,
+                 played_at[:10]))
+
+    def import_json_history(self, entries):
+        """Copy the old scores.json history in once, returning how many"""
+        if self._get_meta("json_history_imported"):
+            return 0
+        rows = [(entry.get("score", 0), entry.get("level", 1),
+                 entry.get("timestamp") or datetime.datetime.now().strftime(
+                     _TIMESTAMP_FORMAT))
+                for entry in entries]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO games (score, level, played_at, day) "
+                "VALUES (?, ?, ?, substr(?, 1, 10))",
+                [(score, level, at, at) for score, level, at in rows])
+            self._set_meta("json_history_imported", "1")
+        return len(rows)
+
+    def top(self, limit=10):
+        """Return the best games as (score, level, played_at), best first"""
+        return self.connection.execute(
+            "SELECT score, level, played_at FROM games "
+            "ORDER BY score DESC, id LIMIT ?", (limit,)).fetchall()
+
+    def rank(self, score):
+        """Return the 1-based position a score takes among all games
+
+        This counts the index range above score, so it grows with the
+        number of better games rather than with the whole history.
+        """
+        (better,) = self.connection.execute(
+            "SELECT COUNT(*) FROM games WHERE score > ?", (score,)).fetchone()
+        return better + 1
+
+    def count(self):
+        return int(self._get_meta("game_count"))
+
+    def best_per_level(self):
+        """Return (level, best score) for every level reached
+
+        Levels are walked one index seek at a time, and each best score is
+        one more seek, so the cost grows with the levels, not the games.
+        """
+        return self.connection.execute(
+            "WITH RECURSIVE levels(level) AS ("
+            " SELECT MIN(level) FROM games"
+            " UNION ALL"
+            " SELECT (SELECT MIN(level) FROM games WHERE level > levels.level)"
+            " FROM levels WHERE levels.level IS NOT NULL)"
+            " SELECT level, (SELECT MAX(score) FROM games"
+            "  WHERE games.level = levels.level)"
+            " FROM levels WHERE level IS NOT NULL").fetchall()
+
+    def daily(self, days=7):
+        """Return (day, games, best, average) for the most recent days"""
+        return self.connection.execute(
+            "SELECT day, COUNT(*), MAX(score), AVG(score) FROM games "
+            "GROUP BY day ORDER BY day DESC LIMIT ?", (days,)).fetchall()
+
+    def close(self):
+        self.connection.close()
+
+    def _get_meta(self, key):
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (key, value))
@@ -1,26 +1,38 @@
-from kivy.graphics import Rectangle, Color, Ellipse, Line
-from kivy.clock import Clock
+from kivy.graphics import Rectangle, Color, Ellipse, Line, Mesh
+from kivy.graphics.instructions import InstructionGroup
+from kivy.graphics.texture import Texture
 from collections import deque
+from itertools import islice
 import math
-
-
-class Snake:
-    def __init__(self, grid_size=20, grid_width=40, grid_height=30):
-        # Initialize with game grid parameters
+import numpy as np
+from .point_buffer import PointBuffer
+from .engine.snake import SnakeState, DIRECTIONS
+
+# Each body segment is a circle drawn as a fan of this many triangles
+SEGMENT_SIDES = 16
+# Segments per body mesh, so vertex indices fit in 16 bits
+SEGMENTS_PER_MESH = 65536 // (SEGMENT_SIDES + 1)
+# Segment colors are texels of a texture this wide, one per segment
+COLOR_TEXTURE_WIDTH = 256
+
+# Rim offsets of a unit circle and the fan indices of a single segment
+_RIM_ANGLES = np.linspace(0, 2 * math.pi, SEGMENT_SIDES, endpoint=False)
+_RIM_COS = np.cos(_RIM_ANGLES).astype('f')
+_RIM_SIN = np.sin(_RIM_ANGLES).astype('f')
+_FAN = np.stack([
+    np.zeros(SEGMENT_SIDES, dtype=np.uint16),
+    np.arange(1, SEGMENT_SIDES + 1, dtype=np.uint16),
+    np.roll(np.arange(1, SEGMENT_SIDES + 1, dtype=np.uint16), -1),
+], axis=1).ravel()
+
+
+class Snake(SnakeState):
+    def __init__(self, grid_size=20, grid_width=40, grid_height=30,
+                 free_cells=None, timeline=None):
+        # Initialize the grid-level rules with game grid parameters
+        super(Snake, self).__init__(grid_width, grid_height, free_cells)
         self.grid_size = grid_size
-        self.grid_width = grid_width
-        self.grid_height = grid_height
-
-        # Start in the middle of the screen
-        start_x = grid_width // 2
-        start_y = grid_height // 2
-
-        # Initialize with 3 segments
-        self.body = [(start_x, start_y), (start_x-1, start_y),
-                     (start_x-2, start_y)]
-        self.direction = (1, 0)  # Initial direction: moving right
-        self.grow = False
-        self.is_alive = True
+        self.timeline = timeline
 
         # Visual enhancements
         self.tongue_out = False
@@ -41,83 +53,82 @@ class Snake:
         # Keep track of last eaten food color
         self.last_food_color = None
 
+        # Persistent drawing instructions, updated in place each frame
+        self.create_graphics()
+
         # Start tongue animation
-        self.start_tongue_animation()
+        if timeline is not None:
+            self.start_tongue_animation()
 
         # Add smooth movement
         self.smooth_movement = True
-        self.visual_positions = []  # Stores actual drawing positions
-
-        # Initialize visual positions to match grid positions
-        for pos in self.body:
-            self.visual_positions.append(
-                (pos[0] * grid_size, pos[1] * grid_size))
-
-        # Movement interpolation - higher = smoother but slower visually
-        self.move_interpolation_steps = 5
-        self.current_step = 0
+        # Pixel positions of the body cells and the actual drawing
+        # positions between the last two ticks, kept in step with the body
+        # as contiguous float arrays, head first
+        cell_positions = [(pos[0] * grid_size, pos[1] * grid_size)
+                          for pos in self.body]
+        self.grid_positions = PointBuffer(cell_positions)
+        self.visual_positions = PointBuffer(cell_positions)
+
+        # Where the tail was before the last move, or None before the first
+        self.trail_position = None
+        self.render_alpha = 1.0
 
     def start_tongue_animation(self):
         # Animate tongue every 0.5 seconds
-        self.tongue_animation = Clock.schedule_interval(
-            self.toggle_tongue, 0.5)
+        self.tongue_animation = self.timeline.phase(0.5, 2, self.set_tongue)
 
-    def toggle_tongue(self, dt):
-        self.tongue_out = not self.tongue_out
+    def set_tongue(self, phase):
+        self.tongue_out = bool(phase)
+        self.version += 1
 
     def move(self):
         """Move the snake in the current direction"""
-        # Get current head position
-        head = self.body[0]
-
-        # Calculate new head position based on direction
-        new_head = (
-            (head[0] + self.direction[0]) % self.grid_width,
-            (head[1] + self.direction[1]) % self.grid_height
-        )
-
-        # Check for collision with self (except when growing)
-        # This check should exclude the last tail segment (which will be removed unless growing)
-        check_body = self.body[:-1] if not self.grow else self.body
-        if new_head in check_body:
-            self.is_alive = False
-            return
+        growing = self.grow
+        old_tail = self.grid_positions[-1].tolist()
+        if not super(Snake, self).move():
+            return False
+        self.trail_position = old_tail
 
-        # Add new head to the front of the body
-        self.body.insert(0, new_head)
+        # Keep the grid and visual positions in step with the body
+        if not growing and self.visual_positions:
+            self.grid_positions.pop()
+            self.visual_positions.pop()
 
         # Add new visual position
+        new_head = self.body[0]
         new_visual_head = (new_head[0] * self.grid_size,
                            new_head[1] * self.grid_size)
-        self.visual_positions.insert(0, new_visual_head)
+        self.grid_positions.appendleft(new_visual_head)
+        self.visual_positions.appendleft(new_visual_head)
+        self.render_alpha = None  # Visual positions need interpolating again
 
-        # If not growing, remove the tail segment
-        if not self.grow:
-            self.body.pop()
-            if self.visual_positions:
-                self.visual_positions.pop()
-        else:
-            # Reset the grow flag after growing
-            self.grow = False
-
-            # Add a new color to the segment_colors deque for the new segment
-            if self.last_food_color:
-                # Mix the food color with default color
-                new_color = self.mix_colors(
-                    self.last_food_color, (0, 0.7, 0, 1), 0.7)
-                self.segment_colors.appendleft(new_color)
-
-    def change_direction(self, new_direction):
-        # Prevent 180-degree turns
-        opposite_direction = (-self.direction[0], -self.direction[1])
-        if new_direction != opposite_direction:
-            self.direction = new_direction
-
-    def grow_snake(self):
-        """Grow the snake by setting the grow flag"""
-        # When this flag is set, the tail won't be removed on the next move,
-        # effectively growing the snake by one segment
-        self.grow = True
+        # Add a new color to the segment_colors deque for the new segment
+        if growing and self.last_food_color:
+            # Mix the food color with default color
+            new_color = self.mix_colors(
+                self.last_food_color, (0, 0.7, 0, 1), 0.7)
+            self.segment_colors.appendleft(new_color)
+
+        self.version += 1
+        return True
+
+    def restore(self, cells, direction, grow=False):
+        """Lay the snake along cells and redraw it there at once"""
+        super(Snake, self).restore(cells, direction, grow)
+        cell_positions = [(pos[0] * self.grid_size, pos[1] * self.grid_size)
+                          for pos in self.body]
+        self.grid_positions = PointBuffer(cell_positions)
+        self.visual_positions = PointBuffer(cell_positions)
+        self.trail_position = None
+        self.render_alpha = None
+
+        # Keyframes carry no colors, so keep what there is and pad it out
+        while len(self.segment_colors) < len(self.body):
+            self.segment_colors.append(self.default_body_color)
+        while len(self.segment_colors) > len(self.body):
+            self.segment_colors.pop()
+        self.version += 1
 
     def add_food_color(self, food_color):
         """Update snake colors based on the food eaten"""
@@ -145,6 +156,8 @@ class Snake:
         while len(self.segment_colors) > len(self.body):
             self.segment_colors.pop()
 
+        self.version += 1
+
     def mix_colors(self, color1, color2, ratio=0.5):
         """Mix two colors together with the given ratio"""
         # Ensure both colors have 4 components (RGBA)
@@ -167,13 +180,6 @@ class Snake:
 
         return (r, g, b, a)
 
-    def check_collision(self, position):
-        # Check if the head collides with the body
-        return position in self.body[1:]
-
-    def get_head_position(self):
-        return self.body[0]
-
     def draw_tapered_segment(self, canvas, pos, size_factor=1.0, color=None):
         """Draw a segment with the specified size factor and color"""
         adjusted_size = self.grid_size * size_factor
@@ -188,196 +194,294 @@ class Snake:
                 size=(adjusted_size, adjusted_size)
             )
 
-    def update_visual_positions(self, interpolation_factor):
-        """Update visual positions for smooth movement"""
-        if not self.smooth_movement or len(self.visual_positions) != len(self.body):
-            return
-
-        # Update visual positions to move toward grid positions
-        for i, (grid_pos, visual_pos) in enumerate(zip(self.body, self.visual_positions)):
-            target_x = grid_pos[0] * self.grid_size
-            target_y = grid_pos[1] * self.grid_size
+    def interpolate(self, alpha):
+        """Place the visual positions alpha of the way through the last move
 
-            current_x, current_y = visual_pos
-
-            # Move visual position toward grid position
-            new_x = current_x + (target_x - current_x) * interpolation_factor
-            new_y = current_y + (target_y - current_y) * interpolation_factor
+        Every segment slides from where it was before the last tick, which
+        is where the next segment towards the tail is now, to its cell.
+        """
+        if not self.smooth_movement or self.trail_position is None:
+            alpha = 1.0
+        if alpha == self.render_alpha:
+            return
+        self.render_alpha = alpha
+
+        visual = self.visual_positions.view()
+        target = self.grid_positions.view()
+
+        # Offsets from each cell back to where that segment came from
+        visual[:-1] = target[1:]
+        visual[-1] = self.trail_position or target[-1]
+        visual -= target
+
+        # Segments wrapping around the board jump instead of crossing it
+        visual[np.abs(visual).max(axis=1) > self.grid_size] = 0
+
+        visual *= 1.0 - alpha
+        visual += target
+        self.version += 1
+
+    def create_graphics(self):
+        """Create the persistent instructions the snake is drawn with"""
+        self.graphics = InstructionGroup()
+        self.version = 0  # Bumped whenever the drawing needs updating
+
+        # The body after the head is one Mesh (more for huge snakes) whose
+        # vertices sample their segment's color from a small texture
+        self.body_graphics = InstructionGroup()
+        self.body_graphics.add(Color(1, 1, 1, 1))
+        self.body_meshes = []
+        self.body_buffers = []  # Meshes read these arrays without copying
+        self.body_texture = None
+        self.body_pixels = None  # What the texture holds, one row per texel
+        self.graphics.add(self.body_graphics)
+
+        # Indices for a full mesh; smaller meshes use a prefix
+        self.body_indices = (
+            _FAN[None, :] + (np.arange(SEGMENTS_PER_MESH, dtype=np.uint16)
+                             * (SEGMENT_SIDES + 1))[:, None]).ravel()
+
+        # Head with highlight for 3D effect
+        self.head_color = Color(*self.default_head_color)
+        self.head_ellipse = Ellipse()
+        self.highlight_color = Color()
+        self.highlight_ellipse = Ellipse()
+
+        # Eyes and pupils
+        self.eye_color = Color(1, 1, 1, 1)
+        self.eye_ellipses = (Ellipse(), Ellipse())
+        self.pupil_color = Color(0, 0, 0, 1)
+        self.pupil_ellipses = (Ellipse(), Ellipse())
+
+        # Tongue: a straight part and two forks
+        tongue_width = self.grid_size * 0.1
+        self.tongue_color = Color(0, 0, 0, 0)
+        self.tongue_lines = tuple(Line(points=[0, 0, 0, 0], width=tongue_width)
+                                  for _ in range(3))
+
+        for instruction in (self.head_color, self.head_ellipse,
+                            self.highlight_color, self.highlight_ellipse,
+                            self.eye_color, *self.eye_ellipses,
+                            self.pupil_color, *self.pupil_ellipses,
+                            self.tongue_color, *self.tongue_lines):
+            self.graphics.add(instruction)
 
-            self.visual_positions[i] = (new_x, new_y)
+    def change_direction(self, new_direction):
+        super(Snake, self).change_direction(new_direction)
+        # The eyes and tongue follow the direction
+        self.version += 1
+
+    def _segment_colors_array(self, count, taper_positions):
+        """Return an RGBA row for each of count body segments"""
+        # Default gradient if we don't have enough colors
+        colors = np.zeros((count, 4), dtype='f')
+        colors[:, 1] = np.maximum(0.3, 0.7 - taper_positions * 0.4)
+        colors[:, 3] = 1
+
+        # Colors based on food consumption, read without indexing the deque
+        known = list(islice(self.segment_colors, 1, count + 1))
+        if known:
+            colors[:len(known)] = known
+        return colors
+
+    def _upload_segment_colors(self, colors):
+        """Write the segment colors into the texture the meshes sample
+
+        Only the rows of texels whose color changed are sent to the GPU,
+        from a pixel buffer kept the size of the texture.
+        """
+        count = len(colors)
+        rows = max(1, -(-count // COLOR_TEXTURE_WIDTH))
+        new = np.clip(colors * 255 + 0.5, 0, 255).astype(np.uint8)
+        if self.body_texture is None or self.body_texture.height < rows:
+            # Grow by doubling so a growing snake rarely reallocates
+            height = 1
+            while height < rows:
+                height *= 2
+            self.body_texture = Texture.create(
+                size=(COLOR_TEXTURE_WIDTH, height), colorfmt='rgba')
+            self.body_texture.mag_filter = 'nearest'
+            self.body_texture.min_filter = 'nearest'
+            for mesh in self.body_meshes:
+                mesh.texture = self.body_texture
+            self.body_pixels = np.zeros((height * COLOR_TEXTURE_WIDTH, 4),
+                                        dtype=np.uint8)
+            first, last = 0, count - 1
+        else:
+            changed = np.flatnonzero(
+                (self.body_pixels[:count] != new).any(axis=1))
+            if not len(changed):
+                return
+            first, last = changed[0], changed[-1]
+
+        # Texels past count belong to no segment, so they are left as is
+        pixels = self.body_pixels
+        pixels[:count] = new
+        start = first // COLOR_TEXTURE_WIDTH
+        end = max(start + 1, last // COLOR_TEXTURE_WIDTH + 1)
+        self.body_texture.blit_buffer(
+            memoryview(pixels[start * COLOR_TEXTURE_WIDTH:
+                              end * COLOR_TEXTURE_WIDTH]).cast('B'),
+            size=(COLOR_TEXTURE_WIDTH, end - start), pos=(0, start),
+            colorfmt='rgba', bufferfmt='ubyte')
+
+    def _sync_body_meshes(self, count):
+        """Keep one mesh per SEGMENTS_PER_MESH body segments"""
+        needed = -(-count // SEGMENTS_PER_MESH)
+        created = max(0, needed - len(self.body_meshes))
+        while len(self.body_meshes) < needed:
+            mesh = Mesh(mode='triangles', texture=self.body_texture)
+            self.body_graphics.add(mesh)
+            self.body_meshes.append(mesh)
+            self.body_buffers.append(None)
+
+        while len(self.body_meshes) > needed:
+            self.body_graphics.remove(self.body_meshes.pop())
+            self.body_buffers.pop()
+        return created
+
+    def update_body_mesh(self, positions, length):
+        """Rebuild the body vertices in bulk from segment positions"""
+        count = len(positions)
+        created = self._sync_body_meshes(count)
+        if not count:
+            return created
+
+        # Segment i (counted from the head) tapers towards the tail
+        taper_positions = np.arange(1, count + 1, dtype='f') / length
+        taper_factor = np.maximum(0.6, 1.0 - taper_positions * 0.4)
+        radius = self.grid_size * taper_factor / 2
+        centre = positions + self.grid_size / 2
+
+        self._upload_segment_colors(
+            self._segment_colors_array(count, taper_positions))
+
+        # Every vertex of a segment samples the centre of its color texel
+        texel = np.arange(count)
+        texture = self.body_texture
+
+        # Vertices are x, y, u, v: the centre followed by the rim
+        vertices = np.empty((count, SEGMENT_SIDES + 1, 4), dtype='f')
+        vertices[:, 0, :2] = centre
+        vertices[:, 1:, 0] = centre[:, :1] + radius[:, None] * _RIM_COS
+        vertices[:, 1:, 1] = centre[:, 1:] + radius[:, None] * _RIM_SIN
+        vertices[:, :, 2] = ((texel % COLOR_TEXTURE_WIDTH + 0.5)
+                             / COLOR_TEXTURE_WIDTH)[:, None]
+        vertices[:, :, 3] = ((texel // COLOR_TEXTURE_WIDTH + 0.5)
+                             / texture.height)[:, None]
+
+        for i, mesh in enumerate(self.body_meshes):
+            chunk = vertices[i * SEGMENTS_PER_MESH:(i + 1) * SEGMENTS_PER_MESH]
+            chunk = np.ascontiguousarray(chunk).ravel()
+            self.body_buffers[i] = chunk
+            mesh.vertices = memoryview(chunk)
+            segments = len(chunk) // (4 * (SEGMENT_SIDES + 1))
+            mesh.indices = memoryview(
+                self.body_indices[:segments * 3 * SEGMENT_SIDES])
+        return created
+
+    def update_graphics(self):
+        """Move the existing instructions to the snake's current state"""
+        # Use visual positions if smooth movement is enabled. Both are
+        # views of the position arrays, so nothing is copied here
+        positions_to_use = (self.visual_positions if self.smooth_movement
+                            else self.grid_positions).view()
+
+        # Update snake body with colors based on food consumption
+        created = self.update_body_mesh(positions_to_use[1:], len(self.body))
+
+        head_color = self.segment_colors[0] if self.segment_colors \
+            else self.default_head_color
+
+        if not len(positions_to_use):
+            return created
+
+        # Head at visual position
+        head_pos = positions_to_use[0].tolist()
+        self.head_color.rgba = head_color
+        self.head_ellipse.pos = (head_pos[0], head_pos[1])
+        self.head_ellipse.size = (self.grid_size, self.grid_size)
+
+        # Head highlight for 3D effect
+        r, g, b, a = head_color
+        self.highlight_color.rgba = (
+            min(1.0, r*1.2), min(1.0, g*1.2), min(1.0, b*1.2), 0.5)
+        highlight_size = self.grid_size * 0.6
+        highlight_offset = self.grid_size * 0.1
+        self.highlight_ellipse.pos = (head_pos[0] + highlight_offset,
+                                      head_pos[1] + highlight_offset)
+        self.highlight_ellipse.size = (highlight_size, highlight_size)
+
+        self._update_eyes(head_pos)
+        self._update_tongue(head_pos, head_color)
+        return created
+
+    def _update_eyes(self, head_pos):
+        eye_size = self.grid_size * 0.25
+        eye_offset = self.grid_size * 0.25
+        near = eye_offset
+        far = self.grid_size - eye_offset - eye_size
+
+        # Eye positions depend on direction
+        eye_offsets = {
+            (1, 0): ((far, far), (far, near)),  # Right
+            (-1, 0): ((near, near), (near, far)),  # Left
+            (0, 1): ((near, far), (far, far)),  # Up
+            (0, -1): ((near, near), (far, near))  # Down
+        }.get(self.direction)
+
+        if eye_offsets is None:
+            self.eye_color.a = 0
+            self.pupil_color.a = 0
+            return
 
-    def draw(self, canvas):
-        """Draw the snake on the canvas with smooth movement"""
-        # Use visual positions if smooth movement is enabled
-        positions_to_use = self.visual_positions if self.smooth_movement else [
-            (pos[0] * self.grid_size, pos[1] * self.grid_size) for pos in self.body
-        ]
+        # Pupils - make them slightly colored based on food
+        pupil_color = (0, 0, 0, 1)  # Default black
+        if self.last_food_color:
+            # Handle both RGB and RGBA food colors
+            r, g, b = self.last_food_color[:3]
+            pupil_color = (r * 0.2, g * 0.2, b * 0.2, 1)
+
+        self.eye_color.a = 1
+        self.pupil_color.rgba = pupil_color
+        pupil_size = eye_size * 0.6
+        pupil_offset = (eye_size - pupil_size) / 2
+
+        for (dx, dy), eye, pupil in zip(eye_offsets, self.eye_ellipses,
+                                        self.pupil_ellipses):
+            eye.pos = (head_pos[0] + dx, head_pos[1] + dy)
+            eye.size = (eye_size, eye_size)
+            pupil.pos = (head_pos[0] + dx + pupil_offset,
+                         head_pos[1] + dy + pupil_offset)
+            pupil.size = (pupil_size, pupil_size)
+
+    def _update_tongue(self, head_pos, head_color):
+        if not self.tongue_out or self.direction not in DIRECTIONS:
+            # Hidden tongues stay in the group, just fully transparent
+            self.tongue_color.a = 0
+            return
 
-        with canvas:
-            # Draw snake body with colors based on food consumption
-            for i, pos in enumerate(positions_to_use):
-                if i == 0:  # Skip head, we'll draw it separately
-                    continue
-
-                # Get the color for this segment
-                if i < len(self.segment_colors):
-                    segment_color = self.segment_colors[i]
-                else:
-                    # Default gradient if we don't have enough colors
-                    intensity = max(0.3, 0.7 - (i / len(self.body)) * 0.4)
-                    segment_color = (0, intensity, 0, 1)
-
-                # Apply a gradient effect for a smoother appearance
-                # Calculate taper factor - smaller segments near the tail
-                taper_factor = max(0.6, 1.0 - (i / len(self.body)) * 0.4)
-
-                # Draw the segment with its color
-                Color(*segment_color)
-                Ellipse(
-                    pos=(pos[0] + (self.grid_size * (1-taper_factor))/2,
-                         pos[1] + (self.grid_size * (1-taper_factor))/2),
-                    size=(self.grid_size * taper_factor,
-                          self.grid_size * taper_factor)
-                )
-
-            # Draw snake head
-            if positions_to_use:
-                head_pos = positions_to_use[0]
-                head_color = self.segment_colors[0] if self.segment_colors else self.default_head_color
-
-                # Draw head at visual position
-                Color(*head_color)
-                Ellipse(
-                    pos=(head_pos[0], head_pos[1]),
-                    size=(self.grid_size, self.grid_size)
-                )
-
-                # Head highlight for 3D effect
-                r, g, b, a = head_color
-                highlight_color = (
-                    min(1.0, r*1.2), min(1.0, g*1.2), min(1.0, b*1.2), 0.5)
-                Color(*highlight_color)
-                highlight_size = self.grid_size * 0.6
-                highlight_offset = self.grid_size * 0.1
-                Ellipse(
-                    pos=(head_pos[0] + highlight_offset,
-                         head_pos[1] + highlight_offset),
-                    size=(highlight_size, highlight_size)
-                )
-
-                # Draw eyes
-                eye_size = self.grid_size * 0.25
-                eye_offset = self.grid_size * 0.25
-
-                # Eye positions depend on direction
-                left_eye_pos = None
-                right_eye_pos = None
-
-                if self.direction == (1, 0):  # Right
-                    left_eye_pos = (head_pos[0] + self.grid_size - eye_offset - eye_size,
-                                    head_pos[1] + self.grid_size - eye_offset - eye_size)
-                    right_eye_pos = (head_pos[0] + self.grid_size - eye_offset - eye_size,
-                                     head_pos[1] + eye_offset)
-                elif self.direction == (-1, 0):  # Left
-                    left_eye_pos = (head_pos[0] + eye_offset,
-                                    head_pos[1] + eye_offset)
-                    right_eye_pos = (head_pos[0] + eye_offset,
-                                     head_pos[1] + self.grid_size - eye_offset - eye_size)
-                elif self.direction == (0, 1):  # Up
-                    left_eye_pos = (head_pos[0] + eye_offset,
-                                    head_pos[1] + self.grid_size - eye_offset - eye_size)
-                    right_eye_pos = (head_pos[0] + self.grid_size - eye_offset - eye_size,
-                                     head_pos[1] + self.grid_size - eye_offset - eye_size)
-                elif self.direction == (0, -1):  # Down
-                    left_eye_pos = (head_pos[0] + eye_offset,
-                                    head_pos[1] + eye_offset)
-                    right_eye_pos = (head_pos[0] + self.grid_size - eye_offset - eye_size,
-                                     head_pos[1] + eye_offset)
-
-                # Draw the eyes
-                if left_eye_pos and right_eye_pos:
-                    # White part of eyes
-                    Color(1, 1, 1, 1)
-                    Ellipse(pos=left_eye_pos, size=(eye_size, eye_size))
-                    Ellipse(pos=right_eye_pos, size=(eye_size, eye_size))
-
-                    # Pupils - make them slightly colored based on food
-                    pupil_color = (0, 0, 0, 1)  # Default black
-                    if self.last_food_color:
-                        # Handle both RGB and RGBA food colors
-                        if len(self.last_food_color) == 3:
-                            r, g, b = self.last_food_color
-                            pupil_color = (r * 0.2, g * 0.2, b * 0.2, 1)
-                        else:
-                            r, g, b, _ = self.last_food_color
-                            pupil_color = (r * 0.2, g * 0.2, b * 0.2, 1)
-
-                    Color(*pupil_color)
-                    pupil_size = eye_size * 0.6
-                    pupil_offset = (eye_size - pupil_size) / 2
-                    Ellipse(pos=(left_eye_pos[0] + pupil_offset, left_eye_pos[1] + pupil_offset),
-                            size=(pupil_size, pupil_size))
-                    Ellipse(pos=(right_eye_pos[0] + pupil_offset, right_eye_pos[1] + pupil_offset),
-                            size=(pupil_size, pupil_size))
-
-                # Draw tongue - match tongue color to head color slightly
-                if self.tongue_out:
-                    # Make tongue reddish but with a hint of the snake's color
-                    r, g, b, _ = head_color  # Head color should always be RGBA at this point
-                    tongue_color = (0.9 + r * 0.1, 0.1 + g *
-                                    0.05, 0.1 + b * 0.05, 1)
-                    Color(*tongue_color)
-                    tongue_width = self.grid_size * 0.1
-                    tongue_length = self.grid_size * 0.5
-                    fork_length = self.grid_size * 0.25
-
-                    # Tongue base position depends on direction
-                    tongue_base_x = head_pos[0] + self.grid_size / 2
-                    tongue_base_y = head_pos[1] + self.grid_size / 2
-
-                    if self.direction == (1, 0):  # Right
-                        # Tongue straight part
-                        Line(points=[tongue_base_x, tongue_base_y,
-                                     tongue_base_x + tongue_length, tongue_base_y],
-                             width=tongue_width)
-
-                        # Forked part
-                        Line(points=[tongue_base_x + tongue_length, tongue_base_y,
-                                     tongue_base_x + tongue_length + fork_length, tongue_base_y + fork_length],
-                             width=tongue_width)
-                        Line(points=[tongue_base_x + tongue_length, tongue_base_y,
-                                     tongue_base_x + tongue_length + fork_length, tongue_base_y - fork_length],
-                             width=tongue_width)
-
-                    elif self.direction == (-1, 0):  # Left
-                        Line(points=[tongue_base_x, tongue_base_y,
-                                     tongue_base_x - tongue_length, tongue_base_y],
-                             width=tongue_width)
-                        Line(points=[tongue_base_x - tongue_length, tongue_base_y,
-                                     tongue_base_x - tongue_length - fork_length, tongue_base_y + fork_length],
-                             width=tongue_width)
-                        Line(points=[tongue_base_x - tongue_length, tongue_base_y,
-                                     tongue_base_x - tongue_length - fork_length, tongue_base_y - fork_length],
-                             width=tongue_width)
-
-                    elif self.direction == (0, 1):  # Up
-                        Line(points=[tongue_base_x, tongue_base_y,
-                                     tongue_base_x, tongue_base_y + tongue_length],
-                             width=tongue_width)
-                        Line(points=[tongue_base_x, tongue_base_y + tongue_length,
-                                     tongue_base_x + fork_length, tongue_base_y + tongue_length + fork_length],
-                             width=tongue_width)
-                        Line(points=[tongue_base_x, tongue_base_y + tongue_length,
-                                     tongue_base_x - fork_length, tongue_base_y + tongue_length + fork_length],
-                             width=tongue_width)
-
-                    elif self.direction == (0, -1):  # Down
-                        Line(points=[tongue_base_x, tongue_base_y,
-                                     tongue_base_x, tongue_base_y - tongue_length],
-                             width=tongue_width)
-                        Line(points=[tongue_base_x, tongue_base_y - tongue_length,
-                                     tongue_base_x + fork_length, tongue_base_y - tongue_length - fork_length],
-                             width=tongue_width)
-                        Line(points=[tongue_base_x, tongue_base_y - tongue_length,
-                                     tongue_base_x - fork_length, tongue_base_y - tongue_length - fork_length],
-                             width=tongue_width)
+        # Make tongue reddish but with a hint of the snake's color
+        r, g, b, _ = head_color  # Head color should always be RGBA at this point
+        self.tongue_color.rgba = (0.9 + r * 0.1, 0.1 + g *
+                                  0.05, 0.1 + b * 0.05, 1)
+        tongue_length = self.grid_size * 0.5
+        fork_length = self.grid_size * 0.25
+
+        # Tongue base position, sticking out in the direction of travel
+        dx, dy = self.direction
+        base_x = head_pos[0] + self.grid_size / 2
+        base_y = head_pos[1] + self.grid_size / 2
+        tip_x = base_x + dx * tongue_length
+        tip_y = base_y + dy * tongue_length
+
+        # Forks continue forwards and spread sideways
+        fork_x = tip_x + dx * fork_length
+        fork_y = tip_y + dy * fork_length
+        side_x = abs(dy) * fork_length
+        side_y = abs(dx) * fork_length
+
+        straight, fork_a, fork_b = self.tongue_lines
+        straight.points = [base_x, base_y, tip_x, tip_y]
+        fork_a.points = [tip_x, tip_y, fork_x + side_x, fork_y + side_y]
+        fork_b.points = [tip_x, tip_y, fork_x - side_x, fork_y - side_y]
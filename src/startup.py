@@ -0,0 +1,102 @@
+import json
+import sys
+import time
+
+
+class _StartupPhase:
+    """Context manager recording one named span of the startup"""
+
+    def __init__(self, timeline, name):
+        self.timeline = timeline
+        self.name = name
+
+    def __enter__(self):
+        self.event = self.timeline.begin(self.name)
+
+    def __exit__(self, *exc_info):
+        self.timeline.end(self.event)
+
+
+class _NullPhase:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class StartupTimeline:
+    """Records what happens between launch and the first frame
+
+    Phases may nest, and each is kept with its start, duration and depth
+    in milliseconds since the timeline was created, which is as early as
+    the entry point can import this module. Nothing is recorded until
+    enable() is called, and a disabled timeline hands out a shared no-op
+    phase.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.enabled = False
+        self.events = []
+        self.depth = 0
+        self.finished = False
+
+    def enable(self):
+        self.enabled = True
+
+    def now(self):
+        return (time.perf_counter() - self.origin) * 1000.0
+
+    def phase(self, name):
+        """Return a context manager timing one step of the startup"""
+        if not self.enabled or self.finished:
+            return _NULL_PHASE
+        return _StartupPhase(self, name)
+
+    def begin(self, name):
+        event = {"name": name, "start": self.now(), "duration": None,
+                 "depth": self.depth}
+        self.events.append(event)
+        self.depth += 1
+        return event
+
+    def end(self, event):
+        self.depth -= 1
+        event["duration"] = self.now() - event["start"]
+
+    def mark(self, name):
+        """Record an instant, such as the first frame being shown"""
+        if self.enabled and not self.finished:
+            self.events.append({"name": name, "start": self.now(),
+                                "duration": 0.0, "depth": self.depth})
+
+    def finish(self, name="first frame"):
+        """Mark the end of the startup and stop recording"""
+        self.mark(name)
+        self.finished = True
+
+    def report(self, file=None):
+        """Print the timeline as an indented table"""
+        file = file or sys.stderr
+        total = self.events[-1]["start"] if self.events else 0.0
+        print(f"Startup timeline ({total:.1f} ms to {self.events[-1]['name']})"
+              if self.events else "Startup timeline is empty", file=file)
+        print(f"{'start ms':>10} {'took ms':>10} {'share':>6}  phase", file=file)
+        for event in self.events:
+            share = event["duration"] / total * 100.0 if total else 0.0
+            print(f"{event['start']:>10.1f} {event['duration']:>10.1f} "
+                  f"{share:>5.1f}%  {'  ' * event['depth']}{event['name']}",
+                  file=file)
+
+    def export(self, path):
+        """Write the recorded events to a JSON file"""
+        with open(path, "w") as f:
+            json.dump({"units": "ms", "events": self.events}, f, indent=2)
+
+
+# The timeline shared by every module taking part in the startup
+startup = StartupTimeline()
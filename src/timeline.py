@@ -0,0 +1,173 @@
+class Phase:
+    """Counter for a recurring effect, stepping every period seconds"""
+
+    def __init__(self, origin, period, count, callback=None):
+        self.origin = origin
+        self.period = period
+        self.count = count
+        self.callback = callback  # Called with the new value on each step
+        self.value = 0
+
+    def advance(self, time):
+        value = int((time - self.origin) / self.period) % self.count
+        if value != self.value:
+            self.value = value
+            if self.callback:
+                self.callback(value)
+
+
+class Tween:
+    """One animation of a target's properties, recycled by the timeline"""
+
+    def __init__(self):
+        self.target = None
+        self.ends = None  # Property name -> final value
+        self.values = []  # (name, start, end) once the tween has started
+        self.duration = 0.0
+        self.delay = 0.0
+        self.elapsed = 0.0
+        self.repeat = False  # Bounce back and forth until cancelled
+        self.on_complete = None
+
+    def update(self, dt):
+        """Advance the tween, returning True once it has finished"""
+        self.elapsed += dt
+        if self.elapsed < self.delay:
+            return False
+
+        if self.ends and not self.values:
+            # Start values are read when the tween starts, like Animation
+            self.values = [(name, getattr(self.target, name), end)
+                           for name, end in self.ends.items()]
+
+        progress = 1.0
+        if self.duration > 0:
+            progress = min(1.0, (self.elapsed - self.delay) / self.duration)
+        self.apply(progress)
+
+        if progress < 1.0:
+            return False
+        if self.repeat:
+            self.values = [(name, end, start)
+                           for name, start, end in self.values]
+            self.elapsed = self.delay
+            return False
+        return True
+
+    def apply(self, progress):
+        for name, start, end in self.values:
+            setattr(self.target, name, _lerp(start, end, progress))
+
+    def finish(self):
+        """Jump straight to the end values"""
+        if self.ends and not self.values:
+            for name, end in self.ends.items():
+                setattr(self.target, name, end)
+        self.apply(1.0)
+
+
+def _lerp(start, end, progress):
+    if isinstance(end, dict):
+        return {key: _lerp(start.get(key, value), value, progress)
+                for key, value in end.items()}
+    if isinstance(end, (tuple, list)):
+        return tuple(_lerp(a, b, progress) for a, b in zip(start, end))
+    return start + (end - start) * progress
+
+
+class Timeline:
+    """Drives every game animation from a single per-frame tick
+
+    Recurring effects such as the tongue flick are phase counters read
+    off the timeline clock, so they need no Clock events of their own.
+    One-shot effects are tweens taken from a fixed pool; when the pool
+    runs dry the oldest tween is finished early to make room. clear()
+    finishes every tween and drops the phases, which is how a reset
+    cleans up.
+    """
+
+    def __init__(self, max_tweens=64):
+        self.time = 0.0
+        self.phases = []
+        self.active = []
+        self.free = [Tween() for _ in range(max_tweens)]
+
+    def phase(self, period, count=2, callback=None):
+        """Start a counter that steps through count values every period"""
+        phase = Phase(self.time, period, count, callback)
+        self.phases.append(phase)
+        return phase
+
+    def remove_phase(self, phase):
+        if phase in self.phases:
+            self.phases.remove(phase)
+
+    def tween(self, target, duration, delay=0, repeat=False, on_complete=None,
+              **values):
+        """Animate target's properties to values over duration seconds"""
+        if target is not None and values:
+            # A new tween replaces any running one on the same properties
+            self.cancel(target, values)
+
+        if not self.free:
+            self._finish(self.active[0])
+
+        tween = self.free.pop()
+        tween.target = target
+        tween.ends = values
+        tween.duration = duration
+        tween.delay = delay
+        tween.repeat = repeat
+        tween.on_complete = on_complete
+        self.active.append(tween)
+        return tween
+
+    def call_later(self, delay, callback):
+        """Call callback with no arguments after delay seconds"""
+        return self.tween(None, 0, delay=delay, on_complete=callback)
+
+    def cancel(self, target, names=None):
+        """Stop target's tweens, or only those touching the given names"""
+        for tween in self.active[:]:
+            if tween.target is target and (
+                    names is None or any(name in tween.ends for name in names)):
+                self._release(tween)
+
+    def tick(self, dt):
+        """Advance every phase and tween by dt seconds"""
+        self.time += dt
+        for phase in self.phases:
+            phase.advance(self.time)
+
+        if not self.active:
+            return
+        for tween in self.active[:]:
+            if tween.update(dt):
+                self._finish(tween)
+
+    def clear(self):
+        """Drop all phases and finish every tween, running its on_complete
+
+        Callbacks still pending, such as one taking a flash off the canvas,
+        must run rather than be lost. Phases go first, so those a callback
+        starts survive.
+        """
+        self.phases = []
+        while self.active:
+            self._finish(self.active[0])
+
+    def _finish(self, tween):
+        tween.finish()
+        on_complete = tween.on_complete
+        self._release(tween)
+        if on_complete:
+            on_complete()
+
+    def _release(self, tween):
+        self.active.remove(tween)
+        tween.target = None
+        tween.ends = None
+        tween.values = []
+        tween.elapsed = 0.0
+        tween.on_complete = None
+        self.free.append(tween)
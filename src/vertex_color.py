@@ -0,0 +1,43 @@
+import numpy as np
+from kivy.graphics import RenderContext
+
+# Each vertex is x, y, r, g, b, a
+VERTEX_FORMAT = [(b'vPosition', 2, 'float'), (b'vColor', 4, 'float')]
+
+# Kivy's own shaders take one color per instruction, so these meshes
+# carry their color in each vertex instead
+VERTEX_SHADER = '''$HEADER$
+attribute vec4 vColor;
+
+void main(void) {
+    frag_color = vColor * color * vec4(1.0, 1.0, 1.0, opacity);
+    gl_Position = projection_mat * modelview_mat * vec4(vPosition.xy, 0.0, 1.0);
+}
+'''
+
+FRAGMENT_SHADER = '''$HEADER$
+
+void main(void) {
+    gl_FragColor = frag_color;
+}
+'''
+
+# The two triangles of a quad whose corners go round in order
+_QUAD = np.array([0, 1, 2, 2, 3, 0], dtype=np.uint16)
+
+
+def create_context():
+    """Return a RenderContext drawing VERTEX_FORMAT meshes in their colors"""
+    context = RenderContext(use_parent_projection=True,
+                            use_parent_modelview=True,
+                            use_parent_frag_modelview=True)
+    # The fragment shader goes first; setting either one relinks
+    context.shader.fs = FRAGMENT_SHADER
+    context.shader.vs = VERTEX_SHADER
+    return context
+
+
+def quad_indices(count):
+    """Return triangle indices for count quads of four vertices each"""
+    quads = np.arange(count, dtype=np.uint16)[:, None] * 4
+    return (quads + _QUAD).ravel()